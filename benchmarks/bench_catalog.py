@@ -0,0 +1,124 @@
+"""
+Memory and load time of the compact `Catalog` against pydantic models.
+
+A synthetic corpus (benchmarks.suite.corpus) is written as processed JSON,
+then loaded either as a list of `Restaurant` models, the way
+`load_restaurants()` does, or as a `Catalog`. Each load runs in a fresh
+process: once for load time and peak RSS, once under tracemalloc for the
+memory the loaded catalog keeps. Building the menu engine from what was
+loaded stands in for the chatbot's in-process lookups.
+
+Generated item descriptions and reviews repeat across restaurants far
+more than scraped ones, so they are made unique per restaurant here;
+names, sections, tags and cities keep repeating as they do in real data.
+
+Usage: PYTHONPATH=. python benchmarks/bench_catalog.py [--restaurants 10000]
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.suite.corpus import CorpusSpec, make_corpus
+from kb.catalog import Catalog
+from kb.menu_engine import MenuEngine
+from kb.preprocess import iter_restaurants
+from models.resturant import Restaurant
+
+MODES = ("models", "catalog")
+
+
+def load(mode: str, directory: Path):
+    if mode == "models":
+        return list(iter_restaurants(directory))
+    return Catalog.from_dir(directory)
+
+
+def run(mode: str, directory: Path, trace: bool) -> dict:
+    if trace:
+        gc.collect()
+        tracemalloc.start()
+        loaded = load(mode, directory)
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return {"retained MB": retained / 2**20}
+
+    started = time.perf_counter()
+    loaded = load(mode, directory)
+    loaded_at = time.perf_counter()
+    engine = MenuEngine(loaded)
+    finished = time.perf_counter()
+    return {
+        "restaurants": len(loaded),
+        "items": len(engine.item_names),
+        "load s": loaded_at - started,
+        "engine s": finished - loaded_at,
+        "peak MB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def measure(mode: str, directory: Path, trace: bool = False) -> dict:
+    command = [sys.executable, __file__, "--run", mode, str(directory)]
+    output = subprocess.run(
+        command + (["--trace"] if trace else []),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main(restaurants: int):
+    directory = Path(tempfile.mkdtemp(prefix="bench_catalog_"))
+    try:
+        serial = itertools.count()
+        for data in make_corpus(CorpusSpec(restaurants=restaurants)):
+            for section in data["menu"]:
+                for item in section["items"]:
+                    item["description"] += f" Ref {next(serial)}."
+            for review in data["reviews"]:
+                review["review_text"] += f" Order {next(serial)}."
+            (directory / f"{data['restaurant_name']}.json").write_text(
+                Restaurant.model_validate(data).model_dump_json(indent=2),
+                encoding="utf-8",
+            )
+
+        results = {
+            mode: {**measure(mode, directory), **measure(mode, directory, True)}
+            for mode in MODES
+        }
+        first = results[MODES[0]]
+        print(f"{first['restaurants']} restaurants, {first['items']} items\n")
+        print(f"{'':<12} {'models':>10} {'catalog':>10} {'change':>8}")
+        for key in ("load s", "engine s", "retained MB", "peak MB"):
+            before, after = results["models"][key], results["catalog"][key]
+            change = (after - before) / before * 100
+            print(f"{key:<12} {before:>10.2f} {after:>10.2f} {change:>7.0f}%")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--restaurants", type=int, default=10_000)
+    parser.add_argument(
+        "--run", nargs=2, metavar=("MODE", "DIR"), help=argparse.SUPPRESS
+    )
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        mode, directory = args.run
+        print(json.dumps(run(mode, Path(directory), args.trace)))
+    else:
+        main(args.restaurants)
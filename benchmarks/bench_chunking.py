@@ -0,0 +1,139 @@
+"""
+Chunk count, embedded tokens, build time and index size for the old
+10-items-plus-every-review chunking against the token-budgeted chunker.
+
+Each chunking is indexed into a fresh local Qdrant collection the way
+`build_index` does it; build time covers chunking, embedding and upserts,
+and index size is the collection's size on disk. Without --embed the
+encoder is the suite's hashing stand-in, so build time is the pipeline's
+overhead only; pass --embed to use the real model, which is what
+dominates `make knowledge_base`. Token counts use the model's tokenizer
+when it is available locally and are estimated otherwise; the header
+says which.
+
+Usage: PYTHONPATH=. python benchmarks/bench_chunking.py [--embed]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from langchain_core.documents import Document
+from qdrant_client import QdrantClient
+
+from config.rag_config import QDRANT_COLLECTION_NAME
+from kb.build_index import chunk_id, index_chunks
+from kb.preprocess import (
+    _load_tokenizer,
+    count_tokens,
+    load_restaurants,
+    restaurant_docs,
+)
+from kb.vector_params import quantization_config, vector_params
+from models.resturant import Restaurant
+from utils.offline_embeddings import HashingEmbeddings
+
+
+def legacy_docs(restaurant: Restaurant) -> list[Document]:
+    """`extract_docs` as it was before chunking was token-budgeted."""
+    docs = []
+    for section in restaurant.menu:
+        batch_size = 10
+        for i in range(0, len(section.items), batch_size):
+            batch_items = section.items[i : i + batch_size]
+            batch_content = f"""
+            Restaurant: {restaurant.restaurant_name}
+            Description: {restaurant.description or "N/A"}
+            Location: {restaurant.location.address}, {restaurant.location.city}
+            Section: {section.section}
+            Features: {", ".join(restaurant.features)}
+            Items:
+            """
+            for item in batch_items:
+                batch_content += f"""
+                - {item.item_name} ({item.price} {item.currency})
+                  Tags: {", ".join(item.tags)}
+                  Description: {item.description or "N/A"}
+                """
+            batch_content += "\nReviews:"
+            for review in restaurant.reviews:
+                batch_content += f"""
+                - {review.rating} stars
+                  Review: {review.review_text or "N/A"}\n
+                """
+            docs.append(
+                Document(
+                    page_content=batch_content.strip(),
+                    metadata={"restaurant": restaurant.restaurant_name},
+                )
+            )
+    return docs
+
+
+def measure(
+    restaurants: list[Restaurant],
+    chunker: Callable[[Restaurant], list[Document]],
+    embeddings,
+) -> dict[str, float]:
+    directory = Path(tempfile.mkdtemp(prefix="bench_chunking_"))
+    try:
+        client = QdrantClient(path=str(directory))
+        client.create_collection(
+            collection_name=QDRANT_COLLECTION_NAME,
+            vectors_config=vector_params(),
+            quantization_config=quantization_config(),
+        )
+        started = time.perf_counter()
+        docs = [doc for restaurant in restaurants for doc in chunker(restaurant)]
+        index_chunks(client, ((chunk_id(doc), doc) for doc in docs), embeddings)
+        build = time.perf_counter() - started
+        client.close()
+        size = sum(f.stat().st_size for f in directory.rglob("*") if f.is_file())
+    finally:
+        shutil.rmtree(directory)
+
+    tokens = [count_tokens(doc.page_content) for doc in docs]
+    return {
+        "chunks": len(docs),
+        "tokens": sum(tokens),
+        "max tokens": max(tokens),
+        "build s": build,
+        "index MB": size / 1e6,
+    }
+
+
+def main(embed: bool):
+    embeddings = HashingEmbeddings()
+    if embed:
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        from config.rag_config import EMBEDDING_MODEL
+
+        embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        embeddings.embed_query("warm up")
+
+    restaurants = load_restaurants()
+    before = measure(restaurants, legacy_docs, embeddings)
+    after = measure(restaurants, restaurant_docs, embeddings)
+
+    tokens = "model tokenizer" if _load_tokenizer() is not None else "estimated"
+    encoder = "real model" if embed else "hashing stand-in"
+    print(f"{len(restaurants)} restaurants, tokens {tokens}, encoder {encoder}\n")
+    print(f"{'':<12} {'before':>10} {'after':>10} {'change':>8}")
+    for key in before:
+        change = (after[key] - before[key]) / before[key] * 100 if before[key] else 0
+        print(f"{key:<12} {before[key]:>10.2f} {after[key]:>10.2f} {change:>7.0f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--embed",
+        action="store_true",
+        help="embed with the real model instead of the stand-in",
+    )
+    args = parser.parse_args()
+    main(args.embed)
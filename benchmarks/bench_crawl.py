@@ -0,0 +1,106 @@
+"""
+Crawl engine benchmark against a local stand-in for the getPage endpoint.
+
+Every response takes a fixed server-side delay, so throughput should grow
+with the worker count while the per-host request rate never exceeds the
+configured token bucket.
+
+Usage: PYTHONPATH=. python benchmarks/bench_crawl.py
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import ClassVar
+
+from models.resturant import Location, Restaurant
+from scrapers.base_scraper import BaseRestaurantScraper
+from scrapers.crawler import crawl
+from scrapers.http_client import CrawlHttpClient, HostRateLimiter
+
+RESPONSE_DELAY = 0.05
+RESTAURANTS = 24
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    timestamps: ClassVar[list[float]] = []
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            self.timestamps.append(time.monotonic())
+        time.sleep(RESPONSE_DELAY)
+        body = json.dumps({"page_data": {"path": self.path}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubScraper(BaseRestaurantScraper):
+    def scrape(self) -> Restaurant:
+        for path in ("", "/order", "/reviews"):
+            self.http.get(f"{self.base_url}{path}", timeout=5).raise_for_status()
+        return Restaurant(
+            restaurant_name=self.base_url.rsplit("/", 1)[-1],
+            description=None,
+            location=Location(
+                address="", city="", pincode=None, latitude=None, longitude=None
+            ),
+            contact=None,
+            operating_hours={},
+            menu=[],
+            reviews=[],
+        )
+
+
+def run(base_url: str, workers: int, rate: float, burst: float) -> tuple[float, float]:
+    StubHandler.timestamps = []
+    scrapers = [StubScraper(f"{base_url}/r{i}") for i in range(RESTAURANTS)]
+    http = CrawlHttpClient(HostRateLimiter(rate, burst))
+
+    started = time.perf_counter()
+    results = asyncio.run(crawl(scrapers, workers=workers, http=http))
+    elapsed = time.perf_counter() - started
+    http.close()
+
+    assert all(isinstance(r, Restaurant) for _, r in results)
+    stamps = sorted(StubHandler.timestamps)
+    # Highest request count seen in any one-second window
+    peak = max(
+        sum(1 for t in stamps[i:] if t - start < 1.0) for i, start in enumerate(stamps)
+    )
+    return RESTAURANTS / elapsed, peak
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    print("Throughput scaling (rate cap well above demand)")
+    print(f"{'workers':>8} {'restaurants/s':>14} {'peak req/s':>11}")
+    for workers in (1, 2, 4, 8):
+        throughput, peak = run(base_url, workers, rate=1000, burst=1000)
+        print(f"{workers:>8} {throughput:>14.1f} {peak:>11}")
+
+    rate, burst = 20.0, 5
+    print(f"\nRate cap ({rate:g} req/s, burst {burst})")
+    print(f"{'workers':>8} {'restaurants/s':>14} {'peak req/s':>11}")
+    for workers in (4, 16):
+        throughput, peak = run(base_url, workers, rate=rate, burst=burst)
+        print(f"{workers:>8} {throughput:>14.1f} {peak:>11}")
+        assert peak <= rate + burst, f"rate cap exceeded: {peak} req/s"
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
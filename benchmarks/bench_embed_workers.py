@@ -0,0 +1,76 @@
+"""
+Embedding throughput with 1..N worker processes on a fixed corpus.
+
+Embeds every chunk from `extract_docs()` (uncached) with
+`MultiProcessEmbeddings` at each worker count and reports chunks/s and the
+speedup over one worker. Model load time is excluded. Pass --stand-in to use
+a CPU-bound stand-in instead of BGE-M3 when the model is not available.
+
+Usage: PYTHONPATH=. python benchmarks/bench_embed_workers.py [--max-workers N] [--stand-in]
+"""
+
+import argparse
+import hashlib
+import os
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from kb.build_index import iter_batches
+from kb.preprocess import extract_docs
+from utils.embedding_cache import load_huggingface_model
+from utils.embedding_workers import MultiProcessEmbeddings
+
+BATCH_SIZE = 64
+
+
+class StandInModel(Embeddings):
+    """Single-threaded CPU work proportional to text length."""
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        vectors = []
+        for text in texts:
+            digest = text.encode("utf-8")
+            for _ in range(20 * len(text)):
+                digest = hashlib.sha256(digest).digest()
+            vectors.append([b / 255 for b in digest] * 32)
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+def stand_in_model(model_name: str) -> Embeddings:
+    return StandInModel()
+
+
+def main(max_workers: int, stand_in: bool):
+    texts = [doc.page_content for doc in extract_docs()]
+    factory = stand_in_model if stand_in else load_huggingface_model
+    print(f"{len(texts)} chunks, {os.cpu_count()} cores\n")
+    print(f"{'workers':>7} {'threads':>7} {'chunks/s':>9} {'speedup':>8}")
+
+    baseline = None
+    for workers in range(1, max_workers + 1):
+        embeddings = MultiProcessEmbeddings(workers=workers, factory=factory)
+        try:
+            embeddings.warm_up()
+            started = time.perf_counter()
+            for batch in iter_batches(texts, BATCH_SIZE * workers):
+                embeddings.embed_documents(batch)
+            rate = len(texts) / (time.perf_counter() - started)
+        finally:
+            embeddings.close()
+        baseline = baseline or rate
+        print(
+            f"{workers:>7} {embeddings.threads_per_worker:>7} "
+            f"{rate:>9.1f} {rate / baseline:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--stand-in", action="store_true")
+    args = parser.parse_args()
+    main(args.max_workers, args.stand_in)
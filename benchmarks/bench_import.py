@@ -0,0 +1,49 @@
+"""
+Cold-start benchmark for the chatbot retriever.
+
+Times, in fresh interpreters, importing `retriever` on its own (what the
+Streamlit page now waits for) against importing it and then loading the
+vector store and encoder (what every import used to pay up front).
+
+Usage: PYTHONPATH=. python benchmarks/bench_import.py [--runs N]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+SNIPPETS = {
+    "import retriever": "import retriever",
+    "import + load store and model": (
+        "import retriever; retriever.warm_up(background=False)"
+    ),
+}
+
+
+def time_snippet(snippet: str) -> float:
+    code = (
+        "import sys, time; sys.path.insert(0, 'chatbot'); "
+        "started = time.perf_counter(); "
+        f"{snippet}; "
+        "print(time.perf_counter() - started)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<32} {'median s':>9} {'min s':>7}")
+    for name, snippet in SNIPPETS.items():
+        timings = [time_snippet(snippet) for _ in range(args.runs)]
+        print(f"{name:<32} {statistics.median(timings):>9.2f} {min(timings):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Index build throughput and peak memory, list-based vs streaming.
+
+A synthetic corpus is made by copying the processed restaurants under new
+names. Embedding and upserts are replaced by stand-ins that cost a fixed
+time per chunk and per batch, so the numbers show the pipeline itself:
+the old path builds every chunk up front and embeds 10 at a time, the
+streaming path overlaps embedding with upserts in configurable batches.
+Both then build the BM25 index, the old path in memory and the streaming
+path spilled to disk, as `build_index` does. Each run happens in a fresh
+process so peak RSS is per run.
+
+Usage: PYTHONPATH=. python benchmarks/bench_indexing.py [--copies 10 100 300]
+"""
+
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config.rag_config import EMBED_BATCH_SIZE, PROCESSED_JSON_DIR, UPSERT_BATCH_SIZE
+from kb.build_index import chunk_id, index_chunks, iter_batches
+from kb.lexical_index import BM25Index
+from kb.preprocess import iter_docs
+
+EMBED_CALL_COST = 0.005  # fixed seconds per encoder call
+EMBED_CHUNK_COST = 0.0005  # seconds per chunk
+UPSERT_COST = 0.02  # seconds per upsert call
+
+
+class StandInEmbeddings(Embeddings):
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        time.sleep(EMBED_CALL_COST + EMBED_CHUNK_COST * len(texts))
+        return np.random.default_rng(len(texts)).random((len(texts), 1024)).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class StandInClient:
+    """Discards points, so memory reflects the pipeline rather than the store."""
+
+    def upsert(self, collection_name, points):
+        time.sleep(UPSERT_COST)
+
+
+def make_corpus(directory: Path, copies: int):
+    sources = [
+        json.loads(path.read_text(encoding="utf-8"))
+        for path in sorted(PROCESSED_JSON_DIR.glob("*.json"))
+    ]
+    for copy in range(copies):
+        for data in sources:
+            name = f"{data['restaurant_name']} {copy}"
+            (directory / f"{name}.json").write_text(
+                json.dumps({**data, "restaurant_name": name}), encoding="utf-8"
+            )
+
+
+def run(mode: str, directory: Path) -> dict:
+    embeddings, client = StandInEmbeddings(), StandInClient()
+    lexical_dir = Path(tempfile.mkdtemp(prefix="bench_indexing_bm25_"))
+    started = time.perf_counter()
+    if mode == "list":
+        docs_by_id = {chunk_id(doc): doc for doc in iter_docs(directory=directory)}
+        for batch in iter_batches(list(docs_by_id.items()), 10):
+            embeddings.embed_documents([doc.page_content for _, doc in batch])
+            client.upsert(None, batch)
+        chunks = len(docs_by_id)
+        embedded = time.perf_counter()
+        BM25Index.build(docs_by_id.items()).save(lexical_dir / "bm25.json")
+    else:
+        stream = ((chunk_id(doc), doc) for doc in iter_docs(directory=directory))
+        chunks = len(
+            index_chunks(
+                client, stream, embeddings, EMBED_BATCH_SIZE, UPSERT_BATCH_SIZE
+            )
+        )
+        embedded = time.perf_counter()
+        BM25Index.build_on_disk(
+            ((chunk_id(doc), doc) for doc in iter_docs(directory=directory)),
+            lexical_dir / "bm25.json",
+        )
+    finished = time.perf_counter()
+    shutil.rmtree(lexical_dir)
+    return {
+        "chunks": chunks,
+        "chunks/s": chunks / (embedded - started),
+        "bm25 s": finished - embedded,
+        "peak MB": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main(copies: list[int]):
+    print(
+        f"{'copies':>6} {'mode':<7} {'chunks':>7} {'chunks/s':>9} "
+        f"{'bm25 s':>7} {'peak MB':>8}"
+    )
+    for count in copies:
+        directory = Path(tempfile.mkdtemp(prefix="bench_indexing_"))
+        try:
+            make_corpus(directory, count)
+            for mode in ("list", "stream"):
+                output = subprocess.run(
+                    [sys.executable, __file__, "--run", mode, str(directory)],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                ).stdout
+                stats = json.loads(output.splitlines()[-1])
+                print(
+                    f"{count:>6} {mode:<7} {stats['chunks']:>7} "
+                    f"{stats['chunks/s']:>9.0f} {stats['bm25 s']:>7.1f} "
+                    f"{stats['peak MB']:>8.0f}"
+                )
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--copies", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument(
+        "--run", nargs=2, metavar=("MODE", "DIR"), help=argparse.SUPPRESS
+    )
+    args = parser.parse_args()
+
+    if args.run:
+        mode, directory = args.run
+        print(json.dumps(run(mode, Path(directory))))
+    else:
+        main(args.copies)
@@ -0,0 +1,85 @@
+"""
+Structured menu engine against the full answer pipeline.
+
+Times building the engine and answering templated queries through the
+fast path. With --full, also runs every query through `generate_answer`
+(needs GOOGLE_API_KEY and a built knowledge base) with the fast path off.
+
+Usage: PYTHONPATH=. python benchmarks/bench_menu_engine.py [--full]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from kb.menu_engine import MenuEngine, answer_structured_query
+
+QUERIES = [
+    "veg items under ₹200 at Burger King",
+    "cheapest dessert",
+    "what's open after 11pm",
+    "most expensive burger at McDonald's",
+    "non-veg items under 150 at McDonald's",
+    "cheapest pizza at Vint Club",
+    "spicy burgers under 200",
+]
+
+
+def check_price_bounds(engine: MenuEngine):
+    """Items priced exactly at a bound match inclusive bounds only."""
+    price = engine.prices[0]
+    for kwargs, included in [
+        ({"min_price": price}, True),
+        ({"min_price": price, "strict_min": True}, False),
+        ({"max_price": price}, True),
+        ({"max_price": price, "strict_max": True}, False),
+    ]:
+        items = engine.filter_items(**kwargs)
+        assert any(engine.prices[i] == price for i in items) is included, kwargs
+
+
+def time_us(fn, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    engine = MenuEngine.from_dir()
+    print(f"engine build: {(time.perf_counter() - started) * 1000:.1f} ms")
+    check_price_bounds(engine)
+
+    full = None
+    if args.full:
+        sys.path.insert(0, "chatbot")
+        import generator
+
+        generator.STRUCTURED_FAST_PATH = False
+        full = generator
+
+    print(f"\n{'query':<42} {'engine µs':>10} {'full s':>8}")
+    for query in QUERIES:
+        assert answer_structured_query(engine, query) is not None, query
+        engine_us = time_us(
+            lambda q=query: answer_structured_query(engine, q), args.runs
+        )
+        full_s = ""
+        if full is not None:
+            started = time.perf_counter()
+            full.generate_answer(query)
+            full_s = f"{time.perf_counter() - started:.2f}"
+        print(f"{query:<42} {engine_us:>10.1f} {full_s:>8}")
+
+
+if __name__ == "__main__":
+    main()
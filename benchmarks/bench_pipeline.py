@@ -0,0 +1,74 @@
+"""
+Per-stage timing breakdown for the answer pipeline.
+
+Runs a short scripted conversation through `agenerate_answer` and prints
+the mean time per stage. "overlap saved" is how much of retrieval ran
+while reformulation was still in flight. Also times the prompt, agent and
+executor construction that every request used to pay.
+
+Needs GOOGLE_API_KEY and a built knowledge base.
+
+Usage: PYTHONPATH=. python benchmarks/bench_pipeline.py
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+
+sys.path.insert(0, "chatbot")
+
+import generator
+from langchain.agents import AgentExecutor, create_tool_calling_agent
+
+CONVERSATION = [
+    "What burgers does Burger King have?",
+    "Which of them are vegetarian?",
+    "What is the price of McAloo Tikki at McDonald's?",
+    "And how about the fries there?",
+    "Is there a buffet at The Big Grill?",
+]
+
+
+def construction_cost(runs: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(runs):
+        agent = create_tool_calling_agent(
+            generator.llm, generator.TOOLS, generator.agent_prompt
+        )
+        AgentExecutor(agent=agent, tools=generator.TOOLS, verbose=False)
+    return (time.perf_counter() - started) / runs
+
+
+async def run_conversation() -> list[dict[str, float]]:
+    session_id = None
+    timings = []
+    for query in CONVERSATION:
+        result = await generator.agenerate_answer(query, session_id=session_id)
+        session_id = result.session_id
+        timings.append(result.timings)
+    return timings
+
+
+def main():
+    print(
+        f"agent construction per request (old path): {construction_cost() * 1000:.1f} ms"
+    )
+
+    generator.get_relevant_chunks("warm up")  # load the model outside the timings
+    timings = asyncio.run(run_conversation())
+
+    stages = ["reformulation", "retrieval", "retrieval_rewrite", "agent", "total"]
+    print(f"\n{'stage':<18} {'mean s':>7}")
+    for stage in stages:
+        values = [t.get(stage, 0.0) for t in timings]
+        print(f"{stage:<18} {statistics.mean(values):>7.3f}")
+
+    saved = statistics.mean(
+        min(t.get("reformulation", 0.0), t.get("retrieval", 0.0)) for t in timings
+    )
+    print(f"{'overlap saved':<18} {saved:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Recall@TOP_K, search latency and vector memory for each storage setting.
+
+Local-mode Qdrant stores float32 vectors whatever the collection config
+says, so quantization is reproduced here with numpy the way a Qdrant server
+does it: int8 codes over the 0.99 quantile range, 1-bit sign codes compared
+by Hamming distance, and optional rescoring of VECTOR_OVERSAMPLING x TOP_K
+candidates with the original vectors. Truncation keeps the leading
+dimensions and renormalizes, as `CachedEmbeddings` does.
+
+Ground truth is exact float32 search at full dimension. The chunk vectors
+are expanded with noisy blends of chunk pairs to --points so latency and memory are measurable.
+Vectors come from the embedding cache/model; --stand-in uses a dense random
+projection of hashed token features instead.
+
+Usage: PYTHONPATH=. python benchmarks/bench_quantization.py [--points N] [--stand-in]
+"""
+
+import argparse
+import hashlib
+import time
+from itertools import pairwise
+
+import numpy as np
+
+from benchmarks.bench_retrieval import build_queries
+from config.rag_config import EMBEDDING_DIM, TOP_K, VECTOR_OVERSAMPLING
+from kb.lexical_index import tokenize
+from kb.preprocess import extract_docs
+
+DIMENSIONS = [EMBEDDING_DIM, 512, 256]
+SETTINGS = [
+    ("float32", False),
+    ("int8", False),
+    ("int8", True),
+    ("binary", False),
+    ("binary", True),
+]
+
+
+def hashed_embedding(text: str) -> np.ndarray:
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    tokens = tokenize(text)
+    for feature in tokens + [f"{a} {b}" for a, b in pairwise(tokens)]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest())
+        vector[h % EMBEDDING_DIM] += 1.0 if h >> 63 else -1.0
+    return vector
+
+
+def stand_in_projection() -> np.ndarray:
+    """
+    Dense random projection whose output variance decays with the index,
+    so leading dimensions carry most of the signal as in Matryoshka models.
+    """
+    rng = np.random.default_rng(0)
+    decay = 1 / np.sqrt(1 + np.arange(EMBEDDING_DIM) / 64)
+    return rng.normal(size=(EMBEDDING_DIM, EMBEDDING_DIM)) * decay
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def embed(texts: list[str], stand_in: bool) -> np.ndarray:
+    if stand_in:
+        hashed = np.stack([hashed_embedding(text) for text in texts])
+        return normalize(hashed @ stand_in_projection())
+    from utils.embedding_cache import get_embeddings
+
+    return normalize(np.asarray(get_embeddings(dimensions=None).embed_documents(texts)))
+
+
+class Index:
+    def __init__(self, vectors: np.ndarray, quantization: str, rescore: bool):
+        self.vectors = vectors
+        self.quantization = quantization
+        self.rescore = rescore
+        if quantization == "int8":
+            low, high = np.quantile(vectors, [0.005, 0.995])
+            scale = (high - low) / 255
+            self.codes = np.round((np.clip(vectors, low, high) - low) / scale)
+            self.codes = self.codes.astype(np.uint8)
+        elif quantization == "binary":
+            self.codes = np.packbits(vectors > 0, axis=1)
+
+    def memory_bytes(self) -> int:
+        """Vectors searched in RAM; originals are assumed on disk when quantized."""
+        if self.quantization == "float32":
+            return self.vectors.nbytes
+        return self.codes.nbytes
+
+    def _candidates(self, query: np.ndarray, k: int) -> np.ndarray:
+        if self.quantization == "float32":
+            scores = self.vectors @ query
+        elif self.quantization == "int8":
+            scores = self.codes @ query  # the affine offset does not change the order
+        else:
+            bits = np.packbits(query > 0)
+            scores = -np.bitwise_count(self.codes ^ bits).sum(axis=1, dtype=np.int32)
+        top = np.argpartition(-scores, k)[:k]
+        return top[np.argsort(-scores[top])]
+
+    def search(self, query: np.ndarray, k: int) -> np.ndarray:
+        if not self.rescore:
+            return self._candidates(query, k)
+        candidates = self._candidates(query, int(k * VECTOR_OVERSAMPLING))
+        scores = self.vectors[candidates] @ query
+        return candidates[np.argsort(-scores)[:k]]
+
+
+def main(points: int, queries: int, stand_in: bool):
+    chunks = embed([doc.page_content for doc in extract_docs()], stand_in)
+    # Synthetic points are noisy blends of two real chunks
+    rng = np.random.default_rng(7)
+    pairs = rng.integers(0, len(chunks), (points, 2))
+    weights = rng.random((points, 1))
+    noise = rng.normal(0, 0.5 / np.sqrt(EMBEDDING_DIM), (points, EMBEDDING_DIM))
+    corpus = normalize(
+        weights * chunks[pairs[:, 0]] + (1 - weights) * chunks[pairs[:, 1]] + noise
+    )
+    corpus[: len(chunks)] = chunks
+    corpus = corpus.astype(np.float32)
+    query_vectors = embed([q for q, _, _ in build_queries(queries)], stand_in)
+
+    truth = [
+        set(np.argpartition(-(corpus @ q), TOP_K)[:TOP_K].tolist())
+        for q in query_vectors
+    ]
+
+    print(f"{points} points, {len(query_vectors)} queries, recall@{TOP_K}\n")
+    print(
+        f"{'dims':>5} {'storage':<15} {'recall':>7} {'p50 ms':>7} {'p99 ms':>7} {'RAM MB':>7}"
+    )
+    for dims in DIMENSIONS:
+        vectors = normalize(corpus[:, :dims])
+        truncated_queries = normalize(query_vectors[:, :dims]).astype(np.float32)
+        for quantization, rescore in SETTINGS:
+            index = Index(vectors, quantization, rescore)
+            latencies, hits = [], 0
+            for query, expected in zip(truncated_queries, truth, strict=True):
+                started = time.perf_counter()
+                found = index.search(query, TOP_K)
+                latencies.append((time.perf_counter() - started) * 1000)
+                hits += len(expected & set(found.tolist()))
+            label = quantization + (" + rescore" if rescore else "")
+            print(
+                f"{dims:>5} {label:<15} {hits / (TOP_K * len(truth)):>7.3f} "
+                f"{np.percentile(latencies, 50):>7.2f} {np.percentile(latencies, 99):>7.2f} "
+                f"{index.memory_bytes() / 1e6:>7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--stand-in", action="store_true")
+    args = parser.parse_args()
+    main(args.points, args.queries, args.stand_in)
@@ -0,0 +1,91 @@
+"""
+Recall and latency of lexical, vector and hybrid (RRF) retrieval.
+
+Queries are generated from the processed menus ("price of <item> at
+<restaurant>"); a query counts as recalled when a chunk from that
+restaurant listing the item is in the top TOP_K.
+
+Needs `make knowledge_base` to have run. Pass --lexical-only to skip the
+embedding model.
+
+Usage: PYTHONPATH=. python benchmarks/bench_retrieval.py [--queries N]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, "chatbot")
+
+import retriever
+
+from config.rag_config import PROCESSED_JSON_DIR, TOP_K
+
+
+def build_queries(n: int, seed: int = 7) -> list[tuple[str, str, str]]:
+    pairs = []
+    for path in sorted(PROCESSED_JSON_DIR.glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for section in data["menu"]:
+            for item in section["items"]:
+                pairs.append((data["restaurant_name"], item["item_name"]))
+    random.Random(seed).shuffle(pairs)
+    return [
+        (f"price of {item} at {restaurant}", restaurant, item)
+        for restaurant, item in pairs[:n]
+    ]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def evaluate(name: str, search, queries):
+    hits, latencies = 0, []
+    for query, restaurant, item in queries:
+        started = time.perf_counter()
+        docs = search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += any(
+            doc.metadata.get("restaurant") == restaurant and item in doc.page_content
+            for doc in docs
+        )
+    print(
+        f"{name:<10} {hits / len(queries):>9.2%} "
+        f"{statistics.median(latencies):>8.3f} {percentile(latencies, 99):>8.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--lexical-only", action="store_true")
+    args = parser.parse_args()
+
+    queries = build_queries(args.queries)
+    retriever.get_lexical_index()
+
+    print(f"{len(queries)} queries, recall@{TOP_K}")
+    print(f"{'mode':<10} {'recall':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    evaluate("lexical", lambda q: retriever.lexical_search(q, TOP_K), queries)
+    if args.lexical_only:
+        return
+
+    retriever.warm_up(background=False)
+    evaluate("vector", lambda q: retriever.vector_search(q, TOP_K), queries)
+
+    def hybrid(query):
+        lexical = retriever.lexical_search(query, TOP_K)
+        vector = retriever.vector_search(query, TOP_K)
+        return retriever.reciprocal_rank_fusion([vector, lexical])
+
+    evaluate("hybrid", hybrid, queries)
+
+
+if __name__ == "__main__":
+    main()
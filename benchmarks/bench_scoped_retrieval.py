@@ -0,0 +1,96 @@
+"""
+Scoped vs unscoped retrieval for queries that name a restaurant.
+
+Uses the same "price of <item> at <restaurant>" queries as
+bench_retrieval.py. Precision is the share of the TOP_K chunks that belong
+to the named restaurant, recall whether the chunk listing the item is
+among them, and "points" the average number of chunks the search could
+consider.
+
+Needs `make knowledge_base` to have run. Pass --lexical-only to skip the
+embedding model.
+
+Usage: PYTHONPATH=. python benchmarks/bench_scoped_retrieval.py [--queries N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+sys.path.insert(0, "chatbot")
+
+import retriever
+
+from benchmarks.bench_retrieval import build_queries, percentile
+from config.rag_config import TOP_K
+
+
+def evaluate(name: str, search, queries, scoped: bool):
+    index = retriever.get_lexical_index()
+    precision, hits, points, latencies = [], 0, [], []
+    for query, restaurant, item in queries:
+        started = time.perf_counter()
+        scope = retriever.query_scope(query) if scoped else {}
+        docs = search(query, scope)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        precision.append(
+            sum(doc.metadata.get("restaurant") == restaurant for doc in docs)
+            / max(1, len(docs))
+        )
+        hits += any(
+            doc.metadata.get("restaurant") == restaurant and item in doc.page_content
+            for doc in docs
+        )
+        points.append(
+            sum(index._in_scope(i, scope) for i in range(len(index.ids)))
+            if scope
+            else len(index.ids)
+        )
+    label = f"{name} {'scoped' if scoped else 'all'}"
+    print(
+        f"{label:<16} {statistics.mean(precision):>9.2%} {hits / len(queries):>7.2%} "
+        f"{statistics.mean(points):>7.0f} {statistics.median(latencies):>8.3f} "
+        f"{percentile(latencies, 99):>8.3f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--lexical-only", action="store_true")
+    args = parser.parse_args()
+
+    queries = build_queries(args.queries)
+    retriever.get_lexical_index()
+    retriever.get_entity_lookup()
+
+    def lexical(query, scope):
+        return retriever.lexical_search(query, TOP_K, scope)
+
+    def vector(query, scope):
+        return retriever.vector_search(query, TOP_K, scope)
+
+    def hybrid(query, scope):
+        return retriever.reciprocal_rank_fusion(
+            [vector(query, scope), lexical(query, scope)]
+        )
+
+    modes = [("lexical", lexical)]
+    if not args.lexical_only:
+        retriever.warm_up(background=False)
+        modes += [("vector", vector), ("hybrid", hybrid)]
+
+    print(f"{len(queries)} queries, top {TOP_K}")
+    print(
+        f"{'mode':<16} {'precision':>9} {'recall':>7} {'points':>7} "
+        f"{'p50 ms':>8} {'p99 ms':>8}"
+    )
+    for name, search in modes:
+        for scoped in (False, True):
+            evaluate(name, search, queries, scoped)
+
+
+if __name__ == "__main__":
+    main()
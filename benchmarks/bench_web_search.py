@@ -0,0 +1,96 @@
+"""
+Web search layer against a local stub backend with a fixed delay.
+
+Replays a tool-call workload with repeated and concurrent queries and
+compares a fresh backend call per query (the old behaviour) with the
+cached, coalescing `WebSearch`. A last run uses a backend slower than the
+latency budget to show the knowledge-base fallback.
+
+Usage: PYTHONPATH=. python benchmarks/bench_web_search.py
+"""
+
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, "chatbot")
+
+from web_search import WebSearch
+
+BACKEND_DELAY = 0.3
+QUERIES = [
+    "burger king hazratganj menu",
+    "burger king hazratganj reviews",
+    "mcdonalds lucknow opening hours",
+    "vint club lucknow buffet price",
+    "the big grill gomti nagar reviews",
+]
+
+
+class StubBackend:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query: str) -> str:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return f"results for {query}"
+
+
+def workload(n: int = 40, seed: int = 3) -> list[list[str]]:
+    """Tool calls of one to three sub-queries, with casing/spacing variants."""
+    rng = random.Random(seed)
+    calls = []
+    for _ in range(n):
+        picked = rng.sample(QUERIES, rng.randint(1, 3))
+        calls.append([q.upper() if rng.random() < 0.3 else q for q in picked])
+    return calls
+
+
+def run(name: str, tool_call, calls: list[list[str]], backend: StubBackend):
+    latencies = []
+
+    def timed(queries):
+        started = time.perf_counter()
+        tool_call(queries)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(timed, calls))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    print(
+        f"{name:<12} {elapsed:>7.2f} {latencies[len(latencies) // 2]:>8.3f} "
+        f"{latencies[-1]:>8.3f} {backend.calls:>8}"
+    )
+
+
+def main():
+    calls = workload()
+    print(
+        f"{len(calls)} tool calls, {sum(map(len, calls))} queries, backend {BACKEND_DELAY}s"
+    )
+    print(f"{'mode':<12} {'wall s':>7} {'p50 s':>8} {'max s':>8} {'backend':>8}")
+
+    backend = StubBackend(BACKEND_DELAY)
+    run("uncached", lambda qs: [backend(q) for q in qs], calls, backend)
+
+    backend = StubBackend(BACKEND_DELAY)
+    search = WebSearch(backend)
+    run("web_search", search.search_many, calls, backend)
+    print(f"stats: {search.stats()}")
+
+    backend = StubBackend(2.0)
+    search = WebSearch(backend, fallback=lambda q: "kb context", timeout=0.5)
+    run("over budget", search.search_many, calls[:8], backend)
+    print(f"stats: {search.stats()}")
+
+
+if __name__ == "__main__":
+    main()
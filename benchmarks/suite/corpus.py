@@ -0,0 +1,333 @@
+"""
+Synthetic restaurant corpus for the benchmark suite.
+
+Restaurants are generated from a seed, so every run of a given size sees
+the same data. They are written as raw `Restaurant` JSON, the format the
+scrapers produce, with a share of prices in foreign currencies so
+preprocessing has conversions to do. `get_page` renders the same
+restaurants as Zomato getPage responses for the scrape benchmark.
+
+Usage: PYTHONPATH=. python -m benchmarks.suite.corpus OUT_DIR [--restaurants N]
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass
+from pathlib import Path
+
+CITIES = ["Lucknow", "Delhi", "Mumbai", "Bengaluru", "Pune", "Jaipur", "Kolkata"]
+CUISINES = [
+    "North Indian",
+    "South Indian",
+    "Chinese",
+    "Italian",
+    "Mughlai",
+    "Street Food",
+    "Fast Food",
+    "Desserts",
+    "Beverages",
+    "Biryani",
+]
+NAME_WORDS = [
+    "Royal",
+    "Spice",
+    "Garden",
+    "Tandoor",
+    "Urban",
+    "Masala",
+    "Golden",
+    "Coastal",
+    "Curry",
+    "Grill",
+    "Dhaba",
+    "Kitchen",
+    "Bistro",
+    "Cafe",
+]
+SECTIONS = [
+    "Starters",
+    "Main Course",
+    "Breads",
+    "Rice and Biryani",
+    "Burgers",
+    "Pizzas",
+    "Desserts",
+    "Beverages",
+    "Combos",
+    "Soups",
+]
+DISH_BASES = [
+    "Paneer",
+    "Chicken",
+    "Mutton",
+    "Dal",
+    "Veg",
+    "Prawn",
+    "Mushroom",
+    "Aloo",
+    "Egg",
+    "Fish",
+]
+DISH_STYLES = [
+    "Tikka",
+    "Masala",
+    "Biryani",
+    "Kebab",
+    "Curry",
+    "Burger",
+    "Wrap",
+    "Pizza",
+    "Roll",
+    "Korma",
+]
+HIGHLIGHTS = [
+    "Home Delivery",
+    "Takeaway Available",
+    "Indoor Seating",
+    "Outdoor Seating",
+    "Family Friendly",
+    "Serves Jain Food",
+    "Buffet",
+    "Live Music",
+]
+TAGS = ["veg", "non-veg", "spicy", "sf-not-vegan", "delivery-enabled", "bestseller"]
+REVIEW_PHRASES = [
+    "Great taste and quick delivery",
+    "The portion was small for the price",
+    "Loved the ambience and the staff",
+    "Food arrived cold",
+    "Best biryani in the area",
+    "Too oily for my liking",
+    "Fresh ingredients and good packaging",
+    "Will order again",
+]
+HOURS = ["11am – 11pm", "12noon – 4pm, 7pm – 11pm", "9am – 12midnight"]
+FOREIGN_CURRENCIES = ["USD", "EUR", "GBP"]
+
+
+@dataclass(frozen=True)
+class CorpusSpec:
+    restaurants: int = 500
+    sections: int = 6  # menu sections per restaurant
+    items: int = 10  # items per section
+    reviews: int = 10  # reviews per restaurant
+    foreign_share: float = 0.05  # items priced in USD/EUR/GBP
+    seed: int = 42
+
+
+def make_restaurant(rng: random.Random, index: int, spec: CorpusSpec) -> dict:
+    """One raw restaurant record, as the scrapers write it."""
+    name = f"{rng.choice(NAME_WORDS)} {rng.choice(NAME_WORDS)} {index}"
+    city = rng.choice(CITIES)
+    cuisines = rng.sample(CUISINES, 3)
+
+    menu = []
+    for section in rng.sample(SECTIONS, min(spec.sections, len(SECTIONS))):
+        items = []
+        for _ in range(spec.items):
+            dish = f"{rng.choice(DISH_BASES)} {rng.choice(DISH_STYLES)}"
+            foreign = rng.random() < spec.foreign_share
+            items.append(
+                {
+                    "item_name": dish,
+                    "description": f"{dish} from our {section.lower()}, "
+                    f"made with {rng.choice(DISH_BASES).lower()} and house spices.",
+                    "price": round(rng.uniform(2, 12), 2)
+                    if foreign
+                    else float(rng.randrange(49, 899)),
+                    "currency": rng.choice(FOREIGN_CURRENCIES) if foreign else "INR",
+                    "tags": rng.sample(TAGS, 2),
+                }
+            )
+        menu.append({"section": section, "items": items})
+
+    return {
+        "restaurant_name": name,
+        "description": ", ".join(cuisines),
+        "location": {
+            "address": f"{rng.randrange(1, 200)}, Sector {rng.randrange(1, 30)}, {city}",
+            "city": city,
+            "pincode": None,
+            "latitude": round(rng.uniform(8, 32), 4),
+            "longitude": round(rng.uniform(68, 90), 4),
+        },
+        "contact": {
+            "phone": f"+91{rng.randrange(10**9, 10**10)}",
+            "email": None,
+            "website": None,
+        },
+        "operating_hours": {"Mon-Sun": rng.choice(HOURS)},
+        "features": [
+            f"Cost for Two: ₹{rng.randrange(2, 30) * 100} for two people (approx.)",
+            *(f"Highlight: {h}" for h in rng.sample(HIGHLIGHTS, 3)),
+            *(f"Cuisine: {c}" for c in cuisines),
+        ],
+        "menu": menu,
+        "reviews": [
+            {
+                "rating": float(rng.randrange(1, 6)),
+                "review_text": f"{rng.choice(REVIEW_PHRASES)}. {rng.choice(REVIEW_PHRASES)}.",
+            }
+            for _ in range(spec.reviews)
+        ],
+    }
+
+
+def make_corpus(spec: CorpusSpec) -> list[dict]:
+    rng = random.Random(spec.seed)
+    return [make_restaurant(rng, index, spec) for index in range(spec.restaurants)]
+
+
+def write_corpus(spec: CorpusSpec, directory: Path) -> list[dict]:
+    """Write the corpus as one raw JSON file per restaurant."""
+    directory.mkdir(parents=True, exist_ok=True)
+    restaurants = make_corpus(spec)
+    for data in restaurants:
+        with open(
+            directory / f"{data['restaurant_name']}.json", "w", encoding="utf-8"
+        ) as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+    return restaurants
+
+
+def get_page(data: dict, path: str) -> dict:
+    """
+    The getPage response `ZomatoScraper` reads for `path` ("", "/order" or
+    "/reviews"), holding only the fields it extracts.
+    """
+    if path == "/reviews":
+        return {
+            "entities": {
+                "REVIEWS": {
+                    str(i): {"reviewText": r["review_text"], "ratingV2": r["rating"]}
+                    for i, r in enumerate(data["reviews"])
+                }
+            }
+        }
+
+    features = data["features"]
+    if path == "":
+        return {
+            "page_data": {
+                "sections": {
+                    "SECTION_BASIC_INFO": {"cuisine_string": data["description"]},
+                    "SECTION_RES_DETAILS": {
+                        "CFT_DETAILS": {
+                            "cfts": [
+                                {"title": f.split(": ", 1)[1], "subtitle": ""}
+                                for f in features
+                                if f.startswith("Cost for Two: ")
+                            ]
+                        },
+                        "HIGHLIGHTS": {
+                            "highlights": [
+                                {"text": f.split(": ", 1)[1]}
+                                for f in features
+                                if f.startswith("Highlight: ")
+                            ]
+                        },
+                        "CUISINES": {
+                            "cuisines": [
+                                {"name": f.split(": ", 1)[1]}
+                                for f in features
+                                if f.startswith("Cuisine: ")
+                            ]
+                        },
+                    },
+                }
+            }
+        }
+
+    location = data["location"]
+    return {
+        "location": {
+            "cityName": location["city"],
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
+        },
+        "page_data": {
+            "order": {
+                "menuList": {
+                    "menus": [
+                        {
+                            "menu": {
+                                "name": section["section"],
+                                "categories": [
+                                    {
+                                        "category": {
+                                            "name": "",
+                                            "items": [
+                                                {
+                                                    "item": {
+                                                        "name": item["item_name"],
+                                                        "desc": item["description"],
+                                                        "display_price": item["price"],
+                                                        "tag_slugs": item["tags"],
+                                                    }
+                                                }
+                                                for item in section["items"]
+                                            ],
+                                        }
+                                    }
+                                ],
+                            }
+                        }
+                        for section in data["menu"]
+                    ]
+                }
+            },
+            "sections": {
+                "SECTION_BASIC_INFO": {
+                    "name": data["restaurant_name"],
+                    "timing": {
+                        "customised_timings": {
+                            "opening_hours": [
+                                {"days": days, "timing": timing}
+                                for days, timing in data["operating_hours"].items()
+                            ]
+                        }
+                    },
+                },
+                "SECTION_RES_CONTACT": {
+                    "address": location["address"],
+                    "phoneDetails": {"phoneStr": data["contact"]["phone"]},
+                },
+            },
+        },
+    }
+
+
+def make_queries(restaurants: list[dict], count: int, seed: int = 7) -> list[str]:
+    """A reproducible mix of item, cuisine-by-city and review questions."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        data = rng.choice(restaurants)
+        kind = rng.random()
+        if kind < 0.5:
+            item = rng.choice(rng.choice(data["menu"])["items"])
+            queries.append(f"price of {item['item_name']} at {data['restaurant_name']}")
+        elif kind < 0.8:
+            cuisine = rng.choice(data["description"].split(", "))
+            queries.append(f"{cuisine} restaurants in {data['location']['city']}")
+        else:
+            queries.append(f"what do people say about {data['restaurant_name']}")
+    return queries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic raw corpus")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--restaurants", type=int, default=CorpusSpec.restaurants)
+    parser.add_argument("--sections", type=int, default=CorpusSpec.sections)
+    parser.add_argument("--items", type=int, default=CorpusSpec.items)
+    parser.add_argument("--reviews", type=int, default=CorpusSpec.reviews)
+    parser.add_argument("--seed", type=int, default=CorpusSpec.seed)
+    args = parser.parse_args()
+
+    spec = CorpusSpec(
+        args.restaurants, args.sections, args.items, args.reviews, seed=args.seed
+    )
+    write_corpus(spec, args.output)
+    print(f"Wrote {spec.restaurants} restaurants to {args.output}")
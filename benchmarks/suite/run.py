@@ -0,0 +1,201 @@
+"""
+Reproducible benchmark suite: scrape, preprocess, chunking, index build
+and retrieval over a synthetic corpus, offline.
+
+Each stage runs in its own process and reports its throughput or latency
+plus peak RSS. Embeddings come from a hashing stand-in, so the numbers
+measure the pipeline rather than the encoder. With --compare, results are
+checked against a stored baseline and the exit status is 1 when a metric
+is worse than the baseline by more than --tolerance.
+
+Usage:
+    PYTHONPATH=. python -m benchmarks.suite.run [--restaurants N] [--queries N]
+        [--compare [BASELINE]] [--save [BASELINE]] [--tolerance 0.25]
+
+BASELINE defaults to benchmarks/suite/baseline.json.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+from benchmarks.suite.corpus import CorpusSpec, write_corpus
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_QUERIES = 200
+DEFAULT_TOLERANCE = 0.25
+
+
+def better(metric: str) -> str:
+    """'higher' or 'lower' for compared metrics, '' for plain counts."""
+    if metric.endswith("_per_s"):
+        return "higher"
+    if metric.endswith(("_ms", "_us", "_mb")):
+        return "lower"
+    return ""
+
+
+def run_stage(name: str, workdir: Path, spec: CorpusSpec, queries: int) -> dict:
+    """Run one stage in this process; its metrics plus peak RSS."""
+    from benchmarks.suite.stages import STAGES, peak_rss_mb
+
+    metrics = STAGES[name](workdir, spec, queries)
+    if "skipped" not in metrics:
+        metrics["peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+def run_suite(spec: CorpusSpec, queries: int) -> dict:
+    from benchmarks.suite.stages import STAGES
+
+    workdir = Path(tempfile.mkdtemp(prefix="nugget_bench_"))
+    results = {}
+    try:
+        started = time.perf_counter()
+        write_corpus(spec, workdir / "raw")
+        print(
+            f"Corpus: {spec.restaurants} restaurants in "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+        for name in STAGES:
+            completed = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    "benchmarks.suite.run",
+                    "--stage",
+                    name,
+                    str(workdir),
+                    "--spec",
+                    json.dumps(asdict(spec)),
+                    "--queries",
+                    str(queries),
+                ],
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            if completed.returncode != 0:
+                sys.stderr.write(completed.stderr[-4000:])
+                raise SystemExit(f"Stage {name} failed")
+            results[name] = json.loads(completed.stdout.splitlines()[-1])
+            print(f"  {name:<10} {format_metrics(results[name])}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "config": {**asdict(spec), "queries": queries},
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def format_metrics(metrics: dict) -> str:
+    if "skipped" in metrics:
+        return f"skipped: {metrics['skipped']}"
+    return ", ".join(
+        f"{k}={v:.1f}" if isinstance(v, float) else f"{k}={v}"
+        for k, v in metrics.items()
+    )
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print the comparison and return the regressed metrics."""
+    if current["config"] != baseline["config"]:
+        print(
+            "\n[!] Baseline was recorded with a different configuration: "
+            f"{baseline['config']}"
+        )
+
+    regressions = []
+    print(f"\n{'metric':<32} {'baseline':>10} {'current':>10} {'change':>8}")
+    for stage, metrics in current["results"].items():
+        before = baseline["results"].get(stage, {})
+        for metric, value in metrics.items():
+            direction = better(metric)
+            old = before.get(metric)
+            if not direction or not isinstance(old, (int, float)) or not old:
+                continue
+            change = (value - old) / old
+            worse = -change if direction == "higher" else change
+            flag = ""
+            if worse > tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{stage}.{metric}")
+            print(
+                f"{stage + '.' + metric:<32} {old:>10.1f} {value:>10.1f} "
+                f"{change:>+8.1%}{flag}"
+            )
+    return regressions
+
+
+def main(args: argparse.Namespace) -> int:
+    spec = CorpusSpec(
+        restaurants=args.restaurants,
+        sections=args.sections,
+        items=args.items,
+        reviews=args.reviews,
+    )
+    report = run_suite(spec, args.queries)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if args.save:
+        args.save.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nSaved baseline to {args.save}")
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(
+                f"\n[!] {len(regressions)} metrics regressed by more than "
+                f"{args.tolerance:.0%}: {', '.join(regressions)}"
+            )
+            return 1
+        print(f"\n[✓] No metric regressed by more than {args.tolerance:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--restaurants", type=int, default=CorpusSpec.restaurants)
+    parser.add_argument("--sections", type=int, default=CorpusSpec.sections)
+    parser.add_argument("--items", type=int, default=CorpusSpec.items)
+    parser.add_argument("--reviews", type=int, default=CorpusSpec.reviews)
+    parser.add_argument("--queries", type=int, default=DEFAULT_QUERIES)
+    parser.add_argument("--output", type=Path, help="write this run's results")
+    parser.add_argument(
+        "--save",
+        type=Path,
+        nargs="?",
+        const=BASELINE_PATH,
+        help="store this run as the baseline",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="?",
+        const=BASELINE_PATH,
+        help="baseline to compare against",
+    )
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--stage", help=argparse.SUPPRESS)
+    parser.add_argument("workdir", nargs="?", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--spec", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        spec = CorpusSpec(**json.loads(args.spec))
+        print(json.dumps(run_stage(args.stage, args.workdir, spec, args.queries)))
+    else:
+        sys.exit(main(args))
@@ -0,0 +1,244 @@
+"""
+The stages the suite times, each run in a fresh process by `run.py` so
+peak RSS is per stage. Stages read what the previous ones left in the
+work directory: raw JSON -> processed JSON -> Qdrant collection, BM25
+index and entity lookup -> queries.
+"""
+
+import asyncio
+import contextlib
+import json
+import resource
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.suite.corpus import CorpusSpec, get_page, make_corpus, make_queries
+from config.rag_config import QDRANT_COLLECTION_NAME, VECTOR_DIM
+from config.scrape_config import CRAWL_WORKERS
+from utils.offline_embeddings import HashingEmbeddings
+
+SCRAPED_RESTAURANTS = 50  # the scrape stage only needs enough for a steady rate
+
+
+def stand_in_embeddings(workdir: Path) -> Embeddings:
+    """The stand-in behind the same cache indexing and retrieval use."""
+    from utils.embedding_cache import CachedEmbeddings, EmbeddingCache
+
+    return CachedEmbeddings(
+        "hashing-stand-in",
+        HashingEmbeddings,
+        cache=EmbeddingCache(workdir / "embeddings.db"),
+        dimensions=VECTOR_DIM,
+    )
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def scrape(workdir: Path, spec: CorpusSpec, queries: int) -> dict:
+    """`ZomatoScraper` through the crawl engine against a local getPage stand-in."""
+    try:
+        import requests_cache
+
+        # Importing the scraper creates its response cache in the working
+        # directory; keep it in the stage's workdir
+        with contextlib.chdir(workdir):
+            from scrapers.sources.zomato_scraper import ZomatoScraper
+    except ImportError as e:
+        return {"skipped": f"scraper dependency {e.name} is not installed"}
+    from models.resturant import Restaurant
+    from scrapers.crawler import crawl
+    from scrapers.http_client import CrawlHttpClient, HostRateLimiter
+
+    # The scraper module caches every response on import, which would turn
+    # the stand-in into a SQLite benchmark
+    requests_cache.uninstall_cache()
+
+    restaurants = make_corpus(spec)[:SCRAPED_RESTAURANTS]
+    pages = {
+        f"/r/{index}{path}": json.dumps(get_page(data, path)).encode("utf-8")
+        for index, data in enumerate(restaurants)
+        for path in ("", "/order", "/reviews")
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_GET(self):
+            page_url = parse_qs(urlparse(self.path).query)["page_url"][0]
+            body = pages[page_url]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scrapers = []
+    for index in range(len(restaurants)):
+        scraper = ZomatoScraper(f"/r/{index}")
+        scraper.source_url = f"http://127.0.0.1:{server.server_port}/getPage?page_url="
+        scrapers.append(scraper)
+    http = CrawlHttpClient(HostRateLimiter(rate=1e6, burst=1e6))
+
+    started = time.perf_counter()
+    results = asyncio.run(crawl(scrapers, workers=CRAWL_WORKERS, http=http))
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    scraped = sum(1 for _, r in results if isinstance(r, Restaurant))
+    return {"restaurants": scraped, "restaurants_per_s": scraped / elapsed}
+
+
+def preprocess(workdir: Path, spec: CorpusSpec, queries: int) -> dict:
+    """Raw -> processed JSON, split into parsing, `preprocess_json` and validation."""
+    from models.resturant import Restaurant
+    from preprocessing.json_preprocesser import preprocess_json
+    from utils.exchange_rates import FALLBACK_RATES, pin_exchange_rates
+
+    pin_exchange_rates(FALLBACK_RATES)  # no network, same rates every run
+    output = workdir / "processed"
+    output.mkdir(exist_ok=True)
+
+    parse = convert = validate = write = 0.0
+    files = sorted((workdir / "raw").glob("*.json"))
+    for path in files:
+        t0 = time.perf_counter()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        t1 = time.perf_counter()
+        data = preprocess_json(data)
+        t2 = time.perf_counter()
+        restaurant = Restaurant.model_validate(data)
+        t3 = time.perf_counter()
+        (output / path.name).write_text(
+            restaurant.model_dump_json(indent=2), encoding="utf-8"
+        )
+        t4 = time.perf_counter()
+        parse += t1 - t0
+        convert += t2 - t1
+        validate += t3 - t2
+        write += t4 - t3
+
+    n = len(files)
+    return {
+        "files": n,
+        "files_per_s": n / (parse + convert + validate + write),
+        "json_parse_us": parse / n * 1e6,
+        "preprocess_json_us": convert / n * 1e6,
+        "validation_us": validate / n * 1e6,
+    }
+
+
+def chunking(workdir: Path, spec: CorpusSpec, queries: int) -> dict:
+    """`extract_docs` over the processed corpus."""
+    from kb.preprocess import iter_docs
+
+    started = time.perf_counter()
+    docs = list(iter_docs(directory=workdir / "processed"))
+    elapsed = time.perf_counter() - started
+    return {"chunks": len(docs), "chunks_per_s": len(docs) / elapsed}
+
+
+def index(workdir: Path, spec: CorpusSpec, queries: int) -> dict:
+    """Embed and upsert every chunk, then build the BM25 index and entity lookup."""
+    from qdrant_client import QdrantClient
+
+    from kb.build_index import chunk_id, index_chunks
+    from kb.entities import EntityLookup
+    from kb.lexical_index import BM25Index
+    from kb.preprocess import iter_docs, iter_restaurants
+    from kb.vector_params import quantization_config, vector_params
+
+    processed = workdir / "processed"
+    client = QdrantClient(path=str(workdir / "qdrant"))
+    client.create_collection(
+        collection_name=QDRANT_COLLECTION_NAME,
+        vectors_config=vector_params(),
+        quantization_config=quantization_config(),
+    )
+    embeddings = stand_in_embeddings(workdir)
+
+    started = time.perf_counter()
+    written = index_chunks(
+        client,
+        ((chunk_id(doc), doc) for doc in iter_docs(directory=processed)),
+        embeddings,
+    )
+    embedded = time.perf_counter()
+    BM25Index.build_on_disk(
+        ((chunk_id(doc), doc) for doc in iter_docs(directory=processed)),
+        workdir / "bm25.json",
+    )
+    EntityLookup.build(iter_restaurants(processed)).save(workdir / "entities.json")
+    finished = time.perf_counter()
+    client.close()
+
+    return {
+        "chunks": len(written),
+        "chunks_per_s": len(written) / (embedded - started),
+        "lexical_build_ms": (finished - embedded) * 1000,
+    }
+
+
+def query(workdir: Path, spec: CorpusSpec, queries: int) -> dict:
+    """`get_relevant_chunks` latency over generated questions, after one warm-up query."""
+    from langchain_qdrant import QdrantVectorStore
+    from qdrant_client import QdrantClient
+
+    from kb.entities import EntityLookup
+    from kb.lexical_index import BM25Index
+
+    sys.path.insert(0, "chatbot")
+    import retriever
+
+    client = QdrantClient(path=str(workdir / "qdrant"))
+    retriever.use_stores(
+        QdrantVectorStore(
+            client=client,
+            collection_name=QDRANT_COLLECTION_NAME,
+            embedding=stand_in_embeddings(workdir),
+        ),
+        BM25Index.load(workdir / "bm25.json"),
+        EntityLookup.load(workdir / "entities.json"),
+    )
+    questions = make_queries(make_corpus(spec), queries)
+    retriever.get_relevant_chunks(questions[0])
+
+    latencies = []
+    started = time.perf_counter()
+    for question in questions:
+        t0 = time.perf_counter()
+        retriever.get_relevant_chunks(question)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+    client.close()
+
+    latencies.sort()
+    return {
+        "queries": len(latencies),
+        "queries_per_s": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+    }
+
+
+STAGES = {
+    "scrape": scrape,
+    "preprocess": preprocess,
+    "chunking": chunking,
+    "index": index,
+    "query": query,
+}
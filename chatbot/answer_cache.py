@@ -0,0 +1,185 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+
+import numpy as np
+
+from config.rag_config import (
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    QDRANT_MANIFEST_PATH,
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def query_numbers(query: str) -> tuple[str, ...]:
+    """Numbers in a query; queries differing only in these are not the same."""
+    return tuple(sorted(_NUMBER.findall(query)))
+
+
+@dataclass
+class _Entry:
+    query: str
+    vector: np.ndarray
+    numbers: tuple[str, ...]
+    chunk_ids: frozenset[str]
+    answer: str
+    created: float
+
+
+class SemanticAnswerCache:
+    """
+    Answers keyed by the embedding of their standalone query.
+
+    A lookup hits when a stored query is at least `threshold` cosine-similar
+    and mentions the same numbers ("under 200" is not "under 300").
+    If the retrieved chunk IDs are passed, the stored entry must have been
+    answered from exactly those chunks. Entries expire after `ttl` seconds,
+    the least recently used go first past `max_entries`, and entries whose
+    chunks are no longer in the knowledge base are dropped when
+    `build_index` publishes a new manifest.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], list[float]],
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl: float = ANSWER_CACHE_TTL_SECONDS,
+    ):
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._next_key = 0
+        # Stacked vectors of `_entries`, rebuilt lazily after changes
+        self._matrix: np.ndarray | None = None
+        self._keys: list[int] = []
+        self._lock = threading.Lock()
+
+        self.kb_version: str | None = None
+        self._manifest_mtime: float | None = None
+
+        self.hits = 0
+        self.misses = 0
+        self.miss_seconds = 0.0
+        self.stored = 0
+
+    def _vector(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embed(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _drop(self, keys: Iterable[int]):
+        for key in list(keys):
+            self._entries.pop(key, None)
+        self._matrix = None
+
+    def _refresh_kb_version(self):
+        """Drop entries answered from chunks that a rebuild removed."""
+        try:
+            mtime = QDRANT_MANIFEST_PATH.stat().st_mtime
+        except OSError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+        self._manifest_mtime = mtime
+        try:
+            with open(QDRANT_MANIFEST_PATH, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        version = manifest.get("version")
+        if self.kb_version is not None and version != self.kb_version:
+            chunk_ids = set(manifest.get("chunks", []))
+            stale = [
+                k for k, e in self._entries.items() if not e.chunk_ids <= chunk_ids
+            ]
+            self._drop(stale)
+            logger.info(
+                f"[+] Knowledge base changed, dropped {len(stale)} cached answers"
+            )
+        self.kb_version = version
+
+    def lookup(self, query: str, chunk_ids: Iterable[str] | None = None) -> str | None:
+        vector = self._vector(query)
+        numbers = query_numbers(query)
+        scope = frozenset(chunk_ids) if chunk_ids is not None else None
+        now = time.monotonic()
+
+        with self._lock:
+            self._refresh_kb_version()
+            self._drop(
+                k for k, e in self._entries.items() if now - e.created > self.ttl
+            )
+
+            if self._entries:
+                if self._matrix is None:
+                    self._keys = list(self._entries)
+                    self._matrix = np.stack(
+                        [self._entries[k].vector for k in self._keys]
+                    )
+                similarities = self._matrix @ vector
+                for index in np.argsort(-similarities):
+                    if similarities[index] < self.threshold:
+                        break
+                    key = self._keys[index]
+                    entry = self._entries[key]
+                    if entry.numbers != numbers:
+                        continue
+                    if scope is not None and entry.chunk_ids != scope:
+                        continue
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    logger.info(f"[+] Answer cache hit: {query!r} ~ {entry.query!r}")
+                    return entry.answer
+
+            self.misses += 1
+            return None
+
+    def store(self, query: str, chunk_ids: Iterable[str], answer: str, seconds: float):
+        """Cache an answer; `seconds` is what producing it cost, for the stats."""
+        entry = _Entry(
+            query=query,
+            vector=self._vector(query),
+            numbers=query_numbers(query),
+            chunk_ids=frozenset(chunk_ids),
+            answer=answer,
+            created=time.monotonic(),
+        )
+        with self._lock:
+            self._entries[self._next_key] = entry
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+            self.stored += 1
+            self.miss_seconds += seconds
+
+    def clear(self):
+        with self._lock:
+            self._drop(list(self._entries))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_miss = self.miss_seconds / self.stored if self.stored else 0.0
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                # Estimated from the average cost of the answers that were stored
+                "estimated_seconds_saved": self.hits * avg_miss,
+            }
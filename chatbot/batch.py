@@ -0,0 +1,275 @@
+"""
+Answer a JSONL file of questions through the full pipeline.
+
+Each input line is an object with a "question" and optionally:
+    "id": echoed in the output,
+    "session": questions sharing a session are asked in file order in one
+        conversation, so follow-ups work,
+    "restaurant": the restaurant the answer should come from, used for the
+        retrieval hit rate.
+
+Each output line has the answer, session_id, per-stage timings, the
+restaurants of the retrieved chunks, the stages that missed the request
+deadline and the error, if any. A summary with throughput, latency
+percentiles, hit rate and deadline misses is logged and optionally written
+as JSON.
+
+Usage:
+    PYTHONPATH=. python chatbot/batch.py questions.jsonl answers.jsonl \\
+        [--workers N] [--report report.json] [--offline]
+
+--offline answers with the deterministic local chat model, search stub and
+hashing embeddings (LLM_BACKEND / SEARCH_BACKEND / EMBED_BACKEND =
+"offline"), so neither network access nor the local embedding model is
+needed. Vector search is only meaningful against a knowledge base built
+with EMBED_BACKEND=offline as well.
+"""
+
+import argparse
+import asyncio
+import importlib
+import json
+import statistics
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from config import rag_config
+from config.rag_config import BATCH_WORKERS
+from utils.logger import get_logger
+
+logger = get_logger()
+
+STAGES = (
+    "fast_path",
+    "reformulation",
+    "retrieval",
+    "retrieval_rewrite",
+    "agent",
+    "tools",
+    "fallback",
+)
+
+
+@dataclass
+class BatchReport:
+    questions: int
+    errors: int
+    seconds: float
+    throughput: float  # questions per second
+    latency: dict[str, float]  # p50/p95/p99 of the total, in seconds
+    stages: dict[str, dict[str, float]]  # stage -> mean/p95 seconds and count
+    retrieval_hit_rate: float | None  # None without expected restaurants
+    fast_path_rate: float
+    # stage -> questions that ran out of time or failed in it
+    deadline_misses: dict[str, int] = field(default_factory=dict)
+    degraded_rate: float = 0.0  # answered context-only after a deadline miss
+    results: list[dict] = field(default_factory=list, repr=False)
+
+
+def use_offline_backends():
+    """
+    Answer with the offline chat model, search stub and embeddings. Must be
+    called before the pipeline is first used, since generator, tools and
+    the embedding cache read the backends when they are imported.
+    """
+    rag_config.LLM_BACKEND = "offline"
+    rag_config.SEARCH_BACKEND = "offline"
+    rag_config.EMBED_BACKEND = "offline"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+
+def load_questions(path: Path) -> list[dict]:
+    questions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            record.setdefault("id", number)
+            questions.append(record)
+    return questions
+
+
+async def _answer(record: dict, session_id: str | None) -> dict:
+    # Imported on first use so `use_offline_backends` can run before it
+    from generator import agenerate_answer
+
+    result = {"id": record["id"], "question": record["question"]}
+    try:
+        answer = await agenerate_answer(record["question"], session_id=session_id)
+        result.update(
+            answer=answer.output,
+            session_id=answer.session_id,
+            timings=answer.timings,
+            sources=answer.sources,
+            deadline_misses=answer.deadline_misses,
+        )
+    except Exception as e:
+        logger.exception(f"[!] Question {record['id']} failed")
+        result.update(answer=None, session_id=session_id, timings={}, error=str(e))
+
+    expected = record.get("restaurant")
+    if expected and result.get("sources"):
+        result["hit"] = expected in result["sources"]
+    return result
+
+
+async def arun_batch(
+    questions: Iterable[dict], workers: int = BATCH_WORKERS
+) -> BatchReport:
+    """
+    Answer questions concurrently, at most `workers` at a time. Questions
+    of the same session run one after another, in order.
+    """
+    sessions: dict[str, list[dict]] = defaultdict(list)
+    for record in questions:
+        sessions[str(record.get("session", f"question-{record['id']}"))].append(record)
+
+    # Load models and the agent outside the timing
+    importlib.import_module("generator")
+
+    slots = asyncio.Semaphore(workers)
+    results: list[dict] = []
+
+    async def run_session(records: list[dict]):
+        session_id = None
+        for record in records:
+            async with slots:
+                result = await _answer(record, session_id)
+            session_id = result["session_id"]
+            results.append(result)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_session(records) for records in sessions.values()))
+    elapsed = time.perf_counter() - started
+
+    order = {
+        record["id"]: i
+        for i, records in enumerate(sessions.values())
+        for record in records
+    }
+    results.sort(key=lambda r: order.get(r["id"], 0))
+    return summarize(results, elapsed)
+
+
+def run_batch(questions: Iterable[dict], workers: int = BATCH_WORKERS) -> BatchReport:
+    """Blocking wrapper around `arun_batch`."""
+    return asyncio.run(arun_batch(questions, workers))
+
+
+def summarize(results: list[dict], seconds: float) -> BatchReport:
+    answered = [r for r in results if "error" not in r]
+    totals = [r["timings"]["total"] for r in answered if "total" in r["timings"]]
+
+    stages = {}
+    for stage in STAGES:
+        values = [r["timings"][stage] for r in answered if stage in r["timings"]]
+        if values:
+            stages[stage] = {
+                "mean": statistics.mean(values),
+                "p95": percentile(values, 95),
+                "count": len(values),
+            }
+
+    judged = [r["hit"] for r in results if "hit" in r]
+    misses = Counter(
+        stage for r in answered for stage in set(r.get("deadline_misses", []))
+    )
+    degraded = [r for r in answered if r.get("deadline_misses")]
+    fast = [
+        r
+        for r in answered
+        if not (r["sources"] or "agent" in r["timings"] or r["deadline_misses"])
+    ]
+    return BatchReport(
+        questions=len(results),
+        errors=len(results) - len(answered),
+        seconds=seconds,
+        throughput=len(results) / seconds if seconds else 0.0,
+        latency={
+            "p50": percentile(totals, 50),
+            "p95": percentile(totals, 95),
+            "p99": percentile(totals, 99),
+        },
+        stages=stages,
+        retrieval_hit_rate=sum(judged) / len(judged) if judged else None,
+        fast_path_rate=len(fast) / len(answered) if answered else 0.0,
+        deadline_misses=dict(misses),
+        degraded_rate=len(degraded) / len(answered) if answered else 0.0,
+        results=results,
+    )
+
+
+def log_report(report: BatchReport):
+    latency = ", ".join(f"{k}={v:.2f}s" for k, v in report.latency.items())
+    logger.info(
+        f"[✓] {report.questions} questions in {report.seconds:.1f}s "
+        f"({report.throughput:.2f}/s), {report.errors} errors"
+    )
+    logger.info(f"[+] Latency: {latency}")
+    for stage, values in report.stages.items():
+        logger.info(
+            f"[+] {stage}: mean={values['mean']:.3f}s p95={values['p95']:.3f}s "
+            f"n={values['count']}"
+        )
+    if report.retrieval_hit_rate is not None:
+        logger.info(f"[+] Retrieval hit rate: {report.retrieval_hit_rate:.1%}")
+    logger.info(f"[+] Answered without retrieval: {report.fast_path_rate:.1%}")
+    if report.deadline_misses:
+        misses = ", ".join(f"{k}={v}" for k, v in report.deadline_misses.items())
+        logger.warning(
+            f"[!] Deadline misses: {misses}; "
+            f"{report.degraded_rate:.1%} of answers degraded"
+        )
+
+
+def main(
+    input_path: Path,
+    output_path: Path,
+    workers: int = BATCH_WORKERS,
+    report_path: Path | None = None,
+) -> BatchReport:
+    questions = load_questions(input_path)
+    logger.info(f"[+] Answering {len(questions)} questions with {workers} workers")
+    report = run_batch(questions, workers)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.writelines(
+            json.dumps(result, ensure_ascii=False) + "\n" for result in report.results
+        )
+    log_report(report)
+
+    if report_path is not None:
+        summary = asdict(report)
+        del summary["results"]
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions")
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--report", type=Path, help="write the summary as JSON")
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="use the local chat model and search stub instead of the network",
+    )
+    args = parser.parse_args()
+
+    if args.offline:
+        use_offline_backends()
+
+    main(args.input, args.output, args.workers, args.report)
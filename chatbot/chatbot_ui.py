@@ -1,5 +1,8 @@
 import streamlit as st
-from generator import generate_answer
+from generator import stream_answer
+from retriever import warm_up
+from config.rag_config import METRICS_PORT
+from utils.instrumentation import start_metrics_server
 
 def main():
     st.set_page_config(page_title="Nugget AI", page_icon="💬", layout="centered")
@@ -22,15 +25,36 @@ def main():
 
     user_input = st.chat_input("Type your message...")  # Input box stays at bottom
 
+    # Page is drawn, load the vector store and encoder off the render path
+    warm_up()
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
     if user_input:
         with st.chat_message("user"):
             st.markdown(user_input)
         st.session_state.chat_history.append({"role": "user", "content": user_input})
 
-        with st.spinner("Thinking..."):
-            bot_response, session_id = generate_answer(
+        with st.chat_message("assistant"):
+            placeholder = st.empty()
+            placeholder.markdown("Thinking...")
+
+            streamed_text = ""
+            for event in stream_answer(
                 user_input, session_id=st.session_state.chat_session_id
-            )
+            ):
+                if event["type"] == "token":
+                    streamed_text += event["content"]
+                    placeholder.markdown(streamed_text + "▌")
+                elif event["type"] == "tool_start":
+                    # Text before a tool call is not part of the answer
+                    streamed_text = ""
+                    placeholder.markdown(f"🔎 Searching: {event['input']}")
+                elif event["type"] == "done":
+                    bot_response = event["output"]
+                    session_id = event["session_id"]
+
+            placeholder.markdown(bot_response)
 
         if st.session_state.chat_session_id is None:
             st.session_state.chat_session_id = session_id
@@ -38,8 +62,6 @@ def main():
         st.session_state.chat_history.append(
             {"role": "assistant", "content": bot_response}
         )
-        with st.chat_message("assistant"):
-            st.markdown(bot_response)
 
 if __name__ == "__main__":
     main()
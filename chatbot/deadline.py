@@ -0,0 +1,75 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from config.rag_config import REQUEST_DEADLINE_SECONDS
+from utils.instrumentation import inc
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class DeadlineStats:
+    """Deadline misses per pipeline stage, across requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.misses: dict[str, int] = {}
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_miss(self, stage: str):
+        with self._lock:
+            self.misses[stage] = self.misses.get(stage, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"requests": self.requests, "misses": dict(self.misses)}
+
+
+deadline_stats = DeadlineStats()
+
+
+class Deadline:
+    """
+    Time budget for one request. Every stage asks it how long it may take
+    and reports when it ran out, so a slow stage eats into the later ones
+    instead of extending the request.
+    """
+
+    def __init__(self, seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        # Stages that missed the deadline or failed, in order
+        self.missed: list[str] = []
+        deadline_stats.record_request()
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def cap(self, seconds: float) -> float:
+        """`seconds`, or whatever is left of the budget if that is less."""
+        return min(seconds, self.remaining())
+
+    def miss(self, stage: str, error: Exception | None = None):
+        """Record a stage that ran out of time, or failed with `error`."""
+        self.missed.append(stage)
+        deadline_stats.record_miss(stage)
+        inc("deadline_misses_total", stage=stage)
+        if error is not None:
+            logger.warning(f"[!] {stage} failed: {error!r}")
+        else:
+            logger.warning(f"[!] {stage} ran out of time ({self.seconds:.0f}s budget)")
+
+
+# Deadline of the request being answered; read by tools, which the agent
+# calls without a way to pass it explicitly
+current_deadline: ContextVar[Deadline | None] = ContextVar(
+    "current_deadline", default=None
+)
@@ -1,20 +1,49 @@
-from typing import Tuple
-from langchain_google_genai import ChatGoogleGenerativeAI
-from retriever import get_relevant_chunks
+import asyncio
+import threading
+import time
+import uuid
+from collections.abc import Awaitable, Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
 from datetime import datetime
-from utils.logger import get_logger
-from config.rag_config import GENERATION_MODEL, TEMPERATURE, TOP_P
+from functools import partial
+from queue import Empty, Queue
+from typing import Any
+
+from answer_cache import SemanticAnswerCache
+from deadline import Deadline, current_deadline
 from dotenv import load_dotenv
-from tools import TOOLS
 from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.chat_history import InMemoryChatMessageHistory
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
-from langchain_community.cache import SQLiteCache
 from langchain.globals import set_llm_cache
-from prompt import CONTEXTULIZE_SYSTEM_PROMPT, SYSTEM_PROMPT
-import uuid
+from langchain_community.cache import SQLiteCache
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from prompt import CONTEXT_ONLY_PROMPT, CONTEXTULIZE_SYSTEM_PROMPT, SYSTEM_PROMPT
+from query_rewrite import needs_reformulation, rewrite_cache, rewrite_stats
+from retriever import embed_query, get_relevant_documents
+from session_store import get_session_store
+from tools import TOOLS
+
+from config.rag_config import (
+    AGENT_MAX_ITERATIONS,
+    AGENT_STEP_SECONDS,
+    ANSWER_CACHE_ENABLED,
+    DEADLINE_FALLBACK_RESERVE,
+    GENERATION_MODEL,
+    LLM_BACKEND,
+    STAGE_WORKERS,
+    STRUCTURED_FAST_PATH,
+    TEMPERATURE,
+    TOP_K,
+    TOP_P,
+)
+from kb.menu_engine import answer_structured_query, get_menu_engine
+from utils.instrumentation import profiled, record_span, span
+from utils.logger import get_logger
 
 set_llm_cache(SQLiteCache(database_path=".langchain.db"))
 
@@ -22,84 +51,628 @@ load_dotenv()
 
 logger = get_logger()
 
-llm = ChatGoogleGenerativeAI(
-    model=GENERATION_MODEL,
-    temperature=TEMPERATURE,
-    top_p=TOP_P,
-)
 
-# Simple in-memory chat history manager
-chats_by_session_id = {}
+def create_llm():
+    """Chat model selected by LLM_BACKEND."""
+    if LLM_BACKEND == "offline":
+        from offline_llm import OfflineChatModel
+
+        logger.info("[+] Using the offline chat model")
+        # Uncached, so batch timings include every simulated call
+        return OfflineChatModel(cache=False)
+
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=GENERATION_MODEL,
+        temperature=TEMPERATURE,
+        top_p=TOP_P,
+    )
+
+
+llm = create_llm()
+
+# Chat histories, bounded and optionally persisted (see SESSION_BACKEND)
+session_store = get_session_store()
 
 
 def get_chat_history(session_id: str) -> InMemoryChatMessageHistory:
-    if session_id not in chats_by_session_id:
-        chats_by_session_id[session_id] = InMemoryChatMessageHistory()
-    return chats_by_session_id[session_id]
+    return session_store.get(session_id)
 
 
-def generate_answer(query: str, session_id: str = None) -> Tuple[str]:
-    logger.info(f"[+] Generating answer for query: {query}")
-    logger.info("[+] Retrieving context...")
+# Semantic cache of final answers, keyed by the standalone query
+answer_cache = SemanticAnswerCache(embed_query) if ANSWER_CACHE_ENABLED else None
 
-    if session_id is None:
-        session_id = str(uuid.uuid4())  # Auto-create if missing
-    chat_history = get_chat_history(session_id)
+# Built once and shared by every request; history, context and time are
+# passed in through the inputs
+agent_prompt = ChatPromptTemplate.from_messages(
+    [
+        ("system", SYSTEM_PROMPT),
+        MessagesPlaceholder("chat_history"),
+        ("human", "{input}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ]
+)
+agent = create_tool_calling_agent(llm, TOOLS, agent_prompt)
+agent_executor = AgentExecutor(
+    agent=agent, tools=TOOLS, max_iterations=AGENT_MAX_ITERATIONS, verbose=False
+)
+
+# Tool-free reply used when the agent runs out of time
+context_only_chain = (
+    ChatPromptTemplate.from_messages(
+        [
+            ("system", CONTEXT_ONLY_PROMPT + SYSTEM_PROMPT),
+            MessagesPlaceholder("chat_history"),
+            ("human", "{input}"),
+        ]
+    )
+    | llm
+    | StrOutputParser()
+)
+
+# AgentExecutor's output when it hits max_iterations or max_execution_time
+AGENT_STOPPED_PREFIX = "Agent stopped due to"
+
+
+@dataclass
+class AnswerResult:
+    output: str
+    session_id: str
+    # Seconds spent per stage: reformulation, retrieval, agent, tools, total
+    timings: dict[str, float] = field(default_factory=dict)
+    # Restaurants of the context chunks, empty when answered without retrieval
+    sources: list[str] = field(default_factory=list)
+    # Stages that ran out of time or failed; a non-empty list means a
+    # degraded answer
+    deadline_misses: list[str] = field(default_factory=list)
+
+
+# Blocking stages run here rather than on the loop's default executor, which
+# `asyncio.run` joins on exit: a stage abandoned at the deadline would hold
+# up the answer until it finished anyway
+_stage_pool = ThreadPoolExecutor(max_workers=STAGE_WORKERS, thread_name_prefix="stage")
 
-    reformulated_query = reformulate_question(query, chat_history.messages)
+
+def _offload(fn: Callable, *args: Any, **kwargs: Any) -> Awaitable:
+    """Like `asyncio.to_thread`, on `_stage_pool`."""
+    return asyncio.get_running_loop().run_in_executor(
+        _stage_pool, partial(copy_context().run, fn, *args, **kwargs)
+    )
+
+
+async def _timed(
+    timings: dict[str, float],
+    stage: str,
+    awaitable: Awaitable,
+    timeout: float | None = None,
+):
+    started = time.perf_counter()
+    try:
+        with span(stage):
+            return await asyncio.wait_for(awaitable, timeout)
+    finally:
+        timings[stage] = time.perf_counter() - started
+
+
+async def _bounded(
+    deadline: Deadline,
+    timings: dict[str, float],
+    stage: str,
+    awaitable: Awaitable,
+    default: Any,
+    timeout: float | None = None,
+):
+    """
+    `_timed` within the deadline; `default` if the stage runs out of time or
+    fails, e.g. when the vector store or the model API is unreachable.
+    """
+    if timeout is None:
+        timeout = deadline.remaining()
+    try:
+        return await _timed(timings, stage, awaitable, timeout)
+    except TimeoutError:
+        deadline.miss(stage)
+        return default
+    except Exception as e:  # noqa: BLE001  a failed stage degrades like a slow one
+        deadline.miss(stage, e)
+        return default
+
+
+class _ToolTimer(BaseCallbackHandler):
+    """Adds the time spent in tool calls to the request's timings."""
+
+    def __init__(self, timings: dict[str, float]):
+        self.timings = timings
+        self._started: dict[Any, tuple[str, float]] = {}
+
+    def on_tool_start(
+        self, serialized: dict[str, Any], input_str: str, **kwargs: Any
+    ) -> None:
+        name = (serialized or {}).get("name", "tool")
+        self._started[kwargs.get("run_id")] = (name, time.perf_counter())
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        started = self._started.pop(kwargs.get("run_id"), None)
+        if started is not None:
+            name, started_at = started
+            seconds = time.perf_counter() - started_at
+            self.timings["tools"] = self.timings.get("tools", 0.0) + seconds
+            record_span("tool", seconds, tool=name)
+
+    on_tool_error = on_tool_end
+
+
+def _log_timings(timings: dict[str, float]):
+    logger.info(
+        "[+] Stage timings: " + ", ".join(f"{k}={v:.2f}s" for k, v in timings.items())
+    )
+
+
+@dataclass
+class _PreparedInputs:
+    inputs: dict
+    standalone_query: str
+    chunk_ids: list[str]
+    sources: list[str]
+    # Top-ranked chunk, the reply of last resort when nothing can be generated
+    best_chunk: str
+
+
+async def _aprepare_inputs(
+    query: str, session_id: str, timings: dict[str, float], deadline: Deadline
+) -> _PreparedInputs:
+    """
+    Build the agent inputs for a query.
+
+    Retrieval on the raw query starts while the query is being reformulated.
+    If the rewrite differs, its results replace the raw ones, which only
+    backfill up to TOP_K. Stages that run out of time or fail fall back to
+    the raw query and whatever was retrieved so far.
+    """
+    chat_history = get_chat_history(session_id).messages.copy()
+
+    raw_retrieval = asyncio.create_task(
+        _bounded(
+            deadline,
+            timings,
+            "retrieval",
+            _offload(get_relevant_documents, query),
+            [],
+        )
+    )
+    reformulated_query = await _bounded(
+        deadline,
+        timings,
+        "reformulation",
+        _offload(reformulate_question, query, chat_history, session_id),
+        query,
+    )
     logger.info(f"[+] Reformulated Query: {reformulated_query}")
 
-    # Get context based on standalone version
-    context_chunks = get_relevant_chunks(reformulated_query)
+    context_docs = await raw_retrieval
+    if reformulated_query != query:
+        rewritten_docs = await _bounded(
+            deadline,
+            timings,
+            "retrieval_rewrite",
+            _offload(get_relevant_documents, reformulated_query),
+            [],
+        )
+        merged = {}
+        for doc in rewritten_docs + context_docs:
+            merged.setdefault(doc.metadata.get("_id") or doc.page_content, doc)
+        context_docs = list(merged.values())[:TOP_K]
 
-    context = "\n".join(context_chunks)
+    context = "\n".join(doc.page_content for doc in context_docs)
 
     logger.debug(f"[+] Retrieved context: {context}")
 
-    history_raw = []
-    history_messages = chat_history.messages.copy()
-    for message in history_messages:
-        if isinstance(message, HumanMessage):
-            history_raw.append(("human", message.content))
-        elif isinstance(message, AIMessage):
-            history_raw.append(("ai", message.content))
-        else:
-            continue
-    history_raw.insert(0, ("system", SYSTEM_PROMPT))
-    history_raw.append(("human", "{input}"))
-    history_raw.append(("placeholder", "{agent_scratchpad}"))
-    messages_template = ChatPromptTemplate.from_messages(history_raw)
-
-    agent = create_tool_calling_agent(llm, TOOLS, messages_template)
-    agent_executor = AgentExecutor(agent=agent, tools=TOOLS, verbose=False)
-
-    # Prepare agent input
     inputs = {
         "input": query,
+        "chat_history": [
+            m for m in chat_history if isinstance(m, (HumanMessage, AIMessage))
+        ],
         "date_and_time": datetime.now().strftime("%Y-%m-%d %H:%M"),
         "context": context,
     }
+    chunk_ids = [doc.metadata.get("_id", "") for doc in context_docs]
+    sources = [doc.metadata.get("restaurant", "") for doc in context_docs]
+    best_chunk = context_docs[0].page_content.strip() if context_docs else ""
+    return _PreparedInputs(inputs, reformulated_query, chunk_ids, sources, best_chunk)
 
-    # Invoke agent
-    response = agent_executor.invoke(inputs)
 
-    output_text = response["output"]
-    logger.info(f"[+] Response: {output_text}")
-
-    # Save conversation
+def _save_turn(session_id: str, query: str, output_text: str):
+    """Save a question/answer pair; shared by the blocking and streaming paths."""
+    chat_history = get_chat_history(session_id)
     chat_history.add_messages(
         [HumanMessage(content=query), AIMessage(content=output_text)]
     )
+    # Trims the history to the token budget and persists it
+    session_store.save(session_id, chat_history)
+
+
+def _fast_answer(query: str, session_id: str, timings: dict[str, float]) -> str | None:
+    """
+    Answer templated price, filter and opening-hour questions from the menu
+    engine, without retrieval or the agent. Follow-ups that need the
+    conversation to make sense are left to the full pipeline.
+    """
+    if not STRUCTURED_FAST_PATH:
+        return None
+    started = time.perf_counter()
+    chat_history = get_chat_history(session_id).messages
+    answer = None
+    if not (chat_history and needs_reformulation(query)):
+        answer = answer_structured_query(get_menu_engine(), query)
+        if answer is not None:
+            logger.info("[+] Answered from the menu engine")
+    timings["fast_path"] = time.perf_counter() - started
+    return answer
 
-    return (output_text.strip(), session_id)
 
-def reformulate_question(query: str, chat_history: list[BaseMessage]) -> str:
+async def _acached_for_context(
+    prepared: _PreparedInputs, timings: dict[str, float], deadline: Deadline
+) -> str | None:
+    """
+    A cached answer to the standalone query, given from exactly the chunks
+    retrieved now, so it was built from the same context.
+    """
+    if answer_cache is None:
+        return None
+    # Embeds the query, so it is bounded like any other stage
+    return await _bounded(
+        deadline,
+        timings,
+        "answer_cache",
+        _offload(answer_cache.lookup, prepared.standalone_query, prepared.chunk_ids),
+        None,
+    )
+
+
+def _store_answer(prepared: _PreparedInputs, output: str, seconds: float):
+    answer_cache.store(prepared.standalone_query, prepared.chunk_ids, output, seconds)
+    logger.debug(f"[+] Answer cache: {answer_cache.stats()}")
+
+
+def _remember_answer(prepared: _PreparedInputs, output: str, seconds: float):
+    """Cache the answer on `_stage_pool`; embedding it does not hold up the reply."""
+    if answer_cache is not None:
+        _stage_pool.submit(copy_context().run, _store_answer, prepared, output, seconds)
+
+
+def _agent_for(deadline: Deadline) -> AgentExecutor | None:
+    """
+    The shared executor with its iterations and run time capped to the time
+    left, keeping DEADLINE_FALLBACK_RESERVE for a context-only reply. None
+    when there is no time for the agent at all.
+    """
+    budget = deadline.remaining() - DEADLINE_FALLBACK_RESERVE
+    if budget <= 0:
+        return None
+    iterations = max(1, min(AGENT_MAX_ITERATIONS, int(budget // AGENT_STEP_SECONDS)))
+    return agent_executor.model_copy(
+        update={"max_iterations": iterations, "max_execution_time": budget}
+    )
+
+
+def _agent_output(response: dict | None, deadline: Deadline) -> str | None:
+    """The agent's answer, or None if it was cut short by the deadline."""
+    if response is None:
+        return None
+    output = response["output"]
+    if output.startswith(AGENT_STOPPED_PREFIX):
+        deadline.miss("agent")
+        return None
+    return output
+
+
+async def _arun_agent(
+    inputs: dict, timings: dict[str, float], deadline: Deadline
+) -> str | None:
+    """The agent's answer within the deadline, None if it ran out of time or failed."""
+    executor = _agent_for(deadline)
+    if executor is None:
+        deadline.miss("agent")
+        return None
+    response = await _bounded(
+        deadline,
+        timings,
+        "agent",
+        _offload(executor.invoke, inputs, config={"callbacks": [_ToolTimer(timings)]}),
+        None,
+        timeout=executor.max_execution_time,
+    )
+    return _agent_output(response, deadline)
+
+
+async def _acontext_only_reply(
+    prepared: _PreparedInputs, deadline: Deadline, timings: dict[str, float]
+) -> str:
+    """
+    Answer from the retrieved context without tools, in whatever time is
+    left. If even that runs out, reply with the best context chunk.
+    """
+    reply = await _bounded(
+        deadline,
+        timings,
+        "fallback",
+        _offload(context_only_chain.invoke, prepared.inputs),
+        None,
+    )
+    if reply:
+        return reply
+    if not prepared.best_chunk:
+        return "Sorry, I couldn't look that up in time. Please try again."
+    best_chunk = prepared.best_chunk[:500]
+    return f"I couldn't finish looking that up in time. Here is what I found:\n{best_chunk}"
+
+
+def _finish(
+    session_id: str,
+    query: str,
+    output_text: str,
+    started: float,
+    timings: dict[str, float],
+):
+    # Save conversation
+    _save_turn(session_id, query, output_text)
+    timings["total"] = time.perf_counter() - started
+    _log_timings(timings)
+
+
+async def _aanswer(
+    query: str,
+    session_id: str,
+    timings: dict[str, float],
+    deadline: Deadline,
+    started: float,
+) -> tuple[str, list[str]]:
+    """The answer to `query` and the restaurants of its context chunks."""
+    output_text = _fast_answer(query, session_id, timings)
+    if output_text is not None:
+        return output_text, []
+
+    prepared = await _aprepare_inputs(query, session_id, timings, deadline)
+    output_text = await _acached_for_context(prepared, timings, deadline)
+    if output_text is not None:
+        return output_text, prepared.sources
+
+    output_text = await _arun_agent(prepared.inputs, timings, deadline)
+    if output_text is None:
+        output_text = await _acontext_only_reply(prepared, deadline, timings)
+    else:
+        _remember_answer(prepared, output_text.strip(), time.perf_counter() - started)
+    return output_text, prepared.sources
+
+
+async def agenerate_answer(
+    query: str,
+    session_id: str | None = None,
+    deadline: Deadline | None = None,
+    profile: bool = False,
+) -> AnswerResult:
+    """
+    Async pipeline behind `generate_answer`, returning per-stage timings too.
+
+    Every stage runs within `deadline` (REQUEST_DEADLINE_SECONDS from now by
+    default). When the agent runs out of time or fails the answer degrades
+    to a context-only reply, which is not cached. With `profile`, stacks are
+    sampled while the request runs and saved under PROFILE_DIR.
+    """
+    logger.info(f"[+] Generating answer for query: {query}")
+    logger.info("[+] Retrieving context...")
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    deadline = deadline or Deadline()
+
+    if session_id is None:
+        session_id = str(uuid.uuid4())  # Auto-create if missing
+
+    token = current_deadline.set(deadline)
+    try:
+        with (
+            span("answer", session_id=session_id) as request_span,
+            profiled(f"answer-{session_id[:8]}", enabled=profile),
+        ):
+            output_text, sources = await _aanswer(
+                query, session_id, timings, deadline, started
+            )
+            request_span.set(deadline_misses=deadline.missed)
+    finally:
+        current_deadline.reset(token)
+
+    logger.info(f"[+] Response: {output_text}")
+    _finish(session_id, query, output_text, started, timings)
+
+    return AnswerResult(
+        output_text.strip(), session_id, timings, sources, deadline.missed
+    )
+
+
+def generate_answer(
+    query: str, session_id: str | None = None, profile: bool = False
+) -> tuple[str]:
+    result = asyncio.run(
+        agenerate_answer(query, session_id=session_id, profile=profile)
+    )
+    return (result.output, result.session_id)
+
+
+class _StreamHandler(BaseCallbackHandler):
+    """Forwards agent callbacks onto a queue read by `stream_answer`."""
+
+    def __init__(self, events: Queue):
+        self.events = events
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.events.put({"type": "token", "content": token})
+
+    def on_tool_start(
+        self, serialized: dict[str, Any], input_str: str, **kwargs: Any
+    ) -> None:
+        name = (serialized or {}).get("name", "tool")
+        self.events.put({"type": "tool_start", "name": name, "input": input_str})
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self.events.put({"type": "tool_end", "name": kwargs.get("name", "tool")})
+
+
+def _stream_agent(
+    inputs: dict, timings: dict[str, float], deadline: Deadline
+) -> Iterator[dict]:
+    """
+    Run the agent on a worker thread, yielding its events; returns its
+    answer, or None if it ran out of time or failed.
+    """
+    executor = _agent_for(deadline)
+    if executor is None:
+        deadline.miss("agent")
+        return None
+
+    agent_started = time.perf_counter()
+    stop_at = time.monotonic() + executor.max_execution_time
+    events: Queue = Queue()
+    done = object()
+    result: dict = {}
+
+    def _run():
+        current_deadline.set(deadline)
+        try:
+            result["response"] = executor.invoke(
+                inputs,
+                config={"callbacks": [_StreamHandler(events), _ToolTimer(timings)]},
+            )
+        except Exception as e:  # noqa: BLE001  reported once the stream ends
+            result["error"] = e
+        finally:
+            events.put(done)
+
+    worker = threading.Thread(target=_run, name="agent-stream", daemon=True)
+    worker.start()
+
+    while True:
+        try:
+            event = events.get(timeout=max(0.0, stop_at - time.monotonic()))
+        except Empty:
+            # Left running; its tools see the expired deadline
+            timings["agent"] = time.perf_counter() - agent_started
+            record_span("agent", timings["agent"], streamed=True)
+            deadline.miss("agent")
+            return None
+        if event is done:
+            break
+        yield event
+    worker.join()
+    timings["agent"] = time.perf_counter() - agent_started
+    record_span("agent", timings["agent"], streamed=True)
+
+    if "error" in result:
+        deadline.miss("agent", result["error"])
+        return None
+    return _agent_output(result["response"], deadline)
+
+
+def stream_answer(query: str, session_id: str | None = None) -> Iterator[dict]:
+    """
+    Streaming variant of `generate_answer`.
+
+    Yields events as the agent runs:
+        {"type": "token", "content": str}: text from the model as it arrives.
+            Text streamed before a tool call is not part of the final answer.
+        {"type": "tool_start", "name": str, "input": str} / {"type": "tool_end", ...}
+        {"type": "done", "output": str, "session_id": str, "metrics": dict}:
+            the final answer (as `generate_answer` returns it) plus
+            `time_to_first_token`, `total_latency` and per-stage `timings`
+            in seconds, and the stages that missed the deadline or failed.
+
+    The conversation is saved exactly as `generate_answer` saves it.
+    """
+    logger.info(f"[+] Streaming answer for query: {query}")
+    started = time.perf_counter()
+    timings: dict[str, float] = {}
+    deadline = Deadline()
+
+    if session_id is None:
+        session_id = str(uuid.uuid4())  # Auto-create if missing
+
+    time_to_first_token = None
+    output_text = _fast_answer(query, session_id, timings)
+    if output_text is None:
+        prepared = asyncio.run(_aprepare_inputs(query, session_id, timings, deadline))
+        output_text = asyncio.run(_acached_for_context(prepared, timings, deadline))
+
+        if output_text is None:
+            agent_events = _stream_agent(prepared.inputs, timings, deadline)
+            while True:
+                try:
+                    event = next(agent_events)
+                except StopIteration as stop:
+                    output_text = stop.value
+                    break
+                if event["type"] == "token" and time_to_first_token is None:
+                    time_to_first_token = time.perf_counter() - started
+                yield event
+            if output_text is None:
+                output_text = asyncio.run(
+                    _acontext_only_reply(prepared, deadline, timings)
+                )
+                if time_to_first_token is not None:
+                    # Streamed agent text is not part of this answer
+                    yield {"type": "token", "content": output_text}
+            else:
+                _remember_answer(
+                    prepared, output_text.strip(), time.perf_counter() - started
+                )
+
+    if time_to_first_token is None:
+        # Answered in one piece without the agent
+        time_to_first_token = time.perf_counter() - started
+        yield {"type": "token", "content": output_text}
+
+    logger.info(f"[+] Response: {output_text}")
+    _finish(session_id, query, output_text, started, timings)
+
+    ttft = f"{time_to_first_token:.2f}s"
+    logger.info(f"[+] Streamed answer: ttft={ttft}, total={timings['total']:.2f}s")
+
+    yield {
+        "type": "done",
+        "output": output_text.strip(),
+        "session_id": session_id,
+        "metrics": {
+            "time_to_first_token": time_to_first_token,
+            "total_latency": timings["total"],
+            "timings": timings,
+            "deadline_misses": deadline.missed,
+        },
+    }
+
+
+def reformulate_question(
+    query: str, chat_history: list[BaseMessage], session_id: str | None = None
+) -> str:
     """
     Reformulate a user query into a standalone question using the conversation history.
+
+    Queries that do not refer back to earlier turns skip the LLM call, and
+    rewrites are cached per (session, history, query).
     """
     if not chat_history:
         return query
 
+    if not needs_reformulation(query):
+        rewrite_stats.record_skip()
+        logger.info("[+] Query is standalone, skipping reformulation")
+        return query
+
+    cache_key = rewrite_cache.key(session_id, chat_history, query)
+    cached = rewrite_cache.get(cache_key)
+    if cached is not None:
+        rewrite_stats.record_cache_hit()
+        return cached
+
     prompt = ChatPromptTemplate.from_messages(
         [
             ("system", CONTEXTULIZE_SYSTEM_PROMPT),
@@ -110,8 +683,12 @@ def reformulate_question(query: str, chat_history: list[BaseMessage]) -> str:
 
     chain = prompt | llm | StrOutputParser()
 
-    reformulated_question = chain.invoke({"input": query})
+    started = time.perf_counter()
+    reformulated_question = chain.invoke({"input": query}).strip()
+    rewrite_stats.record_llm_call(time.perf_counter() - started)
 
     logger.info("[+] Reformulated question: %s", reformulated_question)
+    logger.debug(f"[+] Reformulation stats: {rewrite_stats.snapshot()}")
 
-    return reformulated_question.strip()
\ No newline at end of file
+    rewrite_cache.put(cache_key, reformulated_question)
+    return reformulated_question
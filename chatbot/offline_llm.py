@@ -0,0 +1,77 @@
+import time
+import uuid
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from prompt import CONTEXTULIZE_SYSTEM_PROMPT
+
+from config.rag_config import OFFLINE_LLM_LATENCY
+
+CONTEXT_HEADING = "### Context"
+
+
+class OfflineChatModel(BaseChatModel):
+    """
+    Deterministic stand-in for the Gemini chat model, used with
+    LLM_BACKEND="offline" to run the pipeline without network access.
+
+    Reformulation prompts get the question back unchanged. Agent prompts are
+    answered from the retrieved context; with no context, the model calls
+    search_internet once and answers from its result.
+    """
+
+    latency: float = OFFLINE_LLM_LATENCY
+
+    @property
+    def _llm_type(self) -> str:
+        return "offline"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(
+            generations=[ChatGeneration(message=self._respond(messages, kwargs))]
+        )
+
+    @staticmethod
+    def _respond(messages: list[BaseMessage], kwargs: dict) -> AIMessage:
+        system = next((m.content for m in messages if m.type == "system"), "")
+        question = next(
+            (m.content for m in reversed(messages) if m.type == "human"), ""
+        )
+
+        if system.startswith(CONTEXTULIZE_SYSTEM_PROMPT[:40]):
+            return AIMessage(content=question)
+
+        tool_results = [m.content for m in messages if isinstance(m, ToolMessage)]
+        if tool_results:
+            return AIMessage(content=f"From search: {tool_results[-1][:300]}")
+
+        context = system.split(CONTEXT_HEADING, 1)[-1].strip()
+        tool_names = {t["function"]["name"] for t in kwargs.get("tools", [])}
+        if not context and "search_internet" in tool_names:
+            return AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "search_internet",
+                        "args": {"query": question},
+                        "id": f"call_{uuid.uuid4().hex[:8]}",
+                    }
+                ],
+            )
+        return AIMessage(content=f"Based on the menu data: {context[:300]}")
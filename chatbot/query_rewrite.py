@@ -0,0 +1,157 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+
+from langchain_core.messages import BaseMessage
+
+from config.rag_config import REWRITE_CACHE_SIZE
+
+# Words that usually point back at something said in an earlier turn
+_REFERENCE_WORDS = {
+    "it",
+    "its",
+    "it's",
+    "itself",
+    "they",
+    "them",
+    "their",
+    "theirs",
+    "those",
+    "these",
+    "that",
+    "this",
+    "there",
+    "here",
+    "he",
+    "she",
+    "him",
+    "her",
+    "his",
+    "one",
+    "ones",
+    "same",
+    "also",
+    "too",
+    "another",
+    "other",
+    "others",
+    "else",
+    "instead",
+    "above",
+    "previous",
+    "earlier",
+    "former",
+    "latter",
+    "mentioned",
+    "cheaper",
+    "costlier",
+    "similar",
+}
+# A query opening with one of these continues the previous turn
+_CONTINUATIONS = {"and", "or", "but", "also", "so", "then"}
+_CONTINUATION_PHRASES = re.compile(r"^(what|how) about\b")
+# "is there" / "are there" is existential, not a reference
+_EXISTENTIAL_THERE = re.compile(r"\b(is|are|was|were|any)\s+there\b")
+_WORD = re.compile(r"[a-z0-9']+")
+MIN_STANDALONE_WORDS = 4
+
+
+def needs_reformulation(query: str) -> bool:
+    """
+    Cheap local check for whether a follow-up query depends on earlier turns.
+
+    Queries without pronouns, continuations ("and for dessert?") or elliptical
+    fragments are returned as is, skipping the LLM rewrite.
+    """
+    text = _EXISTENTIAL_THERE.sub(" ", query.lower())
+    words = _WORD.findall(text)
+    if len(words) < MIN_STANDALONE_WORDS:
+        return True
+    if _CONTINUATION_PHRASES.match(text.strip()):
+        return True
+    if words[0] in _CONTINUATIONS:
+        return True
+    return any(word in _REFERENCE_WORDS for word in words)
+
+
+def history_digest(chat_history: list[BaseMessage]) -> str:
+    digest = hashlib.sha1()
+    for message in chat_history:
+        digest.update(message.type.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(str(message.content).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class RewriteCache:
+    """LRU of rewritten questions keyed by (session, history digest, query)."""
+
+    def __init__(self, max_items: int = REWRITE_CACHE_SIZE):
+        self.max_items = max_items
+        self._items: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(
+        session_id: str | None, chat_history: list[BaseMessage], query: str
+    ) -> tuple:
+        return (session_id, history_digest(chat_history), " ".join(query.split()))
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: str):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+
+class RewriteStats:
+    """Counters for how often the rewrite LLM call is avoided."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.skipped = 0
+        self.cache_hits = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def record_cache_hit(self):
+        with self._lock:
+            self.cache_hits += 1
+
+    def record_llm_call(self, seconds: float):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            avg_llm = self.llm_seconds / self.llm_calls if self.llm_calls else 0.0
+            avoided = self.skipped + self.cache_hits
+            total = avoided + self.llm_calls
+            return {
+                "skipped": self.skipped,
+                "cache_hits": self.cache_hits,
+                "llm_calls": self.llm_calls,
+                "skip_rate": avoided / total if total else 0.0,
+                "avg_llm_seconds": avg_llm,
+                # Estimated from the average latency of the calls that were made
+                "estimated_seconds_saved": avoided * avg_llm,
+            }
+
+
+rewrite_cache = RewriteCache()
+rewrite_stats = RewriteStats()
@@ -1,35 +1,242 @@
-from langchain_huggingface import HuggingFaceEmbeddings
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from dotenv import load_dotenv
+from langchain_core.documents import Document
 from langchain_qdrant import QdrantVectorStore
 from qdrant_client import QdrantClient
+from qdrant_client.http.models import FieldCondition, Filter, MatchAny
+
 from config.rag_config import (
+    ENTITY_CUISINE_SCOPING,
+    ENTITY_LOOKUP_PATH,
+    ENTITY_SCOPING,
+    LEXICAL_INDEX_PATH,
     QDRANT_COLLECTION_NAME,
-    EMBEDDING_MODEL,
-    TOP_K,
     QDRANT_EMBEDDING_LOCAL_PATH,
+    RRF_K,
+    TOP_K,
 )
-from dotenv import load_dotenv
+from kb.entities import EntityLookup
+from kb.lexical_index import BM25Index
+from kb.vector_params import search_params
+from utils.embedding_cache import get_embeddings
+from utils.instrumentation import traced
 from utils.logger import get_logger
 
 load_dotenv()
 
 logger = get_logger()
 
-logger.info("[+] Loading Qdrant client...")
-client = QdrantClient(path=QDRANT_EMBEDDING_LOCAL_PATH)
+# Created on first use so importing this module stays cheap
+_db: QdrantVectorStore | None = None
+_db_lock = threading.Lock()
+_warm_up_thread: threading.Thread | None = None
+_lexical_index: BM25Index | None = None
+_lexical_loaded = False
+_lexical_lock = threading.Lock()
+_entity_lookup: EntityLookup | None = None
+_entity_loaded = False
+_entity_lock = threading.Lock()
+# Runs the vector and lexical searches side by side
+_search_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
 
-logger.info("[+] Initializing embeddings...")
-embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
 
-db = QdrantVectorStore(
-    client=client, collection_name=QDRANT_COLLECTION_NAME, embedding=embeddings
-)
+def get_vector_store() -> QdrantVectorStore:
+    """Return the shared vector store, opening Qdrant on the first call."""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                logger.info("[+] Loading Qdrant client...")
+                client = QdrantClient(path=QDRANT_EMBEDDING_LOCAL_PATH)
 
+                logger.info("[+] Initializing embeddings...")
+                embeddings = get_embeddings()
 
-def get_relevant_chunks(query: str) -> list[str]:
+                _db = QdrantVectorStore(
+                    client=client,
+                    collection_name=QDRANT_COLLECTION_NAME,
+                    embedding=embeddings,
+                )
+    return _db
+
+
+def warm_up(background: bool = True) -> threading.Thread | None:
+    """
+    Open the vector store and load the embedding model ahead of the first
+    query. Safe to call repeatedly; only the first call does any work.
+
+    Args:
+        background: Load on a daemon thread instead of blocking the caller.
+    """
+    global _warm_up_thread
+
+    def _load():
+        try:
+            get_lexical_index()
+            get_entity_lookup()
+            db = get_vector_store()
+            # Cached embeddings load the encoder lazily. Encode once through
+            # the model itself, so a cache hit cannot skip loading it and
+            # the first real query does not pay for the first inference
+            db.embeddings.model.embed_query("warm up")
+            logger.info("[✓] Retriever warmed up")
+        except Exception:
+            logger.exception("[!] Retriever warm-up failed")
+
+    if not background:
+        _load()
+        return None
+
+    with _db_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(
+                target=_load, name="retriever-warm-up", daemon=True
+            )
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
+def use_stores(
+    vector_store: QdrantVectorStore,
+    lexical_index: BM25Index | None = None,
+    entity_lookup: EntityLookup | None = None,
+):
+    """Search these stores instead of the ones `build_index` wrote, e.g. in benchmarks."""
+    global _db, _lexical_index, _lexical_loaded, _entity_lookup, _entity_loaded
+    with _db_lock:
+        _db = vector_store
+    with _lexical_lock:
+        _lexical_index, _lexical_loaded = lexical_index, True
+    with _entity_lock:
+        _entity_lookup, _entity_loaded = entity_lookup, True
+
+
+def get_lexical_index() -> BM25Index | None:
+    """Return the BM25 index built by `build_index`, or None if there is none."""
+    global _lexical_index, _lexical_loaded
+    if not _lexical_loaded:
+        with _lexical_lock:
+            if not _lexical_loaded:
+                if LEXICAL_INDEX_PATH.exists():
+                    logger.info("[+] Loading lexical index...")
+                    _lexical_index = BM25Index.load(LEXICAL_INDEX_PATH)
+                else:
+                    logger.warning(
+                        f"[!] No lexical index at {LEXICAL_INDEX_PATH}, using vector search only"
+                    )
+                _lexical_loaded = True
+    return _lexical_index
+
+
+def get_entity_lookup() -> EntityLookup | None:
+    """Return the entity lookup built by `build_index`, or None if there is none."""
+    global _entity_lookup, _entity_loaded
+    if not _entity_loaded:
+        with _entity_lock:
+            if not _entity_loaded:
+                if ENTITY_LOOKUP_PATH.exists():
+                    _entity_lookup = EntityLookup.load(ENTITY_LOOKUP_PATH)
+                else:
+                    logger.warning(
+                        f"[!] No entity lookup at {ENTITY_LOOKUP_PATH}, searching unscoped"
+                    )
+                _entity_loaded = True
+    return _entity_lookup
+
+
+def query_scope(query: str) -> dict[str, list[str]]:
+    """Metadata values the query names, e.g. `{"restaurant": ["Burger King"]}`."""
+    lookup = get_entity_lookup() if ENTITY_SCOPING else None
+    if lookup is None:
+        return {}
+    return lookup.scope(query, use_cuisines=ENTITY_CUISINE_SCOPING)
+
+
+def scope_filter(scope: dict[str, list[str]] | None) -> Filter | None:
+    if not scope:
+        return None
+    return Filter(
+        must=[
+            FieldCondition(
+                key=f"{QdrantVectorStore.METADATA_KEY}.{field}",
+                match=MatchAny(any=values),
+            )
+            for field, values in scope.items()
+        ]
+    )
+
+
+@traced()
+def lexical_search(
+    query: str, k: int = TOP_K, scope: dict[str, list[str]] | None = None
+) -> list[Document]:
+    """BM25 search over the knowledge base; never touches the embedding model."""
+    index = get_lexical_index()
+    if index is None:
+        return []
+    return index.get_documents(query, k, scope)
+
+
+@traced()
+def vector_search(
+    query: str, k: int = TOP_K, scope: dict[str, list[str]] | None = None
+) -> list[Document]:
+    return get_vector_store().similarity_search(
+        query, k=k, filter=scope_filter(scope), search_params=search_params()
+    )
+
+
+def reciprocal_rank_fusion(
+    result_lists: list[list[Document]], k: int = TOP_K
+) -> list[Document]:
+    """Fuse ranked lists by summing 1 / (RRF_K + rank) per chunk."""
+    scores: dict[str, float] = {}
+    docs: dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            key = doc.metadata.get("_id") or doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (RRF_K + rank + 1)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ranked[:k]]
+
+
+def embed_query(query: str) -> list[float]:
+    return get_vector_store().embeddings.embed_query(query)
+
+
+def _hybrid_search(
+    query: str, scope: dict[str, list[str]] | None = None
+) -> list[Document]:
+    # Run in copies of the caller's context so the searches join its trace
+    lexical = _search_pool.submit(
+        copy_context().run, lexical_search, query, TOP_K, scope
+    )
+    vector = _search_pool.submit(copy_context().run, vector_search, query, TOP_K, scope)
+    return reciprocal_rank_fusion([vector.result(), lexical.result()])
+
+
+def get_relevant_documents(query: str) -> list[Document]:
+    """Hybrid search; documents carry their point ID in `metadata["_id"]`."""
     logger.info(f"[+] Searching for relevant chunks for query: {query}")
 
-    results = db.similarity_search(query, k=TOP_K)
+    scope = query_scope(query)
+    if scope:
+        logger.info(f"[+] Scoping search to {scope}")
+
+    results = _hybrid_search(query, scope)
+    if scope and not results:
+        logger.info("[!] Nothing in scope, searching the whole knowledge base")
+        results = _hybrid_search(query)
 
     logger.debug(f"[+] Results: {results}")
     logger.info(f"[✓] Retrieved {len(results)} relevant chunks")
-    return [doc.page_content for doc in results]
+    logger.debug(f"[+] Embedding cache: {get_vector_store().embeddings.cache.stats()}")
+    return results
+
+
+def get_relevant_chunks(query: str) -> list[str]:
+    return [doc.page_content for doc in get_relevant_documents(query)]
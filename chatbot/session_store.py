@@ -0,0 +1,311 @@
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+
+from langchain_core.chat_history import InMemoryChatMessageHistory
+from langchain_core.messages import (
+    BaseMessage,
+    messages_from_dict,
+    messages_to_dict,
+    trim_messages,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from config.rag_config import (
+    HISTORY_TOKEN_BUDGET,
+    SESSION_BACKEND,
+    SESSION_DB_PATH,
+    SESSION_FLUSH_BATCH,
+    SESSION_FLUSH_INTERVAL,
+    SESSION_MAX_SESSIONS,
+    SESSION_TTL_SECONDS,
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def trim_history(
+    messages: list[BaseMessage], max_tokens: int = HISTORY_TOKEN_BUDGET
+) -> list[BaseMessage]:
+    """Keep the most recent turns that fit the token budget, starting on a human turn."""
+    return trim_messages(
+        messages,
+        max_tokens=max_tokens,
+        strategy="last",
+        token_counter=count_tokens_approximately,
+        start_on="human",
+        include_system=False,
+    )
+
+
+class SessionStore(ABC):
+    """Where chat histories live between requests."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> InMemoryChatMessageHistory:
+        """Return the history for a session, creating an empty one if needed."""
+
+    @abstractmethod
+    def save(self, session_id: str, history: InMemoryChatMessageHistory):
+        """Persist a history after a turn was added to it."""
+
+    def close(self):
+        pass
+
+
+class LRUSessionStore(SessionStore):
+    """
+    In-process store capped at `max_sessions`; the least recently used
+    session is evicted first and sessions idle for `ttl` seconds expire.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = SESSION_MAX_SESSIONS,
+        ttl: float = SESSION_TTL_SECONDS,
+        max_tokens: int = HISTORY_TOKEN_BUDGET,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_tokens = max_tokens
+        # session_id -> (history, last access time), oldest first
+        self._sessions: OrderedDict[str, tuple[InMemoryChatMessageHistory, float]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if (
+                len(self._sessions) <= self.max_sessions
+                and now - last_access < self.ttl
+            ):
+                break
+            del self._sessions[session_id]
+            self._forget(session_id)
+
+    def _forget(self, session_id: str):
+        """Called with the lock held when a session leaves memory."""
+
+    def _load(self, session_id: str) -> InMemoryChatMessageHistory:
+        """Fallback for sessions not held in memory."""
+        return InMemoryChatMessageHistory()
+
+    def get(self, session_id: str) -> InMemoryChatMessageHistory:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._sessions[session_id] = (entry[0], now)
+                self._sessions.move_to_end(session_id)
+                return entry[0]
+
+        history = self._load(session_id)
+        with self._lock:
+            self._sessions[session_id] = (history, now)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+        return history
+
+    def save(self, session_id: str, history: InMemoryChatMessageHistory):
+        history.messages = trim_history(history.messages, self.max_tokens)
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = (history, now)
+            self._sessions.move_to_end(session_id)
+            self._evict(now)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore(LRUSessionStore):
+    """
+    LRU store backed by SQLite so sessions survive restarts and can be
+    shared between worker processes.
+
+    New turns are written behind on a background thread every
+    `flush_interval` seconds or once `flush_batch` sessions are pending. A
+    flush appends them to whatever the row holds by then, so turns saved
+    by other processes are kept, and bumps the row's version. `get` checks
+    that version and reloads a session another process has written to.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = SESSION_DB_PATH,
+        flush_interval: float = SESSION_FLUSH_INTERVAL,
+        flush_batch: int = SESSION_FLUSH_BATCH,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "session_id TEXT PRIMARY KEY, messages TEXT NOT NULL, updated_at REAL NOT NULL, "
+            "version INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")]
+        if "version" not in columns:
+            # Databases written before rows were versioned
+            self._conn.execute(
+                "ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0"
+            )
+        self._conn.commit()
+        self._db_lock = threading.Lock()
+
+        # Row version each in-memory history reflects, and how many of its
+        # messages are already stored or pending
+        self._versions: dict[str, int] = {}
+        self._known: dict[str, int] = {}
+        # session_id -> serialized messages not yet flushed
+        self._pending: dict[str, list[dict]] = {}
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._writer = threading.Thread(
+            target=self._write_behind, name="session-writer", daemon=True
+        )
+        self._writer.start()
+
+    def _forget(self, session_id: str):
+        self._versions.pop(session_id, None)
+        self._known.pop(session_id, None)
+
+    def _read(self, session_id: str) -> tuple[int, list[dict]]:
+        """Version and messages of a session's row; expired rows read as empty."""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT version, messages, updated_at FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return 0, []
+        version, payload, updated_at = row
+        if updated_at < time.time() - self.ttl:
+            return version, []
+        return version, json.loads(payload)
+
+    def _load(self, session_id: str) -> InMemoryChatMessageHistory:
+        version, messages = self._read(session_id)
+        with self._pending_lock:
+            messages = messages + self._pending.get(session_id, [])
+        history = InMemoryChatMessageHistory(messages=messages_from_dict(messages))
+        with self._lock:
+            self._versions[session_id] = version
+            self._known[session_id] = len(history.messages)
+        return history
+
+    def get(self, session_id: str) -> InMemoryChatMessageHistory:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        version = row[0] if row else 0
+        with self._lock:
+            if self._versions.get(session_id) != version:
+                # Written by another process since it was loaded
+                self._sessions.pop(session_id, None)
+        return super().get(session_id)
+
+    def save(self, session_id: str, history: InMemoryChatMessageHistory):
+        with self._lock:
+            new = history.messages[self._known.get(session_id, 0) :]
+        super().save(session_id, history)
+        with self._lock:
+            self._known[session_id] = len(history.messages)
+        if not new:
+            return
+        with self._pending_lock:
+            self._pending.setdefault(session_id, []).extend(messages_to_dict(new))
+            pending = len(self._pending)
+        if pending >= self.flush_batch:
+            self._wake.set()
+
+    def flush(self):
+        with self._pending_lock:
+            batch, self._pending = self._pending, {}
+        now = time.time()
+        with self._db_lock:
+            # Holds the write lock from the reads to the commit, so turns
+            # another process flushes in between are not overwritten
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for session_id, new in batch.items():
+                    row = self._conn.execute(
+                        "SELECT version, messages, updated_at FROM sessions "
+                        "WHERE session_id = ?",
+                        (session_id,),
+                    ).fetchone()
+                    version, stored = 0, []
+                    if row is not None:
+                        version = row[0]
+                        if row[2] >= now - self.ttl:
+                            stored = json.loads(row[1])
+                    messages = trim_history(
+                        messages_from_dict(stored + new), self.max_tokens
+                    )
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO sessions "
+                        "(session_id, messages, updated_at, version) VALUES (?, ?, ?, ?)",
+                        (
+                            session_id,
+                            json.dumps(messages_to_dict(messages)),
+                            now,
+                            version + 1,
+                        ),
+                    )
+                    with self._lock:
+                        if self._versions.get(session_id) == version:
+                            # Nothing else was written, memory still matches
+                            self._versions[session_id] = version + 1
+                self._conn.execute(
+                    "DELETE FROM sessions WHERE updated_at < ?", (now - self.ttl,)
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                with self._pending_lock:
+                    for session_id, new in batch.items():
+                        self._pending[session_id] = new + self._pending.get(
+                            session_id, []
+                        )
+                raise
+
+    def _write_behind(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.error(f"[!] Failed to persist chat sessions: {e}")
+
+    def close(self):
+        self._closed.set()
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+def get_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    if backend == "memory":
+        return LRUSessionStore()
+    if backend == "sqlite":
+        store = SQLiteSessionStore()
+        # Flush the write-behind buffer when the process exits
+        atexit.register(store.close)
+        return store
+    raise ValueError(f"Unknown session backend: {backend}")
@@ -1,25 +1,106 @@
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain_community.utilities import DuckDuckGoSearchAPIWrapper
+from datetime import datetime
+
+from deadline import current_deadline
 from langchain_core.tools import tool
+from web_search import get_web_search
 
-search = DuckDuckGoSearchRun()
+from config.rag_config import SEARCH_TIMEOUT_SECONDS
+from kb.menu_engine import TAG_ALIASES, get_menu_engine, parse_time
 
 
 @tool
-def search_internet(query: str) -> str:
+def search_internet(query: str, related_queries: list[str] | None = None) -> str:
     """
-    Search for a query using DuckDuckGo.
+    Search the web using DuckDuckGo. Results are cached, and related
+    queries are searched at the same time as the main one.
 
     Args:
         query (str): The search query to be executed.
+        related_queries (list[str]): Further queries to search in parallel,
+            e.g. the reviews of the same restaurant.
+    Returns:
+        str: The search result, one block per query.
+    """
+    queries = [query, *(related_queries or [])]
+    timeout = SEARCH_TIMEOUT_SECONDS
+    deadline = current_deadline.get()
+    if deadline is not None:
+        if deadline.expired():
+            deadline.miss("tools")
+            return "No time left to search the web; answer from the context."
+        timeout = deadline.cap(timeout)
+    results = get_web_search().search_many(queries, timeout=timeout)
+    if len(results) == 1:
+        return results[0]
+    return "\n\n".join(
+        f"Results for {q}:\n{r}" for q, r in zip(queries, results, strict=True)
+    )
+
+
+@tool
+def search_menu(
+    restaurant: str = "",
+    keyword: str = "",
+    tags: list[str] | None = None,
+    min_price: float | None = None,
+    max_price: float | None = None,
+    sort: str = "cheapest",
+    limit: int = 10,
+) -> str:
+    """
+    Look up menu items of the known restaurants by price, tag and keyword.
+    Prefer this over the context for price comparisons and filtered lists.
+
+    Args:
+        restaurant (str): Restaurant name to search in, empty for all restaurants.
+        keyword (str): Dish or section word, e.g. "burger", "pizza", "dessert".
+        tags (list[str]): Item tags to require, e.g. "veg", "non-veg", "spicy".
+        min_price (float): Lowest price in INR.
+        max_price (float): Highest price in INR.
+        sort (str): "cheapest" or "most_expensive".
+        limit (int): Maximum number of items to return.
+    Returns:
+        str: Matching items with prices and restaurants.
+    """
+    engine = get_menu_engine()
+    restaurant_index = None
+    if restaurant:
+        restaurant_index = engine.find_restaurant(restaurant)
+        if restaurant_index is None:
+            return f"No menu data for restaurant: {restaurant}"
+
+    items = engine.filter_items(
+        restaurant=restaurant_index,
+        min_price=min_price,
+        max_price=max_price,
+        tags=[TAG_ALIASES.get(tag.lower(), tag.lower()) for tag in tags or []],
+        words=keyword.lower().split(),
+        descending=sort == "most_expensive",
+    )
+    if not items:
+        return "No matching menu items found."
+    return engine.format_items(items[:limit], len(items))
+
+
+@tool
+def restaurants_open_at(time: str = "now") -> str:
+    """
+    List the known restaurants that are open at a given time today.
+
+    Args:
+        time (str): A time such as "11pm", "6:30 pm", "12midnight", or "now".
     Returns:
-        str: The search result.
+        str: Names of the restaurants open at that time.
     """
-    api_wrapper = DuckDuckGoSearchAPIWrapper(region="in-en", max_results=10)
+    now = datetime.now()
+    minute = now.hour * 60 + now.minute if time == "now" else parse_time(time)
+    if minute is None:
+        return f"Could not understand the time: {time}"
 
-    search = DuckDuckGoSearchRun(api_wrapper=api_wrapper)
-    result = search.invoke(query)
-    return result
+    names = get_menu_engine().open_at(minute, now.weekday())
+    if not names:
+        return f"No known restaurant is open at {time}."
+    return "\n".join(names)
 
 
-TOOLS = [search_internet]
+TOOLS = [search_internet, search_menu, restaurants_open_at]
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from config.rag_config import (
+    SEARCH_BACKEND,
+    SEARCH_CACHE_MAX_ENTRIES,
+    SEARCH_CACHE_TTL_SECONDS,
+    SEARCH_MAX_RESULTS,
+    SEARCH_TIMEOUT_SECONDS,
+    SEARCH_WORKERS,
+    TOP_K,
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+SearchBackend = Callable[[str], str]
+
+
+class DuckDuckGoBackend:
+    """DuckDuckGo text search with one reusable HTTP client per thread."""
+
+    def __init__(
+        self,
+        region: str = "in-en",
+        max_results: int = SEARCH_MAX_RESULTS,
+        timeout: float = SEARCH_TIMEOUT_SECONDS,
+    ):
+        self.region = region
+        self.max_results = max_results
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _client(self):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            from duckduckgo_search import DDGS
+
+            client = self._local.client = DDGS(timeout=max(1, round(self.timeout)))
+        return client
+
+    def __call__(self, query: str) -> str:
+        results = self._client().text(
+            query, region=self.region, max_results=self.max_results
+        )
+        if not results:
+            return "No good DuckDuckGo Search Result was found"
+        return " ".join(r["body"] for r in results)
+
+
+def offline_backend(query: str) -> str:
+    return f"No live search results are available offline for: {query}"
+
+
+# Selected by SEARCH_BACKEND
+SEARCH_BACKENDS: dict[str, Callable[[], SearchBackend]] = {
+    "duckduckgo": DuckDuckGoBackend,
+    "offline": lambda: offline_backend,
+}
+
+
+def knowledge_base_fallback(query: str) -> str:
+    """BM25 matches from the knowledge base, used when the web is too slow."""
+    from retriever import lexical_search
+
+    docs = lexical_search(query, TOP_K)
+    if not docs:
+        return "No matching knowledge base entries either."
+    return "\n".join(doc.page_content for doc in docs)
+
+
+class WebSearch:
+    """
+    Caching, deduplicating front for a search backend.
+
+    Results are cached per normalized query for `ttl` seconds. Identical
+    queries already in flight share one backend call. `search_many` runs
+    sub-queries concurrently and waits at most `timeout` seconds in total;
+    queries that miss the budget or fail are answered by `fallback`, while
+    their searches keep running and fill the cache for next time.
+    """
+
+    def __init__(
+        self,
+        backend: SearchBackend,
+        fallback: Callable[[str], str] | None = None,
+        ttl: float = SEARCH_CACHE_TTL_SECONDS,
+        max_entries: int = SEARCH_CACHE_MAX_ENTRIES,
+        timeout: float = SEARCH_TIMEOUT_SECONDS,
+        workers: int = SEARCH_WORKERS,
+    ):
+        self.backend = backend
+        self.fallback = fallback
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._cache: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._in_flight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="web-search"
+        )
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    def _fetch(self, key: str, query: str) -> str:
+        try:
+            result = self.backend(query)
+            with self._lock:
+                self._cache[key] = (time.monotonic(), result)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def _submit(self, query: str) -> Future:
+        key = self.normalize(query)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                future = Future()
+                future.set_result(cached[1])
+                return future
+
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            self.misses += 1
+            future = self._pool.submit(self._fetch, key, query)
+            self._in_flight[key] = future
+            return future
+
+    def _fall_back(self, query: str, reason: str) -> str:
+        with self._lock:
+            self.fallbacks += 1
+        logger.warning(f"[!] Web search for '{query}' {reason}")
+        if self.fallback is None:
+            return f"Web search {reason}."
+        return f"Web search {reason}. From the knowledge base:\n{self.fallback(query)}"
+
+    def search_many(
+        self, queries: list[str], timeout: float | None = None
+    ) -> list[str]:
+        """Results in query order, within one shared latency budget."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        futures = [self._submit(query) for query in queries]
+
+        results = []
+        for query, future in zip(queries, futures, strict=True):
+            try:
+                remaining = max(0.0, deadline - time.monotonic())
+                results.append(future.result(timeout=remaining))
+            except FutureTimeoutError:
+                results.append(self._fall_back(query, "timed out"))
+            except Exception as e:  # noqa: BLE001  any failure falls back to the KB
+                results.append(self._fall_back(query, f"failed: {e}"))
+        return results
+
+    def search(self, query: str, timeout: float | None = None) -> str:
+        return self.search_many([query], timeout)[0]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "fallbacks": self.fallbacks,
+                "cached": len(self._cache),
+            }
+
+
+_web_search: WebSearch | None = None
+_web_search_lock = threading.Lock()
+
+
+def get_web_search() -> WebSearch:
+    """Shared `WebSearch` over SEARCH_BACKEND with the knowledge base as fallback."""
+    global _web_search
+    if _web_search is None:
+        with _web_search_lock:
+            if _web_search is None:
+                _web_search = WebSearch(
+                    SEARCH_BACKENDS[SEARCH_BACKEND](), knowledge_base_fallback
+                )
+    return _web_search
+
+
+def set_web_search(web_search: WebSearch | None):
+    """Replace the shared instance, e.g. with one over a local stub backend."""
+    global _web_search
+    with _web_search_lock:
+        _web_search = web_search
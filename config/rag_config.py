@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 RAW_JSON_DIR = Path("data/raw_json")
@@ -7,14 +8,108 @@ PROCESSED_JSON_DIR = Path("data/processed_json")
 #     "models/gemini-embedding-exp-03-07"
 # )
 EMBEDDING_MODEL = "BAAI/bge-m3"
+EMBEDDING_DIM = 1024
 
 GENERATION_MODEL = "gemini-2.0-flash"
 TEMPERATURE = 0.2
 TOP_P = 0.9
 
+# Offline stand-ins for batch runs and tests without network access
+LLM_BACKEND = os.getenv("LLM_BACKEND", "google")  # "google" or "offline"
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "duckduckgo")  # "duckduckgo" or "offline"
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "huggingface")  # "huggingface" or "offline"
+OFFLINE_LLM_LATENCY = float(os.getenv("OFFLINE_LLM_LATENCY", "0"))  # seconds per call
+
+# Web search tool
+SEARCH_MAX_RESULTS = 10
+SEARCH_TIMEOUT_SECONDS = 6.0  # budget per tool call, then the KB is used instead
+SEARCH_CACHE_TTL_SECONDS = 60 * 60
+SEARCH_CACHE_MAX_ENTRIES = 512
+SEARCH_WORKERS = 4  # sub-queries searched concurrently
+
 # Qdrant Config
 # QDRANT_HOST = "localhost"  # or 'qdrant://localhost:6333' if using Qdrant client
 # QDRANT_PORT = 6333
 QDRANT_COLLECTION_NAME = "restaurant_knowledge_base"
 QDRANT_EMBEDDING_LOCAL_PATH = "/tmp/langchain_qdrant"
 TOP_K = 5
+# Vector storage. Quantization and on-disk vectors take effect on a Qdrant
+# server; local mode keeps float32 vectors in memory regardless
+VECTOR_DIM = None  # keep only the first N dimensions (Matryoshka-style), None keeps all
+VECTOR_QUANTIZATION = None  # None, "int8" or "binary"
+VECTOR_RESCORE = True  # re-rank quantized candidates with the original vectors
+VECTOR_OVERSAMPLING = 2.0  # candidates fetched per result before rescoring
+VECTOR_ON_DISK = False  # keep original vectors on disk, quantized ones stay in RAM
+# Knowledge base chunking, token counts are for the embedding model's tokenizer
+CHUNK_MAX_TOKENS = 512
+# Index build: chunks per encoder call and points per Qdrant upsert
+EMBED_BATCH_SIZE = 64
+UPSERT_BATCH_SIZE = 256
+EMBED_WORKERS = 1  # embedding processes, more than one shards each batch across them
+EMBED_THREADS_PER_WORKER = None  # intra-op threads per process, None splits the cores
+# Chunk IDs already embedded into the collection, used for incremental rebuilds
+QDRANT_MANIFEST_PATH = Path(f"{QDRANT_EMBEDDING_LOCAL_PATH}_manifest.json")
+
+# Embedding cache shared by indexing and retrieval
+EMBEDDING_CACHE_PATH = Path(".embedding_cache.db")
+EMBEDDING_CACHE_MEMORY_ITEMS = 10_000
+
+# Follow-up question rewriting
+REWRITE_CACHE_SIZE = 1024
+
+# Chat sessions
+SESSION_BACKEND = "memory"  # "memory" or "sqlite"
+SESSION_MAX_SESSIONS = 10_000
+SESSION_TTL_SECONDS = 24 * 60 * 60
+SESSION_DB_PATH = Path(".sessions.db")
+SESSION_FLUSH_INTERVAL = 2.0  # seconds between write-behind flushes
+SESSION_FLUSH_BATCH = 100  # pending sessions that trigger an early flush
+HISTORY_TOKEN_BUDGET = 2000  # older turns are dropped beyond this
+
+# Lexical (BM25) index built next to the Qdrant collection
+LEXICAL_INDEX_PATH = Path(f"{QDRANT_EMBEDDING_LOCAL_PATH}_bm25.json")
+RRF_K = 60  # reciprocal rank fusion damping constant
+
+# Restrict retrieval to the restaurants/cities a query names
+ENTITY_LOOKUP_PATH = Path(f"{QDRANT_EMBEDDING_LOCAL_PATH}_entities.json")
+ENTITY_SCOPING = True
+ENTITY_CUISINE_SCOPING = True  # a named cuisine scopes to restaurants listing it
+
+# Answer templated price/filter/hours questions from the menu engine, skipping the LLM
+STRUCTURED_FAST_PATH = True
+
+# Semantic answer cache in front of retrieval and the agent
+ANSWER_CACHE_ENABLED = True
+ANSWER_CACHE_THRESHOLD = 0.95  # cosine similarity between standalone queries
+ANSWER_CACHE_MAX_ENTRIES = 1000
+ANSWER_CACHE_TTL_SECONDS = 15 * 60
+
+# Preprocessing
+PREPROCESS_WORKERS = None  # process pool size, None uses every core
+PREPROCESS_STATE_PATH = Path("data/preprocess_state.json")
+
+# FX rates used to convert menu prices to INR
+FX_RATES_URL = "https://api.exchangerate-api.com/v4/latest/INR"
+FX_RATES_SOURCE_FILE = os.getenv(
+    "FX_RATES_SOURCE_FILE"
+)  # local file instead of the API
+FX_RATES_SNAPSHOT_PATH = Path("data/fx_rates.json")
+FX_RATES_TTL_SECONDS = 24 * 60 * 60
+FX_RATES_TIMEOUT = 5  # seconds
+
+# Per-request latency budget (chatbot/deadline.py)
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "20"))
+AGENT_MAX_ITERATIONS = 6
+AGENT_STEP_SECONDS = 3.0  # rough cost of one agent step, caps iterations to the budget
+DEADLINE_FALLBACK_RESERVE = 3.0  # kept back for a context-only reply
+STAGE_WORKERS = 32  # threads running blocking stages, shared by concurrent requests
+
+# Batch question answering (chatbot/batch.py)
+BATCH_WORKERS = 8  # questions answered concurrently
+
+# Tracing and metrics (utils/instrumentation.py)
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION", "0") == "1"
+TRACE_PATH = os.getenv("TRACE_PATH")  # JSONL file of finished spans, unset to skip
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # Prometheus endpoint, 0 to skip
+PROFILE_DIR = Path("profiles")  # folded stacks of profiled requests
+PROFILE_INTERVAL = 0.005  # seconds between profiler samples
@@ -0,0 +1,9 @@
+# Crawl engine
+CRAWL_WORKERS = 4  # restaurants scraped concurrently
+CRAWL_RATE_PER_HOST = 0.5  # sustained requests per second allowed per host
+CRAWL_BURST_PER_HOST = 2  # requests a host may receive back to back
+CRAWL_POOL_MAXSIZE = 16  # keep-alive connections kept per host
+CRAWL_MAX_RETRIES = 4
+CRAWL_BACKOFF_BASE = 1.0  # seconds, doubled on every retry
+CRAWL_BACKOFF_MAX = 60.0
+CRAWL_RETRY_STATUSES = (429, 500, 502, 503, 504)
@@ -1,66 +1,325 @@
+import argparse
+import hashlib
+import json
+import time
+import uuid
+import warnings
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import copy_context
+
+# from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from dotenv import load_dotenv
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_qdrant import QdrantVectorStore
 from qdrant_client import QdrantClient
-from qdrant_client.http.models import Distance, VectorParams
-from kb.preprocess import extract_docs
-from utils.logger import get_logger
+from qdrant_client.http.models import PayloadSchemaType, PointIdsList, PointStruct
+
 from config.rag_config import (
-    QDRANT_COLLECTION_NAME,
+    EMBED_BATCH_SIZE,
+    EMBED_WORKERS,
     EMBEDDING_MODEL,
+    ENTITY_LOOKUP_PATH,
+    LEXICAL_INDEX_PATH,
+    QDRANT_COLLECTION_NAME,
     QDRANT_EMBEDDING_LOCAL_PATH,
+    QDRANT_MANIFEST_PATH,
+    UPSERT_BATCH_SIZE,
 )
-
-# from langchain_google_genai import GoogleGenerativeAIEmbeddings
-from langchain_huggingface.embeddings import HuggingFaceEmbeddings
-from dotenv import load_dotenv
+from kb.entities import SCOPE_FIELDS, EntityLookup
+from kb.lexical_index import BM25Index
+from kb.preprocess import iter_docs, iter_restaurants
+from kb.vector_params import quantization_config, vector_params, vector_settings
+from utils.embedding_cache import get_embeddings
+from utils.instrumentation import inc, span
+from utils.logger import get_logger
 
 load_dotenv()
 logger = get_logger()
 
 
-def build_index():
-    logger.info("[+] Loading documents...")
-    docs = extract_docs()
+def chunk_id(doc: Document) -> str:
+    """Stable point ID derived from the chunk's content and metadata."""
+    payload = json.dumps(
+        {"content": doc.page_content, "metadata": doc.metadata}, sort_keys=True
+    )
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return str(uuid.UUID(hex=digest[:32]))
 
-    logger.info("[+] Initializing embeddings...")
 
-    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+def load_manifest() -> dict:
+    if not QDRANT_MANIFEST_PATH.exists():
+        return {}
+    try:
+        with open(QDRANT_MANIFEST_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"[!] Ignoring unreadable manifest {QDRANT_MANIFEST_PATH}: {e}")
+        return {}
 
-    logger.info("[+] Connecting to Qdrant...")
-    client = QdrantClient(path=QDRANT_EMBEDDING_LOCAL_PATH)
 
-    logger.info("[+] Creating collection...")
-    if client.collection_exists(collection_name=QDRANT_COLLECTION_NAME):
+def save_manifest(chunk_ids: set[str]):
+    chunks = sorted(chunk_ids)
+    manifest = {
+        "collection": QDRANT_COLLECTION_NAME,
+        "embedding_model": EMBEDDING_MODEL,
+        "vectors": vector_settings(),
+        # Changes whenever the indexed chunks do; consumers use it to
+        # invalidate anything derived from the previous knowledge base
+        "version": hashlib.sha256("\n".join(chunks).encode("utf-8")).hexdigest()[:16],
+        "chunks": chunks,
+    }
+    tmp_path = QDRANT_MANIFEST_PATH.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    tmp_path.replace(QDRANT_MANIFEST_PATH)
+
+
+def indexed_chunk_ids(client: QdrantClient) -> set[str] | None:
+    """
+    Chunk IDs the existing collection is known to hold, or None when the
+    collection has to be rebuilt from scratch.
+    """
+    if not client.collection_exists(collection_name=QDRANT_COLLECTION_NAME):
+        return None
+
+    manifest = load_manifest()
+    if (
+        manifest.get("collection") != QDRANT_COLLECTION_NAME
+        or manifest.get("embedding_model") != EMBEDDING_MODEL
+        or manifest.get("vectors") != vector_settings()
+    ):
+        return None
+
+    chunk_ids = set(manifest.get("chunks", []))
+    points = client.count(collection_name=QDRANT_COLLECTION_NAME, exact=True).count
+    if points != len(chunk_ids):
         logger.info(
-            f"[!] Collection {QDRANT_COLLECTION_NAME} already exists. Deleting it..."
+            f"[!] Manifest lists {len(chunk_ids)} chunks but collection has {points} points"
         )
-        client.delete_collection(collection_name=QDRANT_COLLECTION_NAME)
-    client.create_collection(
-        collection_name=QDRANT_COLLECTION_NAME,
-        vectors_config=VectorParams(size=1024, distance=Distance.COSINE),
-    )
+        return None
 
-    logger.info("[+] Inserting vectors...")
+    return chunk_ids
 
-    vector_store = QdrantVectorStore(
-        client=client,
-        embedding=embeddings,
-        collection_name=QDRANT_COLLECTION_NAME,
+
+def iter_batches(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def to_point(point_id: str, doc: Document, vector: list[float]) -> PointStruct:
+    """Point in the payload layout `QdrantVectorStore` reads back."""
+    return PointStruct(
+        id=point_id,
+        vector=vector,
+        payload={
+            QdrantVectorStore.CONTENT_KEY: doc.page_content,
+            QdrantVectorStore.METADATA_KEY: doc.metadata,
+        },
     )
 
-    batch_size = 10
-    for i in range(0, len(docs), batch_size):
-        batch = docs[i : i + batch_size]
+
+def index_chunks(
+    client: QdrantClient,
+    chunks: Iterable[tuple[str, Document]],
+    embeddings: Embeddings,
+    embed_batch_size: int = EMBED_BATCH_SIZE,
+    upsert_batch_size: int = UPSERT_BATCH_SIZE,
+) -> set[str]:
+    """
+    Embed and upsert a stream of (chunk ID, document) pairs.
+
+    Upserts run on a writer thread while the next batch is embedded. Only one
+    upsert is in flight at a time, so memory holds about one embedding batch
+    and two upsert batches whatever the corpus size.
+
+    Returns:
+        IDs of the points written. Failed batches are logged and left out.
+    """
+    written: set[str] = set()
+    pending: Future | None = None
+    points: list[PointStruct] = []
+    embedded = 0
+    started = time.perf_counter()
+
+    def upsert(batch: list[PointStruct]) -> list[str]:
+        with span("upsert", points=len(batch)):
+            client.upsert(collection_name=QDRANT_COLLECTION_NAME, points=batch)
+        inc("points_upserted_total", len(batch))
+        return [point.id for point in batch]
+
+    def wait_for_upsert():
         try:
-            vector_store.add_documents(documents=batch)
+            ids = pending.result()
+            written.update(ids)
+            logger.info(f"[✓] Upserted {len(ids)} points")
+        except Exception:
+            logger.exception("[!] Failed upsert batch")
+
+    with ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix="qdrant-writer"
+    ) as writer:
+        for batch in iter_batches(chunks, embed_batch_size):
+            try:
+                vectors = embeddings.embed_documents(
+                    [doc.page_content for _, doc in batch]
+                )
+            except Exception:
+                logger.exception(f"[!] Failed to embed {len(batch)} chunks")
+                continue
+            points.extend(
+                to_point(point_id, doc, vector)
+                for (point_id, doc), vector in zip(batch, vectors, strict=True)
+            )
+            embedded += len(batch)
+
+            while len(points) >= upsert_batch_size:
+                if pending is not None:
+                    wait_for_upsert()
+                # Runs in this thread's context so upsert spans keep their parent
+                pending = writer.submit(
+                    copy_context().run, upsert, points[:upsert_batch_size]
+                )
+                points = points[upsert_batch_size:]
+
+        if points:
+            if pending is not None:
+                wait_for_upsert()
+            pending = writer.submit(copy_context().run, upsert, points)
+        if pending is not None:
+            wait_for_upsert()
+
+    elapsed = time.perf_counter() - started
+    if embedded:
+        logger.info(
+            f"[✓] Embedded {embedded} chunks in {elapsed:.1f}s "
+            f"({embedded / elapsed:.1f} chunks/s)"
+        )
+    return written
+
+
+def build_index(incremental: bool = True, workers: int = EMBED_WORKERS):
+    """
+    Embed the processed restaurant data into the Qdrant collection.
+
+    With `incremental`, chunks are keyed by a content hash and only new or
+    changed chunks are embedded; points for chunks that disappeared are
+    deleted. The collection is rebuilt from scratch when no usable manifest
+    exists or `incremental` is False. Chunks are streamed from the processed
+    files, so the corpus is never held in memory at once.
+
+    With more than one `workers`, embedding runs in that many processes and
+    each embedding batch is scaled up so every worker gets a full shard.
+    """
+    logger.info("[+] Connecting to Qdrant...")
+    client = QdrantClient(path=QDRANT_EMBEDDING_LOCAL_PATH)
+
+    previous_ids = indexed_chunk_ids(client) if incremental else None
+
+    if previous_ids is None:
+        logger.info("[+] Creating collection...")
+        if client.collection_exists(collection_name=QDRANT_COLLECTION_NAME):
             logger.info(
-                f"[✓] Successfully inserted batch {i // batch_size + 1} ({len(batch)} docs)"
+                f"[!] Collection {QDRANT_COLLECTION_NAME} already exists. Deleting it..."
+            )
+            client.delete_collection(collection_name=QDRANT_COLLECTION_NAME)
+        client.create_collection(
+            collection_name=QDRANT_COLLECTION_NAME,
+            vectors_config=vector_params(),
+            quantization_config=quantization_config(),
+        )
+        previous_ids = set()
+
+    # Indexes for the payload filters retrieval scopes queries with; a no-op
+    # in local mode, which warns about it, and idempotent on a server
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        for field in SCOPE_FIELDS:
+            client.create_payload_index(
+                collection_name=QDRANT_COLLECTION_NAME,
+                field_name=f"{QdrantVectorStore.METADATA_KEY}.{field}",
+                field_schema=PayloadSchemaType.KEYWORD,
             )
-        except Exception as e:
-            logger.error(f"[!] Failed batch {i // batch_size + 1}: {e}")
-            continue
+
+    current_ids: set[str] = set()
+
+    def new_chunks() -> Iterator[tuple[str, Document]]:
+        for doc in iter_docs():
+            point_id = chunk_id(doc)
+            if point_id in current_ids:
+                continue
+            current_ids.add(point_id)
+            if point_id not in previous_ids:
+                yield point_id, doc
+
+    # The model itself is only loaded once there is something to embed
+    embeddings = get_embeddings(workers=workers)
+    logger.info("[+] Embedding new chunks...")
+    try:
+        with span("index_chunks", incremental=incremental) as s:
+            written_ids = index_chunks(
+                client,
+                new_chunks(),
+                embeddings,
+                embed_batch_size=EMBED_BATCH_SIZE * max(1, workers),
+            )
+            s.set(chunks=len(current_ids), written=len(written_ids))
+    finally:
+        embeddings.close()
+
+    stale_ids = sorted(previous_ids - current_ids)
+    if stale_ids:
+        client.delete(
+            collection_name=QDRANT_COLLECTION_NAME,
+            points_selector=PointIdsList(points=stale_ids),
+        )
+        logger.info(f"[✓] Deleted {len(stale_ids)} stale points")
+
+    unchanged = len(previous_ids) - len(stale_ids)
+    logger.info(
+        f"[+] {len(current_ids)} chunks: {len(written_ids)} embedded, "
+        f"{unchanged} unchanged, {len(stale_ids)} deleted"
+    )
+    if written_ids:
+        logger.info(f"[+] Embedding cache: {embeddings.cache.stats()}")
+
+    # Failed batches stay out of the manifest and are retried on the next run
+    indexed_ids = (previous_ids - set(stale_ids)) | written_ids
+    save_manifest(indexed_ids)
+
+    # Cheap to rebuild, so the lexical index is always built from scratch
+    logger.info("[+] Building lexical index...")
+    BM25Index.build_on_disk(
+        ((chunk_id(doc), doc) for doc in iter_docs()), LEXICAL_INDEX_PATH
+    )
+    logger.info(f"[✓] Lexical index saved to {LEXICAL_INDEX_PATH}")
+
+    EntityLookup.build(iter_restaurants()).save(ENTITY_LOOKUP_PATH)
+    logger.info(f"[✓] Entity lookup saved to {ENTITY_LOOKUP_PATH}")
 
     logger.info("[✓] Indexing complete!")
 
 
 if __name__ == "__main__":
-    build_index()
+    parser = argparse.ArgumentParser(description="Build the restaurant knowledge base")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="drop the collection and re-embed everything",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=EMBED_WORKERS,
+        help="embedding processes (CPU-only hosts)",
+    )
+    args = parser.parse_args()
+
+    build_index(incremental=not args.full, workers=args.workers)
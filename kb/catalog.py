@@ -0,0 +1,398 @@
+import json
+import math
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from config.rag_config import PROCESSED_JSON_DIR
+from models.resturant import (
+    Contact,
+    Currency,
+    Location,
+    MenuItem,
+    MenuSection,
+    Restaurant,
+    Review,
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+CURRENCIES = list(Currency)
+_CURRENCY_CODES = {currency: code for code, currency in enumerate(CURRENCIES)}
+_MISSING = 0  # string id of None
+
+
+def _text(column: str) -> property:
+    """Attribute read from a string-id column through the intern table."""
+
+    def get(self):
+        catalog = self._catalog
+        return catalog.strings[getattr(catalog, column)[self._index]]
+
+    return property(get)
+
+
+def _number(column: str, optional: bool = False) -> property:
+    """Attribute read from a float column; with `optional`, NaN reads as None."""
+
+    def get(self):
+        value = getattr(self._catalog, column)[self._index]
+        return None if optional and math.isnan(value) else value
+
+    return property(get)
+
+
+def _span(offsets: array, index: int) -> range:
+    return range(offsets[index], offsets[index + 1])
+
+
+def _plain(value):
+    if isinstance(value, _View):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_plain(v) for v in value]
+    return value
+
+
+class _View:
+    """
+    One row of a `Catalog`, read on attribute access. Views expose the
+    fields of their pydantic model, so code that reads a `Restaurant`
+    reads a `RestaurantView` unchanged.
+    """
+
+    __slots__ = ("_catalog", "_index")
+    _model = None
+
+    def __init__(self, catalog: "Catalog", index: int):
+        self._catalog = catalog
+        self._index = index
+
+    def to_dict(self) -> dict:
+        return {
+            field: _plain(getattr(self, field)) for field in self._model.model_fields
+        }
+
+    def to_model(self):
+        """The validated pydantic model for this row."""
+        return self._model.model_validate(self.to_dict())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._index})"
+
+
+class ItemView(_View):
+    __slots__ = ()
+    _model = MenuItem
+
+    item_name = _text("item_names")
+    description = _text("item_descriptions")
+    price = _number("item_prices")
+
+    @property
+    def currency(self) -> Currency:
+        return CURRENCIES[self._catalog.item_currencies[self._index]]
+
+    @property
+    def tags(self) -> list[str]:
+        catalog = self._catalog
+        return [
+            catalog.strings[catalog.tags[t]]
+            for t in _span(catalog.item_tags, self._index)
+        ]
+
+
+class SectionView(_View):
+    __slots__ = ()
+    _model = MenuSection
+
+    section = _text("section_names")
+
+    @property
+    def items(self) -> list[ItemView]:
+        return [
+            ItemView(self._catalog, i)
+            for i in _span(self._catalog.section_items, self._index)
+        ]
+
+
+class ReviewView(_View):
+    __slots__ = ()
+    _model = Review
+
+    rating = _number("review_ratings")
+    review_text = _text("review_texts")
+
+
+class LocationView(_View):
+    __slots__ = ()
+    _model = Location
+
+    address = _text("addresses")
+    city = _text("cities")
+    pincode = _text("pincodes")
+    latitude = _number("latitudes", optional=True)
+    longitude = _number("longitudes", optional=True)
+
+
+class ContactView(_View):
+    __slots__ = ()
+    _model = Contact
+
+    phone = _text("phones")
+    email = _text("emails")
+    website = _text("websites")
+
+
+class RestaurantView(_View):
+    __slots__ = ()
+    _model = Restaurant
+
+    restaurant_name = _text("names")
+    description = _text("descriptions")
+
+    @property
+    def location(self) -> LocationView:
+        return LocationView(self._catalog, self._index)
+
+    @property
+    def contact(self) -> ContactView | None:
+        if not self._catalog.has_contact[self._index]:
+            return None
+        return ContactView(self._catalog, self._index)
+
+    @property
+    def operating_hours(self) -> dict[str, str]:
+        catalog = self._catalog
+        return {
+            catalog.strings[catalog.hour_days[h]]: catalog.strings[
+                catalog.hour_timings[h]
+            ]
+            for h in _span(catalog.restaurant_hours, self._index)
+        }
+
+    @property
+    def features(self) -> list[str]:
+        catalog = self._catalog
+        return [
+            catalog.strings[catalog.features[f]]
+            for f in _span(catalog.restaurant_features, self._index)
+        ]
+
+    @property
+    def menu(self) -> list[SectionView]:
+        return [
+            SectionView(self._catalog, s)
+            for s in _span(self._catalog.restaurant_sections, self._index)
+        ]
+
+    @property
+    def reviews(self) -> list[ReviewView]:
+        return [
+            ReviewView(self._catalog, v)
+            for v in _span(self._catalog.restaurant_reviews, self._index)
+        ]
+
+
+class Catalog:
+    """
+    Read-only, compact in-memory copy of the processed restaurants.
+
+    Every string is stored once in `strings` and referenced by id. Rows are
+    kept column-wise in arrays: one entry per restaurant, section, item and
+    review, with prices, ratings and coordinates as doubles and currencies
+    as one-byte codes. A restaurant's sections, reviews, hours and features
+    and a section's items are contiguous, found through offset arrays.
+    Indexing or iterating yields `RestaurantView`s, converted to pydantic
+    models only on `to_model()`.
+
+    Records are not validated: the processed JSON was written from
+    validated models. A record missing fields is skipped.
+    """
+
+    def __init__(self):
+        self.strings: list[str | None] = [None]
+        self._ids: dict[str, int] | None = {}
+
+        # per restaurant
+        self.names = array("I")
+        self.descriptions = array("I")
+        self.addresses = array("I")
+        self.cities = array("I")
+        self.pincodes = array("I")
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.has_contact = array("B")
+        self.phones = array("I")
+        self.emails = array("I")
+        self.websites = array("I")
+        self.restaurant_hours = array("I", [0])
+        self.restaurant_features = array("I", [0])
+        self.restaurant_sections = array("I", [0])
+        self.restaurant_reviews = array("I", [0])
+        # per operating-hours entry, feature, section, item, tag and review
+        self.hour_days = array("I")
+        self.hour_timings = array("I")
+        self.features = array("I")
+        self.section_names = array("I")
+        self.section_items = array("I", [0])
+        self.item_names = array("I")
+        self.item_descriptions = array("I")
+        self.item_prices = array("d")
+        self.item_currencies = array("B")
+        self.item_tags = array("I", [0])
+        self.tags = array("I")
+        self.review_ratings = array("d")
+        self.review_texts = array("I")
+
+        self._by_name: dict[str, int] = {}
+
+    @classmethod
+    def build(cls, records: Iterable[dict]) -> "Catalog":
+        """Catalog of records shaped like the processed JSON."""
+        catalog = cls()
+        for data in records:
+            catalog._add(data)
+        catalog._freeze()
+        return catalog
+
+    @classmethod
+    def from_dir(cls, path: Path = PROCESSED_JSON_DIR) -> "Catalog":
+        catalog = cls()
+        for file_path in sorted(path.glob("*.json")):
+            with open(file_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            try:
+                catalog._add(data)
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                logger.warning(f"[!] Skipping {file_path.name}: {e!r}")
+        catalog._freeze()
+        return catalog
+
+    def _intern(self, text: str | None) -> int:
+        if text is None:
+            return _MISSING
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def _add(self, data: dict):
+        # Read the whole record before appending, so a bad one leaves no
+        # partial rows behind
+        intern = self._intern
+        location = data["location"]
+        contact = data["contact"]
+        hours = [(intern(d), intern(t)) for d, t in data["operating_hours"].items()]
+        features = [intern(f) for f in data.get("features", [])]
+        sections = [
+            (
+                intern(section["section"]),
+                [
+                    (
+                        intern(item["item_name"]),
+                        intern(item["description"]),
+                        float(item["price"]),
+                        _CURRENCY_CODES[Currency(item.get("currency", "INR"))],
+                        [intern(tag) for tag in item.get("tags", [])],
+                    )
+                    for item in section["items"]
+                ],
+            )
+            for section in data["menu"]
+        ]
+        reviews = [
+            (float(review["rating"]), intern(review["review_text"]))
+            for review in data["reviews"]
+        ]
+        latitude, longitude = location["latitude"], location["longitude"]
+        name = data["restaurant_name"]
+        row = (
+            intern(name),
+            intern(data["description"]),
+            intern(location["address"]),
+            intern(location["city"]),
+            intern(location["pincode"]),
+            math.nan if latitude is None else float(latitude),
+            math.nan if longitude is None else float(longitude),
+        )
+        contact_ids = (
+            (
+                intern(contact["phone"]),
+                intern(contact["email"]),
+                intern(contact["website"]),
+            )
+            if contact is not None
+            else (_MISSING, _MISSING, _MISSING)
+        )
+
+        index = len(self.names)
+        self.names.append(row[0])
+        self.descriptions.append(row[1])
+        self.addresses.append(row[2])
+        self.cities.append(row[3])
+        self.pincodes.append(row[4])
+        self.latitudes.append(row[5])
+        self.longitudes.append(row[6])
+        self.has_contact.append(contact is not None)
+        self.phones.append(contact_ids[0])
+        self.emails.append(contact_ids[1])
+        self.websites.append(contact_ids[2])
+
+        for days, timing in hours:
+            self.hour_days.append(days)
+            self.hour_timings.append(timing)
+        self.restaurant_hours.append(len(self.hour_days))
+        self.features.extend(features)
+        self.restaurant_features.append(len(self.features))
+
+        for section_name, items in sections:
+            self.section_names.append(section_name)
+            for item_name, description, price, currency, tags in items:
+                self.item_names.append(item_name)
+                self.item_descriptions.append(description)
+                self.item_prices.append(price)
+                self.item_currencies.append(currency)
+                self.tags.extend(tags)
+                self.item_tags.append(len(self.tags))
+            self.section_items.append(len(self.item_names))
+        self.restaurant_sections.append(len(self.section_names))
+
+        for rating, text in reviews:
+            self.review_ratings.append(rating)
+            self.review_texts.append(text)
+        self.restaurant_reviews.append(len(self.review_ratings))
+
+        self._by_name.setdefault(name, index)
+
+    def _freeze(self):
+        # The intern table is only needed while adding rows
+        self._ids = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> RestaurantView:
+        if not 0 <= index < len(self.names):
+            raise IndexError(index)
+        return RestaurantView(self, index)
+
+    def __iter__(self) -> Iterator[RestaurantView]:
+        for index in range(len(self.names)):
+            yield RestaurantView(self, index)
+
+    @property
+    def item_count(self) -> int:
+        return len(self.item_names)
+
+    def find(self, name: str) -> RestaurantView | None:
+        """The restaurant with exactly this name, if any."""
+        index = self._by_name.get(name)
+        return None if index is None else RestaurantView(self, index)
+
+    def models(self) -> Iterator[Restaurant]:
+        """Every restaurant as a validated pydantic model, one at a time."""
+        for view in self:
+            yield view.to_model()
@@ -0,0 +1,164 @@
+import json
+from collections.abc import Iterable
+from pathlib import Path
+
+from kb.lexical_index import tokenize
+from models.resturant import Restaurant
+
+# Metadata fields a query can be scoped to, with a payload index each
+SCOPE_FIELDS = ("restaurant", "city", "chunk_type")
+
+
+def normalize(text: str) -> str:
+    return " ".join(tokenize(text.replace("'", "")))
+
+
+def _variants(phrase: str) -> set[str]:
+    """The phrase and its naive plural, e.g. "burger" and "burgers"."""
+    return {phrase, f"{phrase}s"} if phrase else set()
+
+
+def restaurant_aliases(name: str) -> set[str]:
+    """
+    Ways a query may name a restaurant: the full name, without a leading
+    "the", and the part before a " - " subtitle.
+    """
+    aliases = set()
+    for part in (name, name.split(" - ")[0]):
+        alias = normalize(part)
+        aliases.add(alias)
+        if alias.startswith("the "):
+            aliases.add(alias[4:])
+    return aliases - {""}
+
+
+class EntityLookup:
+    """
+    Restaurant, city and cuisine names from the processed data. Queries are
+    matched on whole normalized token sequences, so "mcdonalds" finds
+    McDonald's but "club" alone does not find Vint Club.
+    """
+
+    def __init__(
+        self,
+        restaurants: dict[str, str],
+        cities: dict[str, str],
+        cuisine_aliases: dict[str, str],
+        cuisines: dict[str, list[str]],
+    ):
+        # alias -> restaurant name
+        self.restaurants = restaurants
+        # alias -> city name
+        self.cities = cities
+        # alias -> cuisine
+        self.cuisine_aliases = cuisine_aliases
+        # cuisine -> names of the restaurants listing it
+        self.cuisines = cuisines
+        self.restaurant_count = len(set(restaurants.values()))
+
+    @classmethod
+    def build(cls, restaurants: Iterable[Restaurant]) -> "EntityLookup":
+        """
+        A cuisine is served by the restaurants listing it in their description
+        and by those with a menu section or item named after it, e.g. a
+        "Pizzeria" of Margherita Pizzas or a "Desserts" section.
+        """
+        names, cities, cuisine_aliases, cuisines = {}, {}, {}, {}
+        # restaurant -> " | "-separated normalized section and item names
+        menus = {}
+        for restaurant in restaurants:
+            name = restaurant.restaurant_name
+            menus[name] = " | ".join(
+                normalize(text)
+                for section in restaurant.menu
+                for text in (section.section, *(i.item_name for i in section.items))
+            )
+            for alias in restaurant_aliases(name):
+                names[alias] = name
+            for alias in _variants(normalize(restaurant.location.city)):
+                cities[alias] = restaurant.location.city
+            for cuisine in (restaurant.description or "").split(","):
+                cuisine = cuisine.strip()
+                if not cuisine:
+                    continue
+                for alias in _variants(normalize(cuisine)):
+                    cuisine_aliases[alias] = cuisine
+                serving = cuisines.setdefault(cuisine, [])
+                if name not in serving:
+                    serving.append(name)
+
+        for cuisine, serving in cuisines.items():
+            aliases = [a for a, c in cuisine_aliases.items() if c == cuisine]
+            for name, menu in menus.items():
+                menu = f" {menu} "
+                if name not in serving and any(f" {a} " in menu for a in aliases):
+                    serving.append(name)
+        return cls(names, cities, cuisine_aliases, cuisines)
+
+    @staticmethod
+    def _matches(text: str, aliases: dict) -> list:
+        found = []
+        for alias, value in aliases.items():
+            if f" {alias} " in text and value not in found:
+                found.append(value)
+        return found
+
+    def detect(self, query: str) -> dict[str, list]:
+        """Restaurants, cities and cuisines named in the query."""
+        text = f" {normalize(query)} "
+        return {
+            "restaurant": self._matches(text, self.restaurants),
+            "city": self._matches(text, self.cities),
+            "cuisine": self._matches(text, self.cuisine_aliases),
+        }
+
+    def scope(self, query: str, use_cuisines: bool = True) -> dict[str, list[str]]:
+        """
+        Metadata values the query restricts the search to, e.g.
+        `{"restaurant": ["Burger King"]}`. Empty when nothing narrows it.
+
+        A named restaurant wins over cuisines; a cuisine scopes the search to
+        the restaurants listing it, unless they all do.
+        """
+        entities = self.detect(query)
+        scope = {}
+        if entities["restaurant"]:
+            scope["restaurant"] = entities["restaurant"]
+        elif use_cuisines and entities["cuisine"]:
+            serving = sorted(
+                {
+                    name
+                    for cuisine in entities["cuisine"]
+                    for name in self.cuisines[cuisine]
+                }
+            )
+            if len(serving) < self.restaurant_count:
+                scope["restaurant"] = serving
+        if entities["city"] and len(set(self.cities.values())) > 1:
+            scope["city"] = entities["city"]
+        return scope
+
+    def save(self, path: Path):
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "restaurants": self.restaurants,
+                    "cities": self.cities,
+                    "cuisine_aliases": self.cuisine_aliases,
+                    "cuisines": self.cuisines,
+                },
+                f,
+            )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "EntityLookup":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["restaurants"],
+            data["cities"],
+            data["cuisine_aliases"],
+            data["cuisines"],
+        )
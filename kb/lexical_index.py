@@ -0,0 +1,236 @@
+import heapq
+import json
+import math
+import re
+import tempfile
+import unicodedata
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO
+
+from langchain_core.documents import Document
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    text = unicodedata.normalize("NFKD", text.lower())
+    return _TOKEN.findall(text)
+
+
+def _write_list(out: IO[str], encoded: Iterable[str]):
+    """Write already JSON-encoded values as one JSON list."""
+    out.write("[")
+    for i, value in enumerate(encoded):
+        if i:
+            out.write(", ")
+        out.write(value)
+    out.write("]")
+
+
+def _read_shard(path: Path) -> Iterator[tuple[str, list[list]]]:
+    """Postings of one spilled shard, grouped by term."""
+    postings = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            term, index, weight = line.rstrip("\n").split("\t")
+            postings[term].append([int(index), float(weight)])
+    return iter(postings.items())
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the knowledge-base chunks.
+
+    Per-posting BM25 weights are computed at build time, so a search is a
+    dictionary lookup and a sum per query term with no embedding call. The
+    chunks themselves are stored too, so hits need no vector store lookup.
+    """
+
+    def __init__(
+        self,
+        ids: list[str],
+        contents: list[str],
+        metadatas: list[dict],
+        postings: dict[str, list[list]],
+    ):
+        self.ids = ids
+        self.contents = contents
+        self.metadatas = metadatas
+        # term -> [[doc index, weight], ...]
+        self.postings = postings
+
+    @classmethod
+    def build(
+        cls, chunks: Iterable[tuple[str, Document]], k1: float = 1.5, b: float = 0.75
+    ) -> "BM25Index":
+        """Build from (chunk ID, document) pairs; repeated IDs are skipped."""
+        ids, contents, metadatas, term_counts = [], [], [], []
+        seen = set()
+        for chunk, doc in chunks:
+            if chunk in seen:
+                continue
+            seen.add(chunk)
+            ids.append(chunk)
+            contents.append(doc.page_content)
+            metadatas.append(doc.metadata)
+            term_counts.append(Counter(tokenize(doc.page_content)))
+
+        doc_lengths = [sum(counts.values()) for counts in term_counts]
+        n_docs = len(ids)
+        avg_length = sum(doc_lengths) / n_docs if n_docs else 0.0
+
+        doc_freq = Counter(term for counts in term_counts for term in counts)
+
+        postings = defaultdict(list)
+        for index, counts in enumerate(term_counts):
+            norm = k1 * (1 - b + b * doc_lengths[index] / avg_length)
+            for term, tf in counts.items():
+                idf = math.log(
+                    1 + (n_docs - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5)
+                )
+                postings[term].append([index, idf * tf * (k1 + 1) / (tf + norm)])
+
+        return cls(ids, contents, metadatas, dict(postings))
+
+    @staticmethod
+    def build_on_disk(
+        chunks: Iterable[tuple[str, Document]],
+        path: Path,
+        k1: float = 1.5,
+        b: float = 0.75,
+        shards: int = 64,
+    ) -> int:
+        """
+        Write what `build(chunks).save(path)` writes, without holding the
+        corpus in memory: chunks are spilled to a temporary directory as they
+        stream in, and postings are grouped one term shard at a time. Only
+        the IDs, document lengths and document frequencies stay in memory.
+        Returns the number of chunks indexed.
+        """
+        with tempfile.TemporaryDirectory(
+            dir=path.parent, prefix=f".{path.name}."
+        ) as tmp:
+            spill = Path(tmp)
+            seen = set()
+            doc_lengths = array("I")
+            doc_freq: Counter = Counter()
+            fields = ("ids", "contents", "metadatas", "counts")
+            with ExitStack() as stack:
+                files = {
+                    name: stack.enter_context(open(spill / name, "w", encoding="utf-8"))
+                    for name in fields
+                }
+                for chunk, doc in chunks:
+                    if chunk in seen:
+                        continue
+                    seen.add(chunk)
+                    counts = Counter(tokenize(doc.page_content))
+                    doc_lengths.append(sum(counts.values()))
+                    doc_freq.update(counts.keys())
+                    for name, value in zip(
+                        fields,
+                        (chunk, doc.page_content, doc.metadata, counts),
+                        strict=True,
+                    ):
+                        files[name].write(json.dumps(value) + "\n")
+
+            n_docs = len(doc_lengths)
+            avg_length = sum(doc_lengths) / n_docs if n_docs else 0.0
+            with ExitStack() as stack:
+                shard_files = [
+                    stack.enter_context(
+                        open(spill / f"postings-{i}", "w", encoding="utf-8")
+                    )
+                    for i in range(shards)
+                ]
+                counts_file = stack.enter_context(
+                    open(spill / "counts", "r", encoding="utf-8")
+                )
+                for index, line in enumerate(counts_file):
+                    norm = k1 * (1 - b + b * doc_lengths[index] / avg_length)
+                    for term, tf in json.loads(line).items():
+                        df = doc_freq[term]
+                        idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                        weight = idf * tf * (k1 + 1) / (tf + norm)
+                        shard = zlib.crc32(term.encode("utf-8")) % shards
+                        shard_files[shard].write(f"{term}\t{index}\t{weight!r}\n")
+
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as out:
+                out.write("{")
+                for i, name in enumerate(fields[:3]):
+                    out.write(f'{", " if i else ""}"{name}": ')
+                    with open(spill / name, "r", encoding="utf-8") as f:
+                        _write_list(out, (line.rstrip("\n") for line in f))
+                out.write(', "postings": {')
+                first = True
+                for i in range(shards):
+                    for term, entries in _read_shard(spill / f"postings-{i}"):
+                        out.write(("" if first else ", ") + json.dumps(term) + ": ")
+                        out.write(json.dumps(entries))
+                        first = False
+                out.write("}}")
+            tmp_path.replace(path)
+        return n_docs
+
+    def _in_scope(self, index: int, scope: dict[str, list[str]]) -> bool:
+        metadata = self.metadatas[index]
+        return all(metadata.get(field) in values for field, values in scope.items())
+
+    def search(
+        self, query: str, k: int, scope: dict[str, list[str]] | None = None
+    ) -> list[tuple[int, float]]:
+        """
+        Top `k` (doc index, score) pairs for the query.
+
+        Args:
+            scope: Only consider chunks whose metadata field is one of the
+                given values, for every field.
+        """
+        scores: dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            for index, weight in self.postings.get(term, ()):
+                scores[index] += weight
+        candidates = scores.items()
+        if scope:
+            candidates = [item for item in candidates if self._in_scope(item[0], scope)]
+        return heapq.nlargest(k, candidates, key=lambda item: item[1])
+
+    def get_documents(
+        self, query: str, k: int, scope: dict[str, list[str]] | None = None
+    ) -> list[Document]:
+        return [
+            Document(
+                page_content=self.contents[index],
+                metadata={**self.metadatas[index], "_id": self.ids[index]},
+            )
+            for index, _ in self.search(query, k, scope)
+        ]
+
+    def save(self, path: Path):
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "ids": self.ids,
+                    "contents": self.contents,
+                    "metadatas": self.metadatas,
+                    "postings": self.postings,
+                },
+                f,
+            )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["ids"], data["contents"], data["metadatas"], data["postings"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
@@ -0,0 +1,515 @@
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+from config.rag_config import PROCESSED_JSON_DIR
+from kb.catalog import Catalog
+from kb.lexical_index import tokenize
+from models.resturant import Restaurant
+from utils.logger import get_logger
+
+logger = get_logger()
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+_TIME = re.compile(r"(\d{1,2})(?:[:.](\d{2}))?\s*(am|pm|noon|midnight)")
+# Tags users ask for by name, mapped to the Zomato tag slugs
+TAG_ALIASES = {
+    "veg": "veg",
+    "vegetarian": "veg",
+    "non-veg": "non-veg",
+    "nonveg": "non-veg",
+    "non veg": "non-veg",
+    "spicy": "sf-spicy",
+    "kid friendly": "sf-kid-friendly",
+    "kid-friendly": "sf-kid-friendly",
+}
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def parse_time(text: str) -> int | None:
+    """Minutes after midnight for strings like "6:30pm", "12noon", "11 pm"."""
+    match = _TIME.search(text.lower())
+    if not match:
+        return None
+    hour, minute, suffix = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if suffix == "noon":
+        return 12 * 60 + minute
+    if suffix == "midnight":
+        return minute
+    hour %= 12
+    if suffix == "pm":
+        hour += 12
+    return hour * 60 + minute
+
+
+def parse_days(text: str) -> set[int]:
+    """Weekday numbers (Mon=0) for strings like "Mon-Sun" or "Mon, Wed-Fri"."""
+    days = set()
+    for part in re.split(r"[,&]", text.lower()):
+        names = [n.strip()[:3] for n in part.split("-")]
+        if not names or names[0] not in DAYS:
+            continue
+        start = DAYS.index(names[0])
+        end = DAYS.index(names[-1]) if names[-1] in DAYS else start
+        day = start
+        while True:
+            days.add(day)
+            if day == end:
+                break
+            day = (day + 1) % 7
+    return days
+
+
+def parse_operating_hours(
+    operating_hours: dict[str, str],
+) -> list[tuple[set[int], int, int]]:
+    """
+    Turn Zomato timings into (weekdays, open minute, close minute) intervals.
+    Intervals past midnight get a close minute above 1440.
+    """
+    intervals = []
+    for days_text, timing in operating_hours.items():
+        days = parse_days(days_text) or set(range(7))
+        for span in timing.split(","):
+            parts = re.split(r"\s*[–-]\s*", span.strip())
+            if len(parts) != 2:
+                continue
+            start, end = parse_time(parts[0]), parse_time(parts[1])
+            if start is None or end is None:
+                continue
+            if end <= start:
+                end += 24 * 60
+            intervals.append((days, start, end))
+    return intervals
+
+
+class MenuEngine:
+    """
+    Read-only, in-process index over every menu item in the catalog.
+
+    Items are stored column-wise (names, prices, restaurant and section
+    offsets) with a price-sorted order for range scans, plus tag, word and
+    restaurant indexes for filters, and parsed opening-hour intervals.
+    """
+
+    def __init__(self, restaurants: Iterable[Restaurant]):
+        self.restaurant_names: list[str] = []
+        self.hours: list[list[tuple[set[int], int, int]]] = []
+        self.sections: list[str] = []
+        self.item_names: list[str] = []
+        self.prices = array("d")
+        self.item_restaurant = array("I")
+        self.item_section = array("I")
+        self.tag_index: dict[str, set[int]] = defaultdict(set)
+        self.word_index: dict[str, set[int]] = defaultdict(set)
+        self.restaurant_items: list[range] = []
+
+        for restaurant in restaurants:
+            r = len(self.restaurant_names)
+            self.restaurant_names.append(restaurant.restaurant_name)
+            self.hours.append(parse_operating_hours(restaurant.operating_hours))
+            first = len(self.item_names)
+            for section in restaurant.menu:
+                s = len(self.sections)
+                self.sections.append(section.section)
+                section_words = {_stem(w) for w in tokenize(section.section)}
+                for item in section.items:
+                    i = len(self.item_names)
+                    self.item_names.append(item.item_name)
+                    self.prices.append(item.price)
+                    self.item_restaurant.append(r)
+                    self.item_section.append(s)
+                    for tag in item.tags:
+                        self.tag_index[tag].add(i)
+                    for word in section_words | {
+                        _stem(w) for w in tokenize(item.item_name)
+                    }:
+                        self.word_index[word].add(i)
+            self.restaurant_items.append(range(first, len(self.item_names)))
+
+        self.by_price = sorted(range(len(self.prices)), key=self.prices.__getitem__)
+        self.sorted_prices = array("d", (self.prices[i] for i in self.by_price))
+        # Longest names first, so "Burger King Express" wins over "Burger King"
+        self._restaurant_patterns = [
+            (self._name_pattern(name), r)
+            for r, name in sorted(
+                enumerate(self.restaurant_names), key=lambda rn: -len(rn[1])
+            )
+        ]
+
+    @staticmethod
+    def _name_pattern(name: str) -> re.Pattern:
+        """Matches the name's words in order, whatever separates them."""
+        words = tokenize(name.replace("'", ""))
+        return re.compile(
+            r"(?<![a-z0-9])"
+            + r"[^a-z0-9]+".join(map(re.escape, words))
+            + r"(?![a-z0-9])"
+        )
+
+    @classmethod
+    def from_dir(cls, path: Path = PROCESSED_JSON_DIR) -> "MenuEngine":
+        return cls(Catalog.from_dir(path))
+
+    def match_restaurant(self, text: str) -> tuple[int | None, str]:
+        """
+        Index of the restaurant named in the text, and the lowercased text
+        with that name cut out (the text unchanged when none is named).
+        """
+        text = text.lower().replace("'", "")
+        for pattern, r in self._restaurant_patterns:
+            match = pattern.search(text)
+            if match:
+                return r, f"{text[: match.start()]} {text[match.end() :]}"
+        return None, text
+
+    def find_restaurant(self, text: str) -> int | None:
+        """Index of the restaurant whose name appears in the text."""
+        return self.match_restaurant(text)[0]
+
+    def filter_items(
+        self,
+        restaurant: int | None = None,
+        min_price: float | None = None,
+        max_price: float | None = None,
+        tags: Iterable[str] = (),
+        words: Iterable[str] = (),
+        descending: bool = False,
+        limit: int | None = None,
+        strict_min: bool = False,
+        strict_max: bool = False,
+    ) -> list[int]:
+        """
+        Item indices matching every filter, ordered by price. Price bounds
+        are inclusive unless strict_min / strict_max is set.
+        """
+        candidates: set[int] | None = None
+        for tag in tags:
+            matches = self.tag_index.get(tag, set())
+            candidates = matches if candidates is None else candidates & matches
+        for word in words:
+            matches = self.word_index.get(_stem(word), set())
+            candidates = matches if candidates is None else candidates & matches
+        if restaurant is not None:
+            items = self.restaurant_items[restaurant]
+            if candidates is None:
+                candidates = set(items)
+            else:
+                candidates = {i for i in candidates if i in items}
+
+        if min_price is None:
+            lo = 0
+        elif strict_min:
+            lo = bisect_right(self.sorted_prices, min_price)
+        else:
+            lo = bisect_left(self.sorted_prices, min_price)
+        if max_price is None:
+            hi = len(self.sorted_prices)
+        elif strict_max:
+            hi = bisect_left(self.sorted_prices, max_price)
+        else:
+            hi = bisect_right(self.sorted_prices, max_price)
+        order = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+
+        results = []
+        for position in order:
+            i = self.by_price[position]
+            if candidates is None or i in candidates:
+                results.append(i)
+                if limit is not None and len(results) >= limit:
+                    break
+        return results
+
+    @staticmethod
+    def _covers(
+        interval: tuple[set[int], int, int], minute: int, weekday: int | None
+    ) -> bool:
+        days, start, end = interval
+        if (weekday is None or weekday in days) and start <= minute < end:
+            return True
+        # Tail of an interval that started the day before and runs past midnight
+        previous = None if weekday is None else (weekday - 1) % 7
+        return (
+            previous is None or previous in days
+        ) and start <= minute + 24 * 60 < end
+
+    def open_at(self, minute: int, weekday: int | None = None) -> list[str]:
+        """Restaurants open at `minute` past midnight (on `weekday`, if given)."""
+        return [
+            self.restaurant_names[r]
+            for r, intervals in enumerate(self.hours)
+            if any(self._covers(interval, minute, weekday) for interval in intervals)
+        ]
+
+    def open_after(self, minute: int, weekday: int | None = None) -> list[str]:
+        """Restaurants still open later than `minute` (on `weekday`, if given)."""
+        return [
+            self.restaurant_names[r]
+            for r, intervals in enumerate(self.hours)
+            if any(
+                self._closes_after(interval, minute, weekday) for interval in intervals
+            )
+        ]
+
+    @staticmethod
+    def _closes_after(
+        interval: tuple[set[int], int, int], minute: int, weekday: int | None
+    ) -> bool:
+        days, _, end = interval
+        if (weekday is None or weekday in days) and end > minute:
+            return True
+        # Interval that started the day before and closes after midnight
+        previous = None if weekday is None else (weekday - 1) % 7
+        return (previous is None or previous in days) and end - 24 * 60 > minute
+
+    def format_items(self, items: list[int], total: int | None = None) -> str:
+        lines = [
+            f"- {self.item_names[i]} (₹{self.prices[i]:g}) at "
+            f"{self.restaurant_names[self.item_restaurant[i]]}"
+            for i in items
+        ]
+        if total is not None and total > len(items):
+            lines.append(f"...and {total - len(items)} more")
+        return "\n".join(lines)
+
+
+_PRICE_CAP = re.compile(
+    r"\b(under|below|less than|upto|up to|within|cheaper than|max)\s*(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d+)?)"
+)
+_PRICE_FLOOR = re.compile(
+    r"\b(above|over|more than|at least|min)\s*(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d+)?)"
+)
+# Bounds that exclude the price itself; "at least", "up to", "max" etc. include it
+_STRICT_BOUNDS = {
+    "under",
+    "below",
+    "less than",
+    "cheaper than",
+    "above",
+    "over",
+    "more than",
+}
+_CHEAPEST = re.compile(r"\b(cheapest|least expensive|lowest priced|lowest price)\b")
+_PRICIEST = re.compile(r"\b(most expensive|costliest|priciest|highest priced)\b")
+_OPEN_AT = re.compile(
+    r"\bopen\b.*?\b(after|at|past|around|till|until|by)\s+(\d{1,2}(?:[:.]\d{2})?\s*(?:am|pm|noon|midnight))"
+)
+_OPEN_NOW = re.compile(r"\bopen\b.*?\b(right now|now|currently)\b")
+_OPEN = re.compile(r"\bopen\b")
+_FILLER = {
+    "what",
+    "whats",
+    "is",
+    "are",
+    "the",
+    "a",
+    "an",
+    "at",
+    "in",
+    "from",
+    "of",
+    "for",
+    "me",
+    "show",
+    "list",
+    "give",
+    "find",
+    "get",
+    "item",
+    "items",
+    "option",
+    "options",
+    "dish",
+    "dishes",
+    "food",
+    "foods",
+    "menu",
+    "which",
+    "there",
+    "any",
+    "all",
+    "on",
+    "price",
+    "prices",
+    "priced",
+    "with",
+    "and",
+    "i",
+    "can",
+    "you",
+    "tell",
+    "have",
+    "has",
+    "do",
+    "does",
+    "some",
+    "only",
+    "please",
+    "available",
+    "under",
+    "below",
+    "less",
+    "than",
+    "upto",
+    "up",
+    "to",
+    "within",
+    "cheaper",
+    "max",
+    "above",
+    "over",
+    "more",
+    "least",
+    "min",
+    "rs",
+    "inr",
+    "cheapest",
+    "expensive",
+    "most",
+    "lowest",
+    "highest",
+    "costliest",
+    "priciest",
+    "s",
+}
+# Words an opening-hours question may use besides the filler
+_HOURS_WORDS = {"open", "still", "restaurant", "restaurants", "place", "places"}
+MAX_FAST_PATH_ITEMS = 10
+MAX_SUPERLATIVE_ITEMS = 3
+
+
+def _cut(text: str, spans: Iterable[tuple[int, int]]) -> str:
+    for start, end in sorted(spans, reverse=True):
+        text = f"{text[:start]} {text[end:]}"
+    return text
+
+
+def _answer_hours(
+    engine: MenuEngine,
+    match: re.Match,
+    text: str,
+    restaurant: int | None,
+    now: datetime | None,
+) -> str | None:
+    """
+    Opening hours of every restaurant, or of the one named in the query.
+    None when the query says anything else, e.g. "which pizza place".
+    """
+    opened = (match.start(), match.start() + len("open"))
+    rest = _cut(text, [opened, *(match.span(g) for g in range(1, match.re.groups + 1))])
+    if any(w not in _FILLER and w not in _HOURS_WORDS for w in tokenize(rest)):
+        return None
+    if restaurant is not None and not engine.hours[restaurant]:
+        return None
+
+    now = now or datetime.now()
+    if match.re is not _OPEN_AT:
+        names = engine.open_at(now.hour * 60 + now.minute, now.weekday())
+        label = "right now"
+    else:
+        word, minute = match.group(1), parse_time(match.group(2))
+        label = f"{word} {match.group(2).strip()}"
+        if word in ("after", "past"):
+            # Closing later than the time; "after midnight" means tonight's
+            names = engine.open_after(minute or 24 * 60, now.weekday())
+        elif word in ("till", "until"):
+            # Still open right up to the time
+            names = engine.open_at((minute - 1) % (24 * 60), now.weekday())
+        else:
+            names = engine.open_at(minute, now.weekday())
+
+    if restaurant is not None:
+        name = engine.restaurant_names[restaurant]
+        if name in names:
+            return f"Yes, {name} is open {label}."
+        return f"No, {name} is not open {label}."
+    if not names:
+        return f"None of the restaurants I know of are open {label}."
+    return f"Restaurants open {label}:\n" + "\n".join(f"- {n}" for n in names)
+
+
+def answer_structured_query(
+    engine: MenuEngine, query: str, now: datetime | None = None
+) -> str | None:
+    """
+    Answer price, filter and opening-hour questions straight from the index.
+
+    Returns None unless the whole query is understood, so anything the
+    templates do not cover still goes through retrieval and the agent.
+    """
+    text = query.lower().replace("’", "'")
+    restaurant, remaining = engine.match_restaurant(text)
+
+    open_match = _OPEN_AT.search(remaining) or _OPEN_NOW.search(remaining)
+    if open_match:
+        return _answer_hours(engine, open_match, remaining, restaurant, now)
+
+    cap, floor = _PRICE_CAP.search(remaining), _PRICE_FLOOR.search(remaining)
+    cheapest, priciest = _CHEAPEST.search(remaining), _PRICIEST.search(remaining)
+    if not (cap or floor or cheapest or priciest):
+        return None
+
+    tags = []
+    for alias in sorted(TAG_ALIASES, key=len, reverse=True):
+        pattern = rf"(?<![\w-]){re.escape(alias)}(?![\w-])"
+        if re.search(pattern, remaining):
+            tags.append(TAG_ALIASES[alias])
+            remaining = re.sub(pattern, " ", remaining)
+
+    words = []
+    for word in tokenize(remaining):
+        if word in _FILLER or word.replace(".", "").isdigit():
+            continue
+        if _stem(word) not in engine.word_index:
+            # Something the templates do not understand
+            return None
+        words.append(word)
+
+    items = engine.filter_items(
+        restaurant=restaurant,
+        min_price=float(floor.group(2)) if floor else None,
+        max_price=float(cap.group(2)) if cap else None,
+        tags=tags,
+        words=words,
+        descending=bool(priciest),
+        strict_min=bool(floor) and floor.group(1) in _STRICT_BOUNDS,
+        strict_max=bool(cap) and cap.group(1) in _STRICT_BOUNDS,
+    )
+
+    where = (
+        f" at {engine.restaurant_names[restaurant]}" if restaurant is not None else ""
+    )
+    if not items:
+        return f"I couldn't find any matching items{where}."
+    if cheapest or priciest:
+        heading = "Cheapest" if cheapest else "Most expensive"
+        return f"{heading} matching items{where}:\n" + engine.format_items(
+            items[:MAX_SUPERLATIVE_ITEMS]
+        )
+    return f"Matching items{where}:\n" + engine.format_items(
+        items[:MAX_FAST_PATH_ITEMS], len(items)
+    )
+
+
+_engine: MenuEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_menu_engine() -> MenuEngine:
+    """Shared engine over PROCESSED_JSON_DIR, built on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                logger.info("[+] Building menu engine...")
+                _engine = MenuEngine.from_dir()
+                logger.info(f"[✓] Menu engine ready ({len(_engine.item_names)} items)")
+    return _engine
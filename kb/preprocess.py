@@ -1,18 +1,159 @@
+import hashlib
 import json
+import re
+from collections.abc import Iterator
+from functools import lru_cache
+from pathlib import Path
+
 from langchain_core.documents import Document
-from typing import List
-from config.rag_config import PROCESSED_JSON_DIR
+
+from config.rag_config import CHUNK_MAX_TOKENS, EMBEDDING_MODEL, PROCESSED_JSON_DIR
+from kb.catalog import Catalog
 from models.resturant import Restaurant
 from utils.logger import get_logger
 
-
 logger = get_logger()
 
+# Chunk types stored in `metadata["chunk_type"]`
+OVERVIEW, MENU, REVIEWS, FEATURES, HOURS = (
+    "overview",
+    "menu",
+    "reviews",
+    "features",
+    "hours",
+)
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1)
+def _load_tokenizer():
+    try:
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(EMBEDDING_MODEL, local_files_only=True)
+    except (ImportError, OSError, ValueError):
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Token count under the embedding model's tokenizer. Estimated from words
+    and punctuation when the tokenizer is not available locally.
+    """
+    tokenizer = _load_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    return sum(1 + len(piece) // 6 for piece in _TOKEN_PATTERN.findall(text))
+
+
+def _clean(text: str | None) -> str:
+    return _WHITESPACE.sub(" ", text or "").strip().strip('"').strip()
+
+
+def pack_entries(
+    header: str, entries: list[str], max_tokens: int = CHUNK_MAX_TOKENS
+) -> list[str]:
+    """
+    Greedily pack entries below a header so each chunk stays within
+    `max_tokens`. An entry larger than the budget gets a chunk of its own.
+    """
+    budget = max_tokens - count_tokens(header)
+    chunks, current, used = [], [], 0
+    for entry in entries:
+        cost = count_tokens(entry) + 1
+        if current and used + cost > budget:
+            chunks.append("\n".join([header, *current]))
+            current, used = [], 0
+        current.append(entry)
+        used += cost
+    if current:
+        chunks.append("\n".join([header, *current]))
+    return chunks
+
+
+def restaurant_id(restaurant: Restaurant) -> str:
+    """Stable key linking every chunk back to its restaurant."""
+    return hashlib.sha1(restaurant.restaurant_name.encode("utf-8")).hexdigest()[:16]
 
-def extract_docs() -> List[Document]:
-    docs = []
 
-    for file_path in PROCESSED_JSON_DIR.glob("*.json"):
+def restaurant_docs(
+    restaurant: Restaurant, max_tokens: int = CHUNK_MAX_TOKENS
+) -> list[Document]:
+    """Split one restaurant into overview, menu, review, feature and hours chunks."""
+    name = restaurant.restaurant_name
+    location = f"{restaurant.location.address}, {restaurant.location.city}"
+    base_metadata = {
+        "restaurant": name,
+        "restaurant_id": restaurant_id(restaurant),
+        "city": restaurant.location.city,
+    }
+
+    def make(content: str, chunk_type: str, **extra) -> Document:
+        return Document(
+            page_content=content,
+            metadata={**base_metadata, "chunk_type": chunk_type, **extra},
+        )
+
+    overview = [
+        f"Restaurant: {name}",
+        f"Description: {_clean(restaurant.description) or 'N/A'}",
+        f"Location: {location}",
+    ]
+    if restaurant.contact and restaurant.contact.phone:
+        overview.append(f"Phone: {restaurant.contact.phone}")
+    if restaurant.contact and restaurant.contact.website:
+        overview.append(f"Website: {restaurant.contact.website}")
+    overview.append(f"Menu sections: {', '.join(s.section for s in restaurant.menu)}")
+    docs = [make("\n".join(overview), OVERVIEW)]
+
+    if restaurant.features:
+        for content in pack_entries(
+            f"Restaurant: {name}\nFeatures:",
+            [f"- {_clean(feature)}" for feature in restaurant.features],
+            max_tokens,
+        ):
+            docs.append(make(content, FEATURES))
+
+    if restaurant.operating_hours:
+        for content in pack_entries(
+            f"Restaurant: {name}\nOperating hours:",
+            [
+                f"- {days}: {hours}"
+                for days, hours in restaurant.operating_hours.items()
+            ],
+            max_tokens,
+        ):
+            docs.append(make(content, HOURS))
+
+    for section in restaurant.menu:
+        entries = []
+        for item in section.items:
+            entry = f"- {item.item_name} ({item.price} {item.currency.value})"
+            if item.tags:
+                entry += f" [{', '.join(item.tags)}]"
+            description = _clean(item.description)
+            if description:
+                entry += f": {description}"
+            entries.append(entry)
+        header = f"Restaurant: {name}\nLocation: {location}\nSection: {section.section}\nItems:"
+        for content in pack_entries(header, entries, max_tokens):
+            docs.append(make(content, MENU, section=section.section))
+
+    reviews = [
+        f"- {review.rating} stars: {_clean(review.review_text) or 'N/A'}"
+        for review in restaurant.reviews
+    ]
+    for content in pack_entries(f"Restaurant: {name}\nReviews:", reviews, max_tokens):
+        docs.append(make(content, REVIEWS))
+
+    return docs
+
+
+def iter_restaurants(directory: Path = PROCESSED_JSON_DIR) -> Iterator[Restaurant]:
+    """Parse processed restaurant files one at a time."""
+    for file_path in sorted(directory.glob("*.json")):
         with open(file_path, "r", encoding="utf-8") as f:
             raw_data = json.load(f)
 
@@ -21,39 +162,25 @@ def extract_docs() -> List[Document]:
         except Exception as e:
             logger.warning(f"[!] Skipping {file_path.name}: {e}")
             continue
+        yield restaurant
 
-        for section in restaurant.menu:
-            batch_size = 10
-            for i in range(0, len(section.items), batch_size):
-                batch_items = section.items[i : i + batch_size]
-                batch_content = f"""
-                Restaurant: {restaurant.restaurant_name}
-                Description: {restaurant.description or "N/A"}
-                Location: {restaurant.location.address}, {restaurant.location.city}
-                Section: {section.section}
-                Features: {", ".join(restaurant.features)}
-                Items:
-                """
-
-                for item in batch_items:
-                    batch_content += f"""
-                    - {item.item_name} ({item.price} {item.currency})
-                      Tags: {", ".join(item.tags)}
-                      Description: {item.description or "N/A"}
-                    """
-
-                batch_content += "\nReviews:"
-                for review in restaurant.reviews:
-                    batch_content += f"""
-                    - {review.rating} stars
-                      Review: {review.review_text or "N/A"}\n
-                    """
-
-                docs.append(
-                    Document(
-                        page_content=batch_content.strip(),
-                        metadata={"restaurant": restaurant.restaurant_name},
-                    )
-                )
 
-    return docs
+def load_restaurants() -> list[Restaurant]:
+    return list(iter_restaurants())
+
+
+def iter_docs(
+    max_tokens: int = CHUNK_MAX_TOKENS, directory: Path = PROCESSED_JSON_DIR
+) -> Iterator[Document]:
+    """Chunks of every processed restaurant, without holding the corpus in memory."""
+    for restaurant in iter_restaurants(directory):
+        yield from restaurant_docs(restaurant, max_tokens)
+
+
+def extract_docs(max_tokens: int = CHUNK_MAX_TOKENS) -> list[Document]:
+    """Chunks of every processed restaurant, read through the compact catalog."""
+    return [
+        doc
+        for restaurant in Catalog.from_dir()
+        for doc in restaurant_docs(restaurant, max_tokens)
+    ]
@@ -0,0 +1,69 @@
+from qdrant_client.http.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    QuantizationConfig,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from config.rag_config import (
+    EMBEDDING_DIM,
+    VECTOR_DIM,
+    VECTOR_ON_DISK,
+    VECTOR_OVERSAMPLING,
+    VECTOR_QUANTIZATION,
+    VECTOR_RESCORE,
+)
+
+QUANTIZATIONS = (None, "int8", "binary")
+
+
+def vector_settings() -> dict:
+    """Storage settings the collection was built with, kept in the manifest."""
+    return {
+        "size": VECTOR_DIM or EMBEDDING_DIM,
+        "quantization": VECTOR_QUANTIZATION,
+        "on_disk": VECTOR_ON_DISK,
+    }
+
+
+def vector_params() -> VectorParams:
+    return VectorParams(
+        size=VECTOR_DIM or EMBEDDING_DIM,
+        distance=Distance.COSINE,
+        on_disk=VECTOR_ON_DISK,
+    )
+
+
+def quantization_config(
+    quantization: str | None = VECTOR_QUANTIZATION,
+) -> QuantizationConfig | None:
+    if quantization not in QUANTIZATIONS:
+        raise ValueError(
+            f"Unknown VECTOR_QUANTIZATION {quantization!r}, expected one of {QUANTIZATIONS}"
+        )
+    if quantization == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8, quantile=0.99, always_ram=True
+            )
+        )
+    if quantization == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def search_params() -> SearchParams | None:
+    """Rescoring settings for quantized collections, None otherwise."""
+    if VECTOR_QUANTIZATION is None:
+        return None
+    return SearchParams(
+        quantization=QuantizationSearchParams(
+            rescore=VECTOR_RESCORE, oversampling=VECTOR_OVERSAMPLING
+        )
+    )
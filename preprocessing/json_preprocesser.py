@@ -1,16 +1,29 @@
+import argparse
+import hashlib
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from utils.logger import get_logger
-from typing import Dict, Any
+from typing import Any
+
 from pydantic import ValidationError
-from models.resturant import Restaurant, Currency
-from utils.exchange_rates import get_exchange_rates
-from config.rag_config import RAW_JSON_DIR, PROCESSED_JSON_DIR
+
+from config.rag_config import (
+    PREPROCESS_STATE_PATH,
+    PREPROCESS_WORKERS,
+    PROCESSED_JSON_DIR,
+    RAW_JSON_DIR,
+)
+from models.resturant import Currency, Restaurant
+from utils.exchange_rates import get_exchange_rates, pin_exchange_rates
+from utils.instrumentation import span
+from utils.logger import get_logger
 
 logger = get_logger()
 
 
-def preprocess_json(data: Dict[str, Any]) -> Dict[str, Any]:
+def preprocess_json(data: dict[str, Any]) -> dict[str, Any]:
     """
     Preprocess the raw JSON data to conform to the Restaurant schema.
     Performs necessary transformations and validations.
@@ -21,32 +34,28 @@ def preprocess_json(data: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Processed dictionary conforming to the Restaurant schema
     """
-    # Handle currency conversion if needed
-    if "menu" in data:
-        for section in data["menu"]:
-            if "items" in section:
-                for item in section["items"]:
-                    if "currency" in item and isinstance(item["currency"], str):
-                        item["currency"] = Currency.from_str(item["currency"])
-
-    # Convert currency to INR using FX rates
-    if "menu" in data:
-        for section in data["menu"]:
-            if "items" in section:
-                for item in section["items"]:
-                    if item["currency"] != Currency.INR:
-                        currency = item["currency"]
-
-                        # Get current exchange rates
-                        rates = get_exchange_rates()
-                        conversion_rate = rates.get(currency)
-                        if conversion_rate is None:
-                            if currency == Currency.OTHER:
-                                continue
-                            # Default fallback rate
-                            conversion_rate = 1.0
-                        item["price"] *= conversion_rate
-                        item["currency"] = Currency.INR
+    rates = None
+
+    # Normalize currency labels and convert prices to INR in a single pass
+    for section in data.get("menu", []):
+        for item in section.get("items", []):
+            currency = item.get("currency")
+            if isinstance(currency, str):
+                currency = item["currency"] = Currency.from_str(currency)
+            if currency is None or currency == Currency.INR:
+                continue
+
+            # Only fetch FX rates once a non-INR price shows up
+            if rates is None:
+                rates = get_exchange_rates()
+            conversion_rate = rates.get(currency)
+            if conversion_rate is None:
+                if currency == Currency.OTHER:
+                    continue
+                # Default fallback rate
+                conversion_rate = 1.0
+            item["price"] *= conversion_rate
+            item["currency"] = Currency.INR
 
     return data
 
@@ -56,12 +65,16 @@ def process_file(input_file: Path) -> bool:
         output_file = PROCESSED_JSON_DIR / input_file.name
 
         logger.info(f"Processing file: {input_file}")
-        with open(input_file, "r", encoding="utf-8") as f:
+        with (
+            span("json_parse", file=input_file.name),
+            open(input_file, "r", encoding="utf-8") as f,
+        ):
             data = json.load(f)
 
         processed_data = preprocess_json(data)
 
-        restaurant = Restaurant.model_validate(processed_data)
+        with span("validation", file=input_file.name):
+            restaurant = Restaurant.model_validate(processed_data)
 
         with open(output_file, "w", encoding="utf-8") as f:
             f.write(restaurant.model_dump_json(indent=2))
@@ -74,12 +87,44 @@ def process_file(input_file: Path) -> bool:
     except ValidationError as e:
         logger.error(f"Validation error in {input_file}: {e}")
     except Exception as e:
-        logger.error(f"Error processing {input_file}: {str(e)}")
+        logger.error(f"Error processing {input_file}: {e!s}")
 
     return False
 
 
-def main():
+def file_fingerprint(path: Path) -> dict[str, Any]:
+    stat = path.stat()
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": digest}
+
+
+def is_unchanged(path: Path, previous: dict[str, Any] | None) -> bool:
+    """True when the raw file matches the last successful run and its output exists."""
+    if previous is None or not (PROCESSED_JSON_DIR / path.name).exists():
+        return False
+    stat = path.stat()
+    if stat.st_mtime_ns == previous["mtime_ns"] and stat.st_size == previous["size"]:
+        return True
+    # Touched but possibly identical, compare content
+    return file_fingerprint(path)["sha256"] == previous["sha256"]
+
+
+def load_state() -> dict[str, Any]:
+    try:
+        with open(PREPROCESS_STATE_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: dict[str, Any]):
+    PREPROCESS_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(PREPROCESS_STATE_PATH, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+def main(workers: int | None = PREPROCESS_WORKERS, force: bool = False):
     RAW_JSON_DIR.mkdir(parents=True, exist_ok=True)
     PROCESSED_JSON_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -94,15 +139,51 @@ def main():
 
     logger.info(f"Found {len(json_files)} JSON files to process")
 
-    success_count = 0
-    for json_file in json_files:
-        if process_file(json_file):
-            success_count += 1
+    state = {} if force else load_state()
+    pending = [f for f in json_files if not is_unchanged(f, state.get(f.name))]
+    skipped = len(json_files) - len(pending)
+    if skipped:
+        logger.info(f"Skipping {skipped} unchanged files")
+
+    started = time.perf_counter()
+    success_count = skipped
+    if pending:
+        # Resolve rates once so every worker converts with the same snapshot
+        rates = get_exchange_rates()
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=pin_exchange_rates, initargs=(rates,)
+        ) as executor:
+            results = executor.map(
+                process_file,
+                pending,
+                chunksize=max(
+                    1, len(pending) // ((workers or os.cpu_count() or 1) * 4)
+                ),
+            )
+            for json_file, ok in zip(pending, results, strict=True):
+                if ok:
+                    success_count += 1
+                    state[json_file.name] = file_fingerprint(json_file)
+                else:
+                    state.pop(json_file.name, None)
+        save_state(state)
+    elapsed = time.perf_counter() - started
 
     logger.info(
         f"Processing complete. {success_count}/{len(json_files)} files successfully processed."
     )
+    logger.info(
+        f"Processed {len(pending)} files in {elapsed:.2f}s "
+        f"({len(pending) / elapsed if elapsed else 0:.1f} files/s)"
+    )
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Normalize raw restaurant JSON")
+    parser.add_argument("--workers", type=int, default=PREPROCESS_WORKERS)
+    parser.add_argument(
+        "--force", action="store_true", help="reprocess files even if unchanged"
+    )
+    args = parser.parse_args()
+
+    main(workers=args.workers, force=args.force)
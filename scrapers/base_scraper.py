@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
+import requests
 from models.resturant import Restaurant
 
 
 class BaseRestaurantScraper(ABC):
     def __init__(self, base_url: str):
         self.base_url = base_url
+        # Anything with a `requests.get` compatible `get`; the crawl engine
+        # swaps in a pooled, rate-limited client
+        self.http = requests
 
     @abstractmethod
     def scrape(self) -> Restaurant:
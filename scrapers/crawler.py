@@ -0,0 +1,98 @@
+import asyncio
+import time
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+
+from config.scrape_config import (
+    CRAWL_BURST_PER_HOST,
+    CRAWL_RATE_PER_HOST,
+    CRAWL_WORKERS,
+)
+from models.resturant import Restaurant
+from scrapers.base_scraper import BaseRestaurantScraper
+from scrapers.http_client import CrawlHttpClient, HostRateLimiter
+from utils.instrumentation import span
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def _scrape(scraper: BaseRestaurantScraper) -> Restaurant:
+    with span("scrape", restaurant=scraper.base_url):
+        return scraper.scrape()
+
+
+async def crawl(
+    scrapers: Iterable[BaseRestaurantScraper],
+    workers: int = CRAWL_WORKERS,
+    rate_per_host: float = CRAWL_RATE_PER_HOST,
+    burst_per_host: float = CRAWL_BURST_PER_HOST,
+    on_result: Callable[[Restaurant], None] | None = None,
+    http: CrawlHttpClient | None = None,
+) -> list[tuple[BaseRestaurantScraper, Restaurant | Exception]]:
+    """
+    Scrape restaurants concurrently with a bounded worker pool.
+
+    The extractors stay synchronous; each worker runs one `scrape()` at a
+    time on a dedicated thread pool. All scrapers share one pooled HTTP
+    client whose per-host token buckets replace the fixed sleep between
+    restaurants.
+
+    Args:
+        scrapers: Scrapers to run.
+        workers: Number of restaurants scraped at the same time.
+        rate_per_host: Sustained requests per second allowed per host.
+        burst_per_host: Requests a host may receive back to back.
+        on_result: Called with every scraped restaurant as soon as it is ready.
+        http: Client to share between scrapers, built from the limits if omitted.
+
+    Returns:
+        (scraper, Restaurant or the raised exception) for every scraper, in input order.
+    """
+    scrapers = list(scrapers)
+    owns_client = http is None
+    if http is None:
+        http = CrawlHttpClient(HostRateLimiter(rate_per_host, burst_per_host))
+    for scraper in scrapers:
+        scraper.http = http
+
+    queue: asyncio.Queue[int] = asyncio.Queue()
+    for index in range(len(scrapers)):
+        queue.put_nowait(index)
+
+    results: list[Restaurant | Exception | None] = [None] * len(scrapers)
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+
+    async def worker(executor: ThreadPoolExecutor):
+        while True:
+            try:
+                index = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            scraper = scrapers[index]
+            try:
+                data = await loop.run_in_executor(executor, _scrape, scraper)
+                logger.info(f"[✓] Scraped: {data.restaurant_name}")
+                if on_result is not None:
+                    on_result(data)
+                results[index] = data
+            except Exception as e:
+                logger.exception(f"[!] Failed scraping {scraper.base_url}")
+                results[index] = e
+
+    pool_size = max(1, min(workers, len(scrapers)))
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            await asyncio.gather(*(worker(executor) for _ in range(pool_size)))
+    finally:
+        if owns_client:
+            http.close()
+
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for r in results if isinstance(r, Restaurant))
+    logger.info(
+        f"[✓] Crawled {succeeded}/{len(scrapers)} restaurants in {elapsed:.1f}s "
+        f"({http.request_count} requests, {http.retry_count} retries, {pool_size} workers)"
+    )
+    return list(zip(scrapers, results, strict=True))
@@ -0,0 +1,159 @@
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.scrape_config import (
+    CRAWL_BACKOFF_BASE,
+    CRAWL_BACKOFF_MAX,
+    CRAWL_BURST_PER_HOST,
+    CRAWL_MAX_RETRIES,
+    CRAWL_POOL_MAXSIZE,
+    CRAWL_RATE_PER_HOST,
+    CRAWL_RETRY_STATUSES,
+)
+from utils.instrumentation import inc, span
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens refill at `rate` per second up to
+    `capacity`; `acquire()` blocks until one is available.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller has to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            # Negative balance: the token is paid for by future refills
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """One token bucket per host, created on first use."""
+
+    def __init__(
+        self,
+        rate: float = CRAWL_RATE_PER_HOST,
+        burst: float = CRAWL_BURST_PER_HOST,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> None:
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.burst)
+        bucket.acquire()
+
+
+class CrawlHttpClient:
+    """
+    Drop-in replacement for `requests.get` used by the crawl engine.
+
+    Requests go through a shared `requests.Session` (pooled keep-alive
+    connections), wait on the per-host rate limiter, and are retried with
+    exponential backoff and full jitter on 429/5xx and connection errors.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: HostRateLimiter | None = None,
+        max_retries: int = CRAWL_MAX_RETRIES,
+        backoff_base: float = CRAWL_BACKOFF_BASE,
+        backoff_max: float = CRAWL_BACKOFF_MAX,
+        pool_maxsize: int = CRAWL_POOL_MAXSIZE,
+    ):
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.request_count = 0
+        self.retry_count = 0
+        self._count_lock = threading.Lock()
+
+    def _backoff(self, attempt: int, response: requests.Response | None) -> float:
+        retry_after = (
+            response.headers.get("Retry-After") if response is not None else None
+        )
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        host = urlparse(url).netloc
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire(url)
+            with self._count_lock:
+                self.request_count += 1
+
+            response = None
+            try:
+                with span("http_fetch", url=url, attempt=attempt) as s:
+                    response = self.session.get(url, **kwargs)
+                    s.set(status=response.status_code)
+                inc("http_requests_total", host=host, status=response.status_code)
+                if response.status_code not in CRAWL_RETRY_STATUSES:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                inc("http_requests_total", host=host, status=type(e).__name__)
+                if attempt >= self.max_retries:
+                    raise
+                reason = str(e)
+
+            if attempt >= self.max_retries:
+                # Out of retries, let the caller's raise_for_status() report it
+                return response
+
+            delay = self._backoff(attempt, response)
+            logger.warning(
+                f"[!] {reason} for {url}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+            )
+            with self._count_lock:
+                self.retry_count += 1
+            inc("http_retries_total", host=host)
+            attempt += 1
+            time.sleep(delay)
+
+    def close(self) -> None:
+        self.session.close()
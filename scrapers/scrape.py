@@ -1,5 +1,10 @@
 from sources.zomato_scraper import ZomatoScraper
+from scrapers.crawler import crawl
+from config.scrape_config import CRAWL_RATE_PER_HOST, CRAWL_WORKERS
+from models.resturant import Restaurant
 from utils.logger import get_logger
+import argparse
+import asyncio
 import time
 
 scrapers = [
@@ -13,22 +18,50 @@ scrapers = [
 ]
 
 
+def save_restaurant(data: Restaurant):
+    with open(f"data/raw_json/{data.restaurant_name}.json", "w", encoding="utf-8") as f:
+        f.write(data.model_dump_json(indent=2))
+
+
 def scrape_all():
     logger = get_logger()
     for scraper in scrapers:
         try:
             data = scraper.scrape()
             logger.info(f"[✓] Scraped: {data.restaurant_name}")
-
-            with open(
-                f"data/raw_json/{data.restaurant_name}.json", "w", encoding="utf-8"
-            ) as f:
-                f.write(data.model_dump_json(indent=2))
+            save_restaurant(data)
         except Exception as e:
             logger.error(f"[!] Failed scraping {scraper.base_url}: {e}")
 
         time.sleep(10)
 
 
+def crawl_all(workers: int = CRAWL_WORKERS, rate_per_host: float = CRAWL_RATE_PER_HOST):
+    """Scrape every restaurant concurrently, rate limited per host."""
+    asyncio.run(
+        crawl(
+            scrapers,
+            workers=workers,
+            rate_per_host=rate_per_host,
+            on_result=save_restaurant,
+        )
+    )
+
+
 if __name__ == "__main__":
-    scrape_all()
+    parser = argparse.ArgumentParser(description="Scrape restaurant pages")
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="scrape one restaurant at a time with a fixed pause in between",
+    )
+    parser.add_argument("--workers", type=int, default=CRAWL_WORKERS)
+    parser.add_argument(
+        "--rate", type=float, default=CRAWL_RATE_PER_HOST, help="requests/sec per host"
+    )
+    args = parser.parse_args()
+
+    if args.sequential:
+        scrape_all()
+    else:
+        crawl_all(workers=args.workers, rate_per_host=args.rate)
@@ -10,6 +10,7 @@ from models.resturant import (
     Review,
 )
 from scrapers.base_scraper import BaseRestaurantScraper
+from utils.instrumentation import span
 from utils.logger import get_logger
 
 logger = get_logger()
@@ -46,30 +47,53 @@ class ZomatoScraper(BaseRestaurantScraper):
             restaurant_url.rstrip("/")
         )  # For this specific scraper, base_url is the restaurant URL
         self.source_url = "https://www.zomato.com/webroutes/getPage?page_url="
+        # Parsed getPage responses for the current scrape, keyed by page URL
+        self._pages: dict[str, dict] = {}
+        self.fetch_count = 0
 
-    def _get_menu(self) -> list[MenuSection]:
-        menu_items_page_url = f"{self.source_url}{self.base_url}/order"
-        logger.info(f"[+] Scraping Zomato restaurant page: {menu_items_page_url}")
+    def _fetch_page(self, path: str = "") -> dict:
+        """
+        Fetch and parse a getPage response, at most once per scrape.
+
+        Every extractor reading the same page (base, `/order`, `/reviews`)
+        shares the parsed snapshot instead of downloading it again.
+
+        Args:
+            path: Suffix appended to the restaurant URL, e.g. "/order".
+        """
+        page_url = f"{self.source_url}{self.base_url}{path}"
+        if page_url in self._pages:
+            return self._pages[page_url]
+
+        logger.info(f"[+] Scraping Zomato restaurant page: {page_url}")
 
         try:
-            response = requests.get(menu_items_page_url, headers=headers, timeout=30)
+            self.fetch_count += 1
+            response = self.http.get(page_url, headers=headers, timeout=30)
             response.raise_for_status()  # Raise exception for 4XX/5XX responses
         except requests.exceptions.RequestException as e:
             logger.error(f"Failed to fetch restaurant page: {e}")
             raise RuntimeError(f"Failed to fetch restaurant data: {e}")
 
         try:
-            response_data = response.json()
-            menu_sections = (
-                response_data.get("page_data", {})
-                .get("order", {})
-                .get("menuList", {})
-                .get("menus", [])
-            )
-        except (ValueError, KeyError) as e:
+            with span("json_parse", source="zomato", bytes=len(response.content)):
+                response_data = response.json()
+        except ValueError as e:
             logger.error(f"Failed to parse JSON response: {e}")
             raise ValueError(f"Failed to parse restaurant data: {e}")
 
+        self._pages[page_url] = response_data
+        return response_data
+
+    def _get_menu(self) -> list[MenuSection]:
+        response_data = self._fetch_page("/order")
+        menu_sections = (
+            response_data.get("page_data", {})
+            .get("order", {})
+            .get("menuList", {})
+            .get("menus", [])
+        )
+
         menu_store = []
 
         for menu_section in menu_sections:
@@ -112,28 +136,14 @@ class ZomatoScraper(BaseRestaurantScraper):
         return menu_store
 
     def _get_location(self) -> Location:
-        menu_items_page_url = f"{self.source_url}{self.base_url}/order"
-        logger.info(f"[+] Scraping Zomato restaurant page: {menu_items_page_url}")
-
-        try:
-            response = requests.get(menu_items_page_url, headers=headers, timeout=30)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch restaurant page: {e}")
-            raise RuntimeError(f"Failed to fetch restaurant data: {e}")
-
-        try:
-            response_data = response.json()
-            location = response_data.get("location", {})
-            address = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_RES_CONTACT", {})
-                .get("address", {})
-            )
-        except (ValueError, KeyError) as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            raise ValueError(f"Failed to parse restaurant data: {e}")
+        response_data = self._fetch_page("/order")
+        location = response_data.get("location", {})
+        address = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_RES_CONTACT", {})
+            .get("address", {})
+        )
         return Location(
             address=address,
             city=location.get("cityName"),
@@ -143,47 +153,19 @@ class ZomatoScraper(BaseRestaurantScraper):
         )
 
     def _get_name(self) -> str:
-        menu_items_page_url = f"{self.source_url}{self.base_url}/order"
-        logger.info(f"[+] Scraping Zomato restaurant page: {menu_items_page_url}")
-
-        try:
-            response = requests.get(menu_items_page_url, headers=headers, timeout=30)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch restaurant page: {e}")
-            raise RuntimeError(f"Failed to fetch restaurant data: {e}")
-
-        try:
-            response_data = response.json()
-            name = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_BASIC_INFO", {})
-                .get("name", "No Name Found")
-            )
-        except (ValueError, KeyError) as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            raise ValueError(f"Failed to parse restaurant data: {e}")
+        response_data = self._fetch_page("/order")
+        name = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_BASIC_INFO", {})
+            .get("name", "No Name Found")
+        )
 
         return name
 
     def _get_reviews(self) -> list[Review]:
-        reviews_page_url = f"{self.source_url}{self.base_url}/reviews"
-        logger.info(f"[+] Scraping Zomato restaurant page: {reviews_page_url}")
-
-        try:
-            response = requests.get(reviews_page_url, headers=headers, timeout=30)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch restaurant page: {e}")
-            raise RuntimeError(f"Failed to fetch restaurant data: {e}")
-
-        try:
-            response_data = response.json()
-            reviews = response_data.get("entities", {}).get("REVIEWS", {})
-        except (ValueError, KeyError) as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            raise ValueError(f"Failed to parse restaurant data: {e}")
+        response_data = self._fetch_page("/reviews")
+        reviews = response_data.get("entities", {}).get("REVIEWS", {})
 
         reviews_store = []
 
@@ -200,59 +182,44 @@ class ZomatoScraper(BaseRestaurantScraper):
         return reviews_store
 
     def _get_features(self) -> list[str]:
-        page_url = f"{self.source_url}{self.base_url}"
-        logger.info(f"[+] Scraping Zomato restaurant page: {page_url}")
-
-        try:
-            response = requests.get(page_url, headers=headers, timeout=30)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch restaurant page: {e}")
-            raise RuntimeError(f"Failed to fetch restaurant data: {e}")
-
-        try:
-            response_data = response.json()
-            cost_for_two = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_RES_DETAILS", {})
-                .get("CFT_DETAILS", {})
-                .get("cfts", [])
-            )
-
-            highlights = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_RES_DETAILS", {})
-                .get("HIGHLIGHTS", {})
-                .get("highlights", [])
-            )
+        response_data = self._fetch_page()
+        cost_for_two = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_RES_DETAILS", {})
+            .get("CFT_DETAILS", {})
+            .get("cfts", [])
+        )
 
-            cuisines = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_RES_DETAILS", {})
-                .get("CUISINES", {})
-                .get("cuisines", [])
-            )
+        highlights = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_RES_DETAILS", {})
+            .get("HIGHLIGHTS", {})
+            .get("highlights", [])
+        )
 
-            top_dishes = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_RES_DETAILS", {})
-                .get("TOP_DISHES", {})
-            )
+        cuisines = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_RES_DETAILS", {})
+            .get("CUISINES", {})
+            .get("cuisines", [])
+        )
 
-            people_liked = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_REVIEW_HIGHLIGHTS", {})
-                .get("PEOPLE_LIKED", {})
-            )
+        top_dishes = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_RES_DETAILS", {})
+            .get("TOP_DISHES", {})
+        )
 
-        except (ValueError, KeyError) as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            raise ValueError(f"Failed to parse restaurant data: {e}")
+        people_liked = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_REVIEW_HIGHLIGHTS", {})
+            .get("PEOPLE_LIKED", {})
+        )
 
         features_store = []
 
@@ -288,52 +255,24 @@ class ZomatoScraper(BaseRestaurantScraper):
         return features_store
 
     def _get_description(self) -> str:
-        page_url = f"{self.source_url}{self.base_url}"
-        logger.info(f"[+] Scraping Zomato restaurant page: {page_url}")
-
-        try:
-            response = requests.get(page_url, headers=headers, timeout=30)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch restaurant page: {e}")
-            raise RuntimeError(f"Failed to fetch restaurant data: {e}")
-
-        try:
-            response_data = response.json()
-            description = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_BASIC_INFO", {})
-                .get("cuisine_string", "")
-            )
-        except (ValueError, KeyError) as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            raise ValueError(f"Failed to parse restaurant data: {e}")
+        response_data = self._fetch_page()
+        description = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_BASIC_INFO", {})
+            .get("cuisine_string", "")
+        )
 
         return description
 
     def _get_contact(self) -> Contact:
-        menu_items_page_url = f"{self.source_url}{self.base_url}/order"
-        logger.info(f"[+] Scraping Zomato restaurant page: {menu_items_page_url}")
-
-        try:
-            response = requests.get(menu_items_page_url, headers=headers, timeout=30)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch restaurant page: {e}")
-            raise RuntimeError(f"Failed to fetch restaurant data: {e}")
-
-        try:
-            response_data = response.json()
-            phone_details = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_RES_CONTACT", {})
-                .get("phoneDetails", {})
-            )
-        except (ValueError, KeyError) as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            raise ValueError(f"Failed to parse restaurant data: {e}")
+        response_data = self._fetch_page("/order")
+        phone_details = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_RES_CONTACT", {})
+            .get("phoneDetails", {})
+        )
 
         if phone_details:
             phone = phone_details.get("phoneStr", None)
@@ -343,29 +282,15 @@ class ZomatoScraper(BaseRestaurantScraper):
         return Contact(phone=None, email=None, website=None)
 
     def _get_operating_hours(self) -> dict:
-        menu_items_page_url = f"{self.source_url}{self.base_url}/order"
-        logger.info(f"[+] Scraping Zomato restaurant page: {menu_items_page_url}")
-
-        try:
-            response = requests.get(menu_items_page_url, headers=headers, timeout=30)
-            response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Failed to fetch restaurant page: {e}")
-            raise RuntimeError(f"Failed to fetch restaurant data: {e}")
-
-        try:
-            response_data = response.json()
-            operating_hours = (
-                response_data.get("page_data", {})
-                .get("sections", {})
-                .get("SECTION_BASIC_INFO", {})
-                .get("timing", {})
-                .get("customised_timings", {})
-                .get("opening_hours", [])
-            )
-        except (ValueError, KeyError) as e:
-            logger.error(f"Failed to parse JSON response: {e}")
-            raise ValueError(f"Failed to parse restaurant data: {e}")
+        response_data = self._fetch_page("/order")
+        operating_hours = (
+            response_data.get("page_data", {})
+            .get("sections", {})
+            .get("SECTION_BASIC_INFO", {})
+            .get("timing", {})
+            .get("customised_timings", {})
+            .get("opening_hours", [])
+        )
 
         operating_hours_store = dict()
         for day in operating_hours:
@@ -377,6 +302,9 @@ class ZomatoScraper(BaseRestaurantScraper):
         return operating_hours_store
 
     def scrape(self) -> Restaurant:
+        self._pages = {}
+        self.fetch_count = 0
+
         menu_store = self._get_menu()
         location = self._get_location()
         resturant_name = self._get_name()
@@ -386,6 +314,12 @@ class ZomatoScraper(BaseRestaurantScraper):
         features = self._get_features()
         description = self._get_description()
 
+        logger.info(
+            f"[✓] Fetched {self.fetch_count} pages for {resturant_name} ({self.base_url})"
+        )
+        # The snapshot is only valid for this scrape
+        self._pages = {}
+
         return Restaurant(
             restaurant_name=resturant_name,
             description=description,
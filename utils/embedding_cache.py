@@ -0,0 +1,231 @@
+import hashlib
+import math
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+from config.rag_config import (
+    EMBED_BACKEND,
+    EMBEDDING_CACHE_MEMORY_ITEMS,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MODEL,
+    VECTOR_DIM,
+)
+from utils.instrumentation import inc, span
+from utils.logger import get_logger
+
+logger = get_logger()
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Key for a (model, text) pair; whitespace differences do not matter."""
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode()).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding store: an in-memory LRU in front of a SQLite table
+    holding vectors as float32 blobs. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = EMBEDDING_CACHE_PATH,
+        max_memory_items: int = EMBEDDING_CACHE_MEMORY_ITEMS,
+    ):
+        self.max_memory_items = max_memory_items
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        with self._lock:
+            pending = []
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    pending.append(key)
+
+            # SQLite caps the number of bound parameters per statement
+            for i in range(0, len(pending), 500):
+                chunk = pending[i : i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+                for key, blob in rows:
+                    vector = array("f", blob).tolist()
+                    self._remember(key, vector)
+                    found[key] = vector
+                    self.disk_hits += 1
+
+            self.misses += len(set(pending) - found.keys())
+        return found
+
+    def put_many(self, items: dict[str, list[float]]):
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups
+                if lookups
+                else 0.0,
+                "memory_items": len(self._memory),
+            }
+
+
+def truncate(vector: list[float], dimensions: int) -> list[float]:
+    """Keep the leading `dimensions` and rescale to unit length."""
+    head = vector[:dimensions]
+    norm = math.sqrt(sum(x * x for x in head))
+    return [x / norm for x in head] if norm else head
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that only runs the encoder for texts the cache has
+    not seen. The wrapped model is created on the first miss, so fully
+    cached workloads never load it.
+
+    With `dimensions`, vectors are truncated after the cache, which keeps
+    full vectors so the setting can change without re-encoding.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        factory: Callable[[], Embeddings],
+        cache: EmbeddingCache | None = None,
+        dimensions: int | None = None,
+    ):
+        self.model_name = model_name
+        self.dimensions = dimensions
+        self._factory = factory
+        self._model: Embeddings | None = None
+        self._model_lock = threading.Lock()
+        self.cache = cache or EmbeddingCache()
+
+    @property
+    def model(self) -> Embeddings:
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logger.info(f"[+] Loading embedding model {self.model_name}...")
+                    self._model = self._factory()
+        return self._model
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        keys = [cache_key(self.model_name, text) for text in texts]
+        found = self.cache.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts, strict=True):
+            if key not in found:
+                missing.setdefault(key, text)
+        inc("embedding_cache_hits_total", len(texts) - len(missing))
+
+        if missing:
+            with span("embedding", texts=len(missing)):
+                vectors = self.model.embed_documents(list(missing.values()))
+            inc("embedding_cache_misses_total", len(missing))
+            computed = dict(zip(missing.keys(), vectors, strict=True))
+            self.cache.put_many(computed)
+            found.update(computed)
+
+        if self.dimensions:
+            return [truncate(found[key], self.dimensions) for key in keys]
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> list[float]:
+        key = cache_key(self.model_name, text)
+        found = self.cache.get_many([key])
+        if key in found:
+            vector = found[key]
+            inc("embedding_cache_hits_total")
+        else:
+            with span("embedding", texts=1):
+                vector = self.model.embed_query(text)
+            inc("embedding_cache_misses_total")
+            self.cache.put_many({key: vector})
+        return truncate(vector, self.dimensions) if self.dimensions else vector
+
+    def close(self):
+        """Release the wrapped model's resources, such as worker processes."""
+        if self._model is not None and hasattr(self._model, "close"):
+            self._model.close()
+
+
+def load_huggingface_model(model_name: str = EMBEDDING_MODEL) -> Embeddings:
+    from langchain_huggingface import HuggingFaceEmbeddings
+
+    return HuggingFaceEmbeddings(model_name=model_name)
+
+
+def get_embeddings(
+    model_name: str = EMBEDDING_MODEL,
+    workers: int = 1,
+    dimensions: int | None = VECTOR_DIM,
+) -> CachedEmbeddings:
+    """
+    Cached HuggingFace embeddings used by both indexing and retrieval, or
+    the hashing stand-in with EMBED_BACKEND="offline".
+
+    Args:
+        workers: With more than one, cache misses are encoded by a pool of
+            worker processes (see `utils.embedding_workers`).
+        dimensions: Truncate vectors to this many leading dimensions.
+    """
+    if EMBED_BACKEND == "offline":
+        from utils.offline_embeddings import OFFLINE_EMBEDDING_MODEL, HashingEmbeddings
+
+        return CachedEmbeddings(
+            OFFLINE_EMBEDDING_MODEL, HashingEmbeddings, dimensions=dimensions
+        )
+    if workers > 1:
+        from utils.embedding_workers import MultiProcessEmbeddings
+
+        return CachedEmbeddings(
+            model_name,
+            lambda: MultiProcessEmbeddings(model_name, workers),
+            dimensions=dimensions,
+        )
+    return CachedEmbeddings(
+        model_name, lambda: load_huggingface_model(model_name), dimensions=dimensions
+    )
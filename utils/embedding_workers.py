@@ -0,0 +1,89 @@
+import math
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config.rag_config import EMBED_THREADS_PER_WORKER, EMBED_WORKERS, EMBEDDING_MODEL
+from utils.embedding_cache import load_huggingface_model
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# The model loaded by the current worker process
+_worker_model: Embeddings | None = None
+
+
+def _init_worker(factory: Callable[[str], Embeddings], model_name: str, threads: int):
+    global _worker_model
+    # Must be set before torch is imported by the model factory
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_model = factory(model_name)
+
+
+def _embed_shard(texts: list[str]) -> np.ndarray:
+    # float32 arrays pickle far smaller than lists of Python floats
+    return np.asarray(_worker_model.embed_documents(texts), dtype=np.float32)
+
+
+class MultiProcessEmbeddings(Embeddings):
+    """
+    Splits each `embed_documents` call across worker processes. Every
+    worker loads the model once and runs it with `threads_per_worker`
+    intra-op threads, so the cores are shared out instead of contended.
+    Results come back in input order to the calling process.
+    """
+
+    def __init__(
+        self,
+        model_name: str = EMBEDDING_MODEL,
+        workers: int = EMBED_WORKERS,
+        threads_per_worker: int | None = EMBED_THREADS_PER_WORKER,
+        factory: Callable[[str], Embeddings] = load_huggingface_model,
+    ):
+        self.workers = workers
+        self.threads_per_worker = threads_per_worker or max(
+            1, (os.cpu_count() or 1) // workers
+        )
+        logger.info(
+            f"[+] Starting {workers} embedding workers "
+            f"with {self.threads_per_worker} threads each"
+        )
+        # spawn, since forking a process with torch thread pools can deadlock
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(factory, model_name, self.threads_per_worker),
+        )
+
+    def warm_up(self):
+        """Start every worker and wait for its model to load."""
+        list(self._executor.map(_embed_shard, [["warm up"]] * self.workers))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if not texts:
+            return []
+        size = math.ceil(len(texts) / self.workers)
+        shards = [texts[i : i + size] for i in range(0, len(texts), size)]
+        return [
+            vector.tolist()
+            for result in self._executor.map(_embed_shard, shards)
+            for vector in result
+        ]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    def close(self):
+        self._executor.shutdown()
@@ -1,26 +1,193 @@
-from functools import lru_cache
+import atexit
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
 import requests
 
+from config.rag_config import (
+    FX_RATES_SNAPSHOT_PATH,
+    FX_RATES_SOURCE_FILE,
+    FX_RATES_TIMEOUT,
+    FX_RATES_TTL_SECONDS,
+    FX_RATES_URL,
+)
 from models.resturant import Currency
 from utils.logger import get_logger
 
 logger = get_logger()
 
+# Used when neither the snapshot nor the source is available
+FALLBACK_RATES = {Currency.USD: 85.34, Currency.EUR: 97.2, Currency.GBP: 113.58}
+
+
+class RateSource(ABC):
+    """Where fresh rates come from. Rates are INR per unit of each currency."""
+
+    name = "source"
+
+    @abstractmethod
+    def fetch(self) -> dict[str, float]:
+        pass
 
-@lru_cache(maxsize=1, typed=True)
-def get_exchange_rates():
-    """Fetch current exchange rates from a public API and cache the result."""
-    try:
-        response = requests.get("https://api.exchangerate-api.com/v4/latest/INR")
+
+class ExchangeRateApiSource(RateSource):
+    name = "exchangerate-api"
+
+    def __init__(self, url: str = FX_RATES_URL, timeout: float = FX_RATES_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> dict[str, float]:
+        response = requests.get(self.url, timeout=self.timeout)
+        response.raise_for_status()
         data = response.json()
-        # Convert to INR-based rates (INR as base currency)
-        rates = {
-            Currency.USD: 1 / data["rates"]["USD"],
-            Currency.EUR: 1 / data["rates"]["EUR"],
-            Currency.GBP: 1 / data["rates"]["GBP"],
+        # The API quotes units per INR, invert to INR per unit
+        return {
+            currency.value: 1 / data["rates"][currency.value]
+            for currency in FALLBACK_RATES
+        }
+
+
+class FileRateSource(RateSource):
+    """Reads `{"USD": 85.3, ...}` (INR per unit) from a local JSON file."""
+
+    name = "file"
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+
+    def fetch(self) -> dict[str, float]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {k: float(v) for k, v in data.get("rates", data).items()}
+
+
+class ExchangeRateProvider:
+    """
+    FX rates backed by an on-disk snapshot shared by every process.
+
+    A fresh snapshot is used as is. A stale one is still returned, and a
+    background thread refreshes it from the source; at exit, the process
+    waits up to FX_RATES_TIMEOUT for that refresh so short CLI runs still
+    publish it. Without a snapshot the
+    source is queried once with a bounded timeout, falling back to
+    FALLBACK_RATES on failure.
+    """
+
+    def __init__(
+        self,
+        source: RateSource,
+        snapshot_path: Path = FX_RATES_SNAPSHOT_PATH,
+        ttl: float = FX_RATES_TTL_SECONDS,
+    ):
+        self.source = source
+        self.snapshot_path = snapshot_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing: threading.Thread | None = None
+        self._exit_hook = False
+
+    def _read_snapshot(self) -> dict | None:
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def refresh(self) -> dict | None:
+        """Fetch rates from the source and publish a new snapshot."""
+        try:
+            rates = self.source.fetch()
+        except Exception:
+            logger.exception("Failed to fetch exchange rates")
+            return None
+
+        snapshot = {
+            "fetched_at": time.time(),
+            "source": self.source.name,
+            "rates": rates,
         }
+        self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+        tmp_path.replace(self.snapshot_path)
+        logger.info(f"[✓] Saved exchange rates from {self.source.name}")
+        return snapshot
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return
+            # A daemon, so a hung source cannot hold up exit past the join below
+            self._refreshing = threading.Thread(
+                target=self.refresh, name="fx-refresh", daemon=True
+            )
+            self._refreshing.start()
+            if not self._exit_hook:
+                atexit.register(self._finish_refresh)
+                self._exit_hook = True
+
+    def _finish_refresh(self, timeout: float = FX_RATES_TIMEOUT):
+        """Give an in-flight background refresh `timeout` seconds to land."""
+        thread = self._refreshing
+        if thread is not None and thread.is_alive():
+            thread.join(timeout)
+
+    def get_rates(self, allow_stale: bool = True) -> dict[Currency, float]:
+        """
+        Args:
+            allow_stale: Serve an expired snapshot while refreshing it in the
+                background, instead of waiting for the source.
+        """
+        snapshot = self._read_snapshot()
+        is_fresh = (
+            snapshot is not None and time.time() - snapshot["fetched_at"] < self.ttl
+        )
+
+        if snapshot is not None and not is_fresh:
+            if allow_stale:
+                self._refresh_in_background()
+            else:
+                snapshot = self.refresh() or snapshot
+        elif snapshot is None:
+            snapshot = self.refresh()
+
+        if snapshot is None:
+            return dict(FALLBACK_RATES)
+        rates = {Currency.from_str(k): v for k, v in snapshot["rates"].items()}
+        rates.pop(Currency.OTHER, None)
         return rates
-    except Exception as e:
-        logger.error(f"Failed to fetch exchange rates: {e}")
-        # Fallback rates if API fails
-        return {Currency.USD: 85.34, Currency.EUR: 97.2, Currency.GBP: 113.58}
+
+
+def get_rate_provider() -> ExchangeRateProvider:
+    if FX_RATES_SOURCE_FILE:
+        return ExchangeRateProvider(FileRateSource(FX_RATES_SOURCE_FILE))
+    return ExchangeRateProvider(ExchangeRateApiSource())
+
+
+# Rates fixed for the current run, see `pin_exchange_rates`
+_pinned_rates: dict[Currency, float] | None = None
+_provider: ExchangeRateProvider | None = None
+
+
+def pin_exchange_rates(rates: dict[Currency, float] | None):
+    """
+    Make `get_exchange_rates` return exactly these rates in this process,
+    e.g. in pool workers so a whole run converts with one rate set.
+    """
+    global _pinned_rates
+    _pinned_rates = rates
+
+
+def get_exchange_rates() -> dict[Currency, float]:
+    """INR per unit of each supported currency."""
+    global _provider, _pinned_rates
+    if _pinned_rates is None:
+        if _provider is None:
+            _provider = get_rate_provider()
+        _pinned_rates = _provider.get_rates()
+    return _pinned_rates
@@ -0,0 +1,484 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Self
+
+from config.rag_config import (
+    INSTRUMENTATION_ENABLED,
+    METRICS_PORT,
+    PROFILE_DIR,
+    PROFILE_INTERVAL,
+    TRACE_PATH,
+)
+from utils.logger import get_logger
+
+logger = get_logger()
+
+# Upper bounds of the latency buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _new_id(bits: int) -> str:
+    # Much cheaper than uuid4, which reads os.urandom
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def _label_key(labels: dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    parts = []
+    for name, value in key:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # One count per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        bounds = [str(b) for b in self.buckets] + ["+Inf"]
+        total = 0
+        result = []
+        for bound, count in zip(bounds, self.counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by name and labels. Safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[str, dict[LabelKey, float]] = {}
+        self.histograms: dict[str, dict[LabelKey, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def render(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    for bound, count in histogram.cumulative():
+                        labels = _format_labels(key, f'le="{bound}"')
+                        lines.append(f"{name}_bucket{labels} {count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {histogram.sum:g}")
+                    lines.append(f"{name}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": {
+                    name: {str(dict(key)): value for key, value in series.items()}
+                    for name, series in self.counters.items()
+                },
+                "histograms": {
+                    name: {
+                        str(dict(key)): {"count": h.count, "sum": h.sum}
+                        for key, h in series.items()
+                    }
+                    for name, series in self.histograms.items()
+                },
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+
+class TraceWriter:
+    """
+    Appends finished spans to a JSONL file. Lines are written whole, so
+    worker processes can share the file.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Kept open for the writer's lifetime, closed by `close`
+        self._file = open(  # noqa: SIM115
+            self.path, "a", encoding="utf-8", buffering=1
+        )
+
+    def write(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+registry = MetricsRegistry()
+
+_enabled = False
+_trace_writer: TraceWriter | None = None
+_current_span: ContextVar["Span | None"] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    Timed section of work. Finished spans feed the `span_duration_seconds`
+    histogram and, with a trace file configured, one JSONL record each.
+    Spans opened inside another one, including on threads started with
+    `asyncio.to_thread`, share its trace ID.
+    """
+
+    __slots__ = (
+        "_start",
+        "_token",
+        "attrs",
+        "name",
+        "parent_id",
+        "span_id",
+        "trace_id",
+    )
+
+    def __init__(self, name: str, attrs: dict[str, Any]):
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        """Attach attributes known only once the work is under way."""
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> Self:
+        parent = _current_span.get()
+        self.trace_id = parent.trace_id if parent else _new_id(64)
+        self.parent_id = parent.span_id if parent else None
+        self.span_id = _new_id(32)
+        self._token = _current_span.set(self)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        seconds = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        error = exc_type.__name__ if exc_type is not None else None
+        _finish_span(
+            self.name,
+            seconds,
+            self.attrs,
+            self.trace_id,
+            self.span_id,
+            self.parent_id,
+            error,
+        )
+        return False
+
+
+class _NoopSpan:
+    """Returned by `span` while instrumentation is off."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _finish_span(
+    name: str,
+    seconds: float,
+    attrs: dict[str, Any],
+    trace_id: str,
+    span_id: str,
+    parent_id: str | None,
+    error: str | None,
+):
+    registry.observe("span_duration_seconds", seconds, span=name)
+    if error is not None:
+        registry.inc("span_errors_total", span=name, error=error)
+    writer = _trace_writer
+    if writer is not None:
+        writer.write(
+            {
+                "trace_id": trace_id,
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "name": name,
+                "start": time.time() - seconds,
+                "seconds": round(seconds, 6),
+                "pid": os.getpid(),
+                "thread": threading.current_thread().name,
+                "attrs": attrs,
+                "error": error,
+            }
+        )
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, **attrs) -> Span | _NoopSpan:
+    """
+    Time a block of work:
+
+        with span("retrieval", query=query) as s:
+            docs = search(query)
+            s.set(results=len(docs))
+
+    Costs one flag check while instrumentation is off.
+    """
+    if not _enabled:
+        return _NOOP_SPAN
+    return Span(name, attrs)
+
+
+def traced(name: str | None = None) -> Callable:
+    """Decorator running every call of a function in a span."""
+
+    def decorate(func: Callable) -> Callable:
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(span_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def record_span(name: str, seconds: float, **attrs):
+    """Report a span that was timed elsewhere, e.g. by a callback."""
+    if not _enabled:
+        return
+    parent = _current_span.get()
+    _finish_span(
+        name,
+        seconds,
+        attrs,
+        parent.trace_id if parent else _new_id(64),
+        _new_id(32),
+        parent.span_id if parent else None,
+        None,
+    )
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    if _enabled:
+        registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    if _enabled:
+        registry.observe(name, value, **labels)
+
+
+def configure(enabled: bool = True, trace_path: Path | str | None = TRACE_PATH):
+    """Turn instrumentation on or off and choose where spans are written."""
+    global _enabled, _trace_writer
+    if _trace_writer is not None and (
+        not enabled or trace_path is None or Path(trace_path) != _trace_writer.path
+    ):
+        _trace_writer.close()
+        _trace_writer = None
+    if enabled and trace_path is not None and _trace_writer is None:
+        _trace_writer = TraceWriter(trace_path)
+    _enabled = enabled
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args):
+        pass
+
+
+_server: ThreadingHTTPServer | None = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(
+    port: int = METRICS_PORT, host: str = "127.0.0.1"
+) -> ThreadingHTTPServer | None:
+    """
+    Serve the registry at http://host:port/metrics from a daemon thread.
+    Only the first call starts a server, so reruns of a Streamlit script
+    are safe.
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            logger.warning(f"[!] Could not serve metrics on {host}:{port}: {e}")
+            return None
+        threading.Thread(
+            target=_server.serve_forever, name="metrics-server", daemon=True
+        ).start()
+    logger.info(f"[+] Serving metrics at http://{host}:{port}/metrics")
+    return _server
+
+
+class SamplingProfiler:
+    """
+    Samples the stacks of all other threads every `interval` seconds and
+    counts them as folded stacks ("thread;outer;...;inner count"), the
+    input format of flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    filename = os.path.basename(code.co_filename)
+                    stack.append(f"{code.co_name} ({filename})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+    def write(self, path: Path | str):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.folded(), encoding="utf-8")
+
+
+@contextmanager
+def profiled(
+    name: str, enabled: bool = True, directory: Path = PROFILE_DIR
+) -> Iterator[SamplingProfiler | None]:
+    """
+    Sample stacks while the block runs and save them to
+    `directory/<name>-<time>.folded`. All threads of the process are
+    sampled, so concurrent requests show up in each other's profiles.
+    """
+    if not enabled:
+        yield None
+        return
+    profiler = SamplingProfiler()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        path = directory / f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.folded"
+        profiler.write(path)
+        samples = sum(profiler.samples.values())
+        logger.info(f"[+] Saved profile of {name} ({samples} samples) to {path}")
+
+
+if INSTRUMENTATION_ENABLED:
+    configure()
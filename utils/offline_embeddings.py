@@ -0,0 +1,34 @@
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from config.rag_config import EMBEDDING_DIM
+from kb.lexical_index import tokenize
+
+OFFLINE_EMBEDDING_MODEL = "hashing-offline"
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Deterministic stand-in for the encoder, used with EMBED_BACKEND="offline"
+    to index and retrieve without the HuggingFace model: signed feature
+    hashing of the BM25 tokens, L2-normalized. Vectors only match those of
+    an index built with the same backend.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIM):
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                matrix[row, h % self.dimensions] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).tolist()
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]